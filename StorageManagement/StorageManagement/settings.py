@@ -247,6 +247,13 @@ CELERY_TASK_DEFAULT_ROUTING_KEY = 'default'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 CELERY_BEAT_MAX_LOOP_INTERVAL = 300  # 5 minutes
 
+# Recommender Settings
+# جستجوی همسایه‌های collaborative filtering: 'exact' (KNN کامل) یا 'approx' (LSH تقریبی)
+RECOMMENDER_NEIGHBORS_BACKEND = os.environ.get('RECOMMENDER_NEIGHBORS_BACKEND', 'exact')
+
+# روش collaborative filtering: 'knn' (همسایه‌های کاربر روی نمرات) یا 'als' (تجزیه‌ی ماتریس تعداد خریدها)
+RECOMMENDER_COLLABORATIVE_ENGINE = os.environ.get('RECOMMENDER_COLLABORATIVE_ENGINE', 'knn')
+
 # django-autocomplete-light settings
 AUTOLOAD_SELECT2 = True
 SELECT2_CACHE_BACKEND = 'default'
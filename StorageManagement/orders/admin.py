@@ -75,7 +75,11 @@ class OrderAdmin(admin.ModelAdmin):
 
     def mark_as_paid(self, request, queryset):
         from django.utils import timezone
+        from recommendations.services import RecommendationService
+        # update سیگنال post_save را اجرا نمی‌کند؛ کاربران برای به‌روزرسانی توصیه‌ها جداگانه علامت می‌خورند
+        user_ids = list(queryset.filter(status='pending').values_list('user_id', flat=True))
         updated = queryset.filter(status='pending').update(status='paid', paid_at=timezone.now())
+        RecommendationService.mark_users_dirty(user_ids)
         self.message_user(request, f"{updated} سفارش با موفقیت به وضعیت پرداخت شده تغییر یافت")
 
     mark_as_paid.short_description = 'علامت‌گذاری به عنوان پرداخت شده'
@@ -94,7 +98,14 @@ class OrderAdmin(admin.ModelAdmin):
     mark_as_delivered.short_description = 'علامت‌گذاری به عنوان تحویل داده شده'
 
     def mark_as_canceled(self, request, queryset):
+        from recommendations.services import RecommendationService
+        # لغو سفارش پرداخت‌شده یا ارسال‌شده آن را از داده‌ی توصیه‌ها خارج می‌کند
+        user_ids = list(
+            queryset.exclude(status='delivered').filter(status__in=Order.PURCHASED_STATUSES)
+            .values_list('user_id', flat=True)
+        )
         updated = queryset.exclude(status='delivered').update(status='canceled')
+        RecommendationService.mark_users_dirty(user_ids)
         self.message_user(request, f"{updated} سفارش با موفقیت به وضعیت لغو شده تغییر یافت")
 
     mark_as_canceled.short_description = 'علامت‌گذاری به عنوان لغو شده'
@@ -16,6 +16,9 @@ class Order(models.Model):
         ('canceled', 'لغو شده'),
     ]
 
+    # وضعیت سفارش‌هایی که خرید شمرده می‌شوند (کاوش الگو، آموزش توصیه‌گر، محصولات پرطرفدار)
+    PURCHASED_STATUSES = ('paid', 'shipped', 'delivered')
+
     PAYMENT_METHOD_CHOICES = [
         ('online', 'پرداخت آنلاین'),
         ('cash', 'پرداخت نقدی'),
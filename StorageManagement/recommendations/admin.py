@@ -1,6 +1,16 @@
 from django.contrib import admin
-from recommendations.models import RuleProduct, UserRecommendation, AssociationRule
+from recommendations.models import (
+    RuleProduct, UserRecommendation, AssociationRule, MiningState, RuleSet, ProductAffinity,
+    PendingRecommendationRefresh, TrendingProduct, TrendingState
+)
 admin.site.register(UserRecommendation)
+admin.site.register(MiningState)
+admin.site.register(TrendingState)
+
+
+@admin.register(PendingRecommendationRefresh)
+class PendingRecommendationRefreshAdmin(admin.ModelAdmin):
+    list_display = ('user', 'marked_at')
 
 class RuleProductInline(admin.TabularInline):
     model = RuleProduct
@@ -9,10 +19,28 @@ class RuleProductInline(admin.TabularInline):
 
 @admin.register(AssociationRule)
 class AssociationRuleAdmin(admin.ModelAdmin):
-    list_display = ('support','confidence','lift')
+    list_display = ('rule_set','support','confidence','lift')
+    list_filter = ('rule_set',)
     inlines = (RuleProductInline,)
 
+@admin.register(RuleSet)
+class RuleSetAdmin(admin.ModelAdmin):
+    list_display = ('id','is_active','total_rules','total_transactions','created_at','activated_at')
+
+
 # Register your models here.
 @admin.register(RuleProduct)
 class RuleProductAdmin(admin.ModelAdmin):
     list_display = ('rule','product','is_antecedent')
+
+
+@admin.register(ProductAffinity)
+class ProductAffinityAdmin(admin.ModelAdmin):
+    list_display = ('rule_set','product','related_product','rank','best_lift','best_confidence','best_support')
+    list_filter = ('rule_set',)
+
+
+@admin.register(TrendingProduct)
+class TrendingProductAdmin(admin.ModelAdmin):
+    list_display = ('product','scope','scope_value','score')
+    list_filter = ('scope',)
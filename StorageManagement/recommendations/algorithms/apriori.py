@@ -3,14 +3,26 @@
 import pandas as pd
 import itertools
 from collections import defaultdict
+from contextlib import closing
 from django.conf import settings
 import os
-from recommendations.models import AssociationRule, RuleProduct
-from products.models import Product
+from orders.models import Order
+from recommendations.services import RuleSetService
+from recommendations.tasks import purge_stale_rule_sets
+from recommendations.algorithms.support_counting import (
+    BitmapSupportCounter, ParallelSupportCounter, EncodedTransactions, support_threshold
+)
+from recommendations.algorithms.candidate_generation import generate_candidates, HashTreeSupportCounter
+from recommendations.algorithms.transaction_sources import (
+    iter_order_baskets, load_transactions_from_db, load_transactions_from_store
+)
+from recommendations.algorithms.feature_store import ORDER_ITEMS_CSV_PATH
+from recommendations.algorithms.rule_index import get_rule_index
+from recommendations.algorithms.fpgrowth import fpgrowth, stream_fpgrowth
 
 
 def generateCandidate(itemsets, k):
-    """تولید مجموعه‌های کاندید k-آیتمی از آیتم‌ست‌های قبلی"""
+    """تولید مجموعه‌های کاندید k-آیتمی از آیتم‌ست‌های قبلی (پیاده‌سازی مرجع؛ در apriori از generate_candidates استفاده می‌شود)"""
     candidates = []
     itemsets = [set(itemset) for itemset in itemsets]
 
@@ -46,6 +58,39 @@ def calculateItemsetSupport(itemsets, transactions):
     return itemset_support
 
 
+class PythonSupportCounter:
+    """پیاده‌سازی مرجع شمارش پشتیبانی (برای مقایسه‌ی درستی موتورهای سریع‌تر)"""
+
+    def __init__(self, transactions):
+        self.transactions = [list(transaction) for transaction in transactions]
+
+    def count(self, itemsets):
+        return calculateItemsetSupport(itemsets, self.transactions)
+
+    def close(self):
+        pass
+
+
+# موتورهای قابل انتخاب برای شمارش پشتیبانی در apriori()
+SUPPORT_COUNTING_BACKENDS = {
+    'python': PythonSupportCounter,
+    'bitmap': BitmapSupportCounter,
+    'parallel': ParallelSupportCounter,
+    'hashtree': HashTreeSupportCounter,
+}
+
+
+def get_support_counter(backend, transactions, workers=None):
+    """ساخت موتور شمارش پشتیبانی بر اساس نام آن"""
+    try:
+        counter_class = SUPPORT_COUNTING_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown support counting backend: {backend}")
+    if counter_class is ParallelSupportCounter:
+        return counter_class(transactions, workers=workers)
+    return counter_class(transactions)
+
+
 def removeItemset(itemsets_support, min_support):
     """حذف آیتم‌ست‌هایی که پشتیبانی کافی ندارند"""
     frequent_itemsets = []
@@ -73,10 +118,11 @@ def calculateLift(antecedent_support, consequent_support, rule_support, total_tr
     return prob_rule / expected_support
 
 
-def generateAssociationRules(frequent_itemsets_with_support, transactions, min_conf):
+def generateAssociationRules(frequent_itemsets_with_support, transactions, min_conf, total_transactions=None):
     """تولید قوانین انجمنی با حداقل اعتماد مشخص‌شده"""
     rules = []
-    total_transactions = len(transactions)
+    if total_transactions is None:
+        total_transactions = len(transactions)
 
     # ایجاد دیکشنری lookup برای پشتیبانی آیتم‌ست‌ها
     frequent_lookup = {}
@@ -127,158 +173,204 @@ def generateAssociationRules(frequent_itemsets_with_support, transactions, min_c
     return rules
 
 
-def apriori(transactions, unique_items, max_k, min_support):
+def apriori(transactions, unique_items, max_k, min_support, backend='bitmap', workers=None):
     """اجرای الگوریتم Apriori برای یافتن آیتم‌ست‌های پرتکرار"""
     print(f"Starting Apriori with {len(transactions)} transactions, {len(unique_items)} unique items")
 
-    # ایجاد آیتم‌ست‌های تک‌عنصری
-    itemsets_1 = [(item,) for item in unique_items]
-    itemsets_1_support = calculateItemsetSupport(itemsets_1, transactions)
-    frequent_1 = removeItemset(itemsets_1_support, min_support)
+    # موتور شمارش یک بار ساخته می‌شود، در همه‌ی سطوح استفاده می‌شود و در پایان بسته می‌شود
+    with closing(get_support_counter(backend, transactions, workers=workers)) as counter:
+        print(f"Support counting backend: {backend}")
 
-    print(f"Frequent 1-itemsets: {len(frequent_1)} items")
+        # ایجاد آیتم‌ست‌های تک‌عنصری
+        itemsets_1 = [(item,) for item in unique_items]
+        itemsets_1_support = counter.count(itemsets_1)
+        frequent_1 = removeItemset(itemsets_1_support, min_support)
 
-    all_frequent_itemsets = [{itemset: itemsets_1_support[itemset] for itemset in frequent_1}]
-    current_frequent = frequent_1
+        print(f"Frequent 1-itemsets: {len(frequent_1)} items")
 
-    # ایجاد آیتم‌ست‌های با طول بیشتر
-    for k in range(2, max_k + 1):
-        if not current_frequent:
-            break
+        all_frequent_itemsets = [{itemset: itemsets_1_support[itemset] for itemset in frequent_1}]
+        current_frequent = frequent_1
 
-        candidates = generateCandidate(current_frequent, k)
+        # ایجاد آیتم‌ست‌های با طول بیشتر
+        for k in range(2, max_k + 1):
+            if not current_frequent:
+                break
+
+            candidates = generate_candidates(current_frequent, k)
 
-        if not candidates:
-            break
+            if not candidates:
+                break
 
-        print(f"Generated {len(candidates)} candidate {k}-itemsets")
+            print(f"Generated {len(candidates)} candidate {k}-itemsets")
 
-        candidate_support = calculateItemsetSupport(candidates, transactions)
-        frequent_k = removeItemset(candidate_support, min_support)
+            candidate_support = counter.count(candidates)
+            frequent_k = removeItemset(candidate_support, min_support)
 
-        if not frequent_k:
-            break
+            if not frequent_k:
+                break
 
-        print(f"Frequent {k}-itemsets: {len(frequent_k)} items")
+            print(f"Frequent {k}-itemsets: {len(frequent_k)} items")
 
-        all_frequent_itemsets.append({itemset: candidate_support[itemset] for itemset in frequent_k})
-        current_frequent = frequent_k
+            all_frequent_itemsets.append({itemset: candidate_support[itemset] for itemset in frequent_k})
+            current_frequent = frequent_k
 
     return all_frequent_itemsets
 
 
-def extract_frequent_patterns(min_support=0.01, min_confidence=0.5, max_k=3):
-    """استخراج الگوهای پرتکرار و ذخیره در پایگاه داده"""
-    csv_file_path = 'recommendations/data/order_items_data.csv'
+# الگوریتم‌های قابل انتخاب برای یافتن آیتم‌ست‌های پرتکرار
+MINING_ALGORITHMS = ('apriori', 'fpgrowth')
+
+
+def mine_frequent_itemsets(transactions, max_k, min_support, algorithm='apriori', backend='bitmap', workers=None):
+    """اجرای الگوریتم انتخاب‌شده؛ min_support بر حسب تعداد تراکنش است"""
+    if algorithm == 'fpgrowth':
+        print("Running FP-Growth algorithm...")
+        return fpgrowth(transactions, max_k, min_support)
+    if algorithm == 'apriori':
+        print("Running Apriori algorithm...")
+        unique_items = get_unique_items(transactions)
+        return apriori(transactions, unique_items, max_k, min_support, backend=backend, workers=workers)
+    raise ValueError(f"Unknown mining algorithm: {algorithm}")
+
+CSV_FILE_PATH = ORDER_ITEMS_CSV_PATH
+
+# منابع قابل انتخاب برای تراکنش‌ها: داده‌های ستونی خروجی، فایل CSV قدیمی یا خواندن جریانی از پایگاه داده
+TRANSACTION_SOURCES = ('store', 'csv', 'db')
+
+
+def load_transactions(csv_file_path=CSV_FILE_PATH, after_order_id=None, until_order_id=None, source='store'):
+    """بارگذاری تراکنش‌ها از داده‌های ستونی، CSV یا پایگاه داده؛ خروجی: (تراکنش‌ها، شناسه و تاریخ آخرین سفارش)"""
+    if source == 'db':
+        return load_transactions_from_db(after_order_id=after_order_id, until_order_id=until_order_id)
+    if source == 'store':
+        return load_transactions_from_store(after_order_id=after_order_id, until_order_id=until_order_id)
+    if source != 'csv':
+        raise ValueError(f"Unknown transaction source: {source}")
+
+    data = pd.read_csv(csv_file_path, usecols=['order_id', 'product_name', 'order_created_at', 'order_status'])
+
+    # مانند خواندن از پایگاه داده فقط سفارش‌های خریداری‌شده شمرده می‌شوند
+    data = data[data['order_status'].isin(Order.PURCHASED_STATUSES)]
+
+    # محدود کردن به بازه‌ی شناسه‌ی سفارش‌ها (برای حالت افزایشی)
+    if after_order_id is not None:
+        data = data[data['order_id'] > after_order_id]
+    if until_order_id is not None:
+        data = data[data['order_id'] <= until_order_id]
+
+    if data.empty:
+        return [], None, None
 
+    last_order_id = int(data['order_id'].max())
+    last_order_created_at = pd.to_datetime(data['order_created_at'], utc=True).max()
+    if pd.isna(last_order_created_at):
+        last_order_created_at = None
+    else:
+        last_order_created_at = last_order_created_at.to_pydatetime()
+
+    # ایجاد تراکنش‌ها بر اساس order_id
+    transactions_df = data.groupby('order_id')['product_name'].apply(list).reset_index()
+    transactions = transactions_df['product_name'].tolist()
+
+    # حذف تراکنش‌های خالی
+    transactions = [
+        [item.strip() for item in transaction if item and str(item).strip() != 'nan']
+        for transaction in transactions if transaction
+    ]
+    transactions = [t for t in transactions if len(t) > 0]
+
+    return transactions, last_order_id, last_order_created_at
+
+
+def get_unique_items(transactions):
+    """محصولات یکتای تراکنش‌ها"""
+    if isinstance(transactions, EncodedTransactions):
+        return list(transactions.items)
+
+    unique_items = set()
+    for transaction in transactions:
+        unique_items.update(transaction)
+    return list(unique_items)
+
+
+def save_association_rules(rules, total_transactions=0):
+    """ذخیره‌ی قوانین به صورت یک نسخه‌ی جدید و جابه‌جایی اتمیک به آن؛ خروجی تعداد قوانین ذخیره‌شده"""
+    # قوانین در نسخه‌ی جدید نوشته می‌شوند و خوانندگان تا پایان کار از نسخه‌ی قبلی می‌خوانند
+    print("Saving rules to a new rule set version...")
+    rule_set = RuleSetService.publish(rules, total_transactions=total_transactions)
+    print(f"Successfully saved {rule_set.total_rules} association rules (rule set {rule_set.id} is now active)")
+
+    # حذف نسخه‌های قدیمی در پس‌زمینه
     try:
-        # بارگذاری داده‌ها
-        print("Loading data...")
-        data = pd.read_csv(csv_file_path)
-
-        # ایجاد تراکنش‌ها بر اساس order_id
-        print("Creating transactions...")
-        transactions_df = data.groupby('order_id')['product_name'].apply(list).reset_index()
-        transactions = transactions_df['product_name'].tolist()
-
-        # حذف تراکنش‌های خالی
-        transactions = [
-            [item.strip() for item in transaction if item and str(item).strip() != 'nan']
-            for transaction in transactions if transaction
-        ]
-        transactions = [t for t in transactions if len(t) > 0]
-
-        print(f"Created {len(transactions)} transactions")
-
-        # یافتن محصولات یکتا
-        unique_items = set()
-        for transaction in transactions:
-            unique_items.update(transaction)
-        unique_items = list(unique_items)
+        purge_stale_rule_sets.delay()
+    except Exception as e:
+        print(f"Could not schedule purge of stale rule sets: {e}")
 
-        print(f"Found {len(unique_items)} unique products")
+    return rule_set.total_rules
 
-        # تنظیم پارامترها
-        min_support = max(1, len(transactions) * 0.01)
-        max_k = 3
-        min_confidence = 0.5
 
-        print(f"Parameters: min_support={min_support}, max_k={max_k}, min_confidence={min_confidence}")
+def print_sample_rules(rules, count=5):
+    """چاپ چند قانون نمونه"""
+    print("\nSample Association Rules:")
+    for i, rule in enumerate(rules[:count]):
+        antecedent_str = ", ".join(rule['antecedent'])
+        consequent_str = ", ".join(rule['consequent'])
+        print(f"{i + 1}. {antecedent_str} -> {consequent_str}")
+        print(f"   Support: {rule['support']:.3f}, Confidence: {rule['confidence']:.3f}, Lift: {rule['lift']:.3f}")
 
-        # اجرای الگوریتم Apriori
-        print("Running Apriori algorithm...")
-        frequent_itemsets = apriori(transactions, unique_items, max_k, min_support)
+
+def extract_frequent_patterns(min_support=0.01, min_confidence=0.5, max_k=3, backend='bitmap', algorithm='apriori',
+                              workers=None, source='store'):
+    """استخراج الگوهای پرتکرار و ذخیره در پایگاه داده"""
+    try:
+        if algorithm == 'fpgrowth' and source == 'db':
+            # سبدها دو بار به صورت جریانی از پایگاه داده خوانده می‌شوند و هیچ‌وقت همه با هم در حافظه نیستند
+            print("Streaming orders from the database into the FP-tree...")
+            print(f"Parameters: min_support={min_support}, max_k={max_k}, min_confidence={min_confidence}")
+            frequent_itemsets, total_transactions, unique_products = stream_fpgrowth(
+                lambda: (basket for _, basket in iter_order_baskets()), max_k, min_support
+            )
+        else:
+            # بارگذاری داده‌ها و ایجاد تراکنش‌ها بر اساس order_id
+            print("Loading data...")
+            transactions, _, _ = load_transactions(source=source)
+            total_transactions = len(transactions)
+
+            print(f"Created {total_transactions} transactions")
+
+            # یافتن محصولات یکتا
+            unique_products = len(get_unique_items(transactions))
+
+            print(f"Found {unique_products} unique products")
+
+            # min_support نسبت است و به تعداد تراکنش تبدیل می‌شود
+            support_count = support_threshold(min_support, total_transactions)
+
+            print(f"Parameters: min_support={min_support} ({support_count} transactions), "
+                  f"max_k={max_k}, min_confidence={min_confidence}")
+
+            frequent_itemsets = mine_frequent_itemsets(
+                transactions, max_k, support_count, algorithm=algorithm, backend=backend, workers=workers
+            )
 
         # تولید قوانین انجمنی
         print("Generating association rules...")
-        rules = generateAssociationRules(frequent_itemsets, transactions, min_confidence)
+        rules = generateAssociationRules(
+            frequent_itemsets, None, min_confidence, total_transactions=total_transactions
+        )
 
         print(f"Generated {len(rules)} association rules")
 
-        # حذف قوانین قبلی
-        print("Clearing existing rules...")
-        AssociationRule.objects.all().delete()
-
-        # ذخیره قوانین جدید در پایگاه داده
-        print("Saving rules to database...")
-        saved_count = 0
-
-        for rule_data in rules:
-            try:
-                association_rule = AssociationRule.objects.create(
-                    support=rule_data['support'],
-                    confidence=rule_data['confidence'],
-                    lift=rule_data['lift']
-                )
-
-                # ذخیره محصولات مقدم
-                for product_name in rule_data['antecedent']:
-                    product, created = Product.objects.get_or_create(
-                        name=product_name,
-                        defaults={'description': f'Product: {product_name}'}
-                    )
-
-                    RuleProduct.objects.create(
-                        rule=association_rule,
-                        product=product,
-                        is_antecedent=True
-                    )
-
-                # ذخیره محصولات تالی
-                for product_name in rule_data['consequent']:
-                    product, created = Product.objects.get_or_create(
-                        name=product_name,
-                        defaults={'description': f'Product: {product_name}'}
-                    )
-
-                    RuleProduct.objects.create(
-                        rule=association_rule,
-                        product=product,
-                        is_antecedent=False
-                    )
-
-                saved_count += 1
-
-            except Exception as e:
-                print(f"Error saving rule: {e}")
-                continue
-
-        print(f"Successfully saved {saved_count} association rules to database")
+        saved_count = save_association_rules(rules, total_transactions=total_transactions)
 
-        # چاپ چند قانون نمونه
-        print("\nSample Association Rules:")
-        for i, rule in enumerate(rules[:5]):
-            antecedent_str = ", ".join(rule['antecedent'])
-            consequent_str = ", ".join(rule['consequent'])
-            print(f"{i + 1}. {antecedent_str} -> {consequent_str}")
-            print(f"   Support: {rule['support']:.3f}, Confidence: {rule['confidence']:.3f}, Lift: {rule['lift']:.3f}")
+        print_sample_rules(rules)
 
         return {
             'success': True,
             'total_rules': len(rules),
             'saved_rules': saved_count,
-            'total_transactions': len(transactions),
-            'unique_products': len(unique_items)
+            'total_transactions': total_transactions,
+            'unique_products': unique_products
         }
 
     except Exception as e:
@@ -290,40 +382,12 @@ def extract_frequent_patterns(min_support=0.01, min_confidence=0.5, max_k=3):
 
 
 def get_product_recommendations(product_names, limit=5):
-    """دریافت توصیه محصول بر اساس قوانین انجمنی"""
+    """دریافت توصیه محصول بر اساس قوانین انجمنی (از ایندکس درون‌حافظه‌ای نسخه‌ی فعال)"""
     if not product_names:
         return []
 
     try:
-        # یافتن قوانینی که ورودی‌ها در قسمت مقدم آن‌ها باشند
-        antecedent_rules = AssociationRule.objects.filter(
-            products__product__name__in=product_names,
-            products__is_antecedent=True
-        ).distinct().order_by('-lift', '-confidence')
-
-        recommendations = []
-        seen_products = set(product_names)
-
-        for rule in antecedent_rules[:limit * 2]:
-            consequent_products = rule.products.filter(is_antecedent=False)
-
-            for rule_product in consequent_products:
-                if rule_product.product.name not in seen_products:
-                    recommendations.append({
-                        'product': rule_product.product,
-                        'confidence': rule.confidence,
-                        'lift': rule.lift,
-                        'support': rule.support
-                    })
-                    seen_products.add(rule_product.product.name)
-
-                    if len(recommendations) >= limit:
-                        break
-
-            if len(recommendations) >= limit:
-                break
-
-        return recommendations[:limit]
+        return get_rule_index().recommend(product_names, limit=limit)
 
     except Exception as e:
         print(f"Error getting recommendations: {e}")
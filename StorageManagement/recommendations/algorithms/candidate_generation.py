@@ -0,0 +1,156 @@
+# recommendations/algorithms/candidate_generation.py
+# تولید کاندیدهای Apriori با پیوند پیشوندی و شمارش پشتیبانی با درخت درهم‌سازی
+
+from itertools import groupby
+
+from recommendations.algorithms.support_counting import EncodedTransactions
+
+# تعداد شاخه‌های هر گره داخلی درخت درهم‌سازی
+HASH_TREE_BRANCHING = 31
+
+# حداکثر تعداد کاندید در هر برگ پیش از شکستن آن
+HASH_TREE_LEAF_SIZE = 32
+
+
+def generate_candidates(frequent_itemsets, k):
+    """
+    تولید کاندیدهای k تایی: فقط آیتم‌ست‌های (k-1) تایی با پیشوند (k-2) مشترک با هم پیوند می‌خورند
+    و هرس زیرمجموعه‌ها با یک مجموعه‌ی درهم‌سازی‌شده انجام می‌شود. خروجی مرتب است.
+    """
+    if k < 2:
+        return []
+
+    # آیتم‌ست‌ها مرتب نگه داشته می‌شوند تا هم‌پیشوندها کنار هم قرار بگیرند
+    previous = sorted({tuple(sorted(itemset)) for itemset in frequent_itemsets})
+    frequent_set = set(previous)
+
+    candidates = []
+    for prefix, group in groupby(previous, key=lambda itemset: itemset[:-1]):
+        last_items = [itemset[-1] for itemset in group]
+        for i, first in enumerate(last_items):
+            for second in last_items[i + 1:]:
+                candidate = prefix + (first, second)
+                # دو زیرمجموعه‌ی بدون first یا second همان والدها هستند؛ بقیه بررسی می‌شوند
+                if all(candidate[:j] + candidate[j + 1:] in frequent_set for j in range(k - 2)):
+                    candidates.append(candidate)
+
+    return candidates
+
+
+class _HashTreeNode:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        # children برای گره داخلی و entries (شناسه‌ها، جایگاه) برای برگ
+        self.children = None
+        self.entries = []
+
+
+class HashTree:
+    """درخت درهم‌سازی کاندیدهای k تایی (شناسه‌های عددی مرتب) برای یافتن کاندیدهای موجود در هر تراکنش"""
+
+    def __init__(self, k, branching=HASH_TREE_BRANCHING, leaf_size=HASH_TREE_LEAF_SIZE):
+        self.k = k
+        self.branching = branching
+        self.leaf_size = leaf_size
+        self.root = _HashTreeNode()
+
+    def insert(self, ids, position):
+        node = self.root
+        depth = 0
+        while node.children is not None:
+            bucket = ids[depth] % self.branching
+            child = node.children.get(bucket)
+            if child is None:
+                child = node.children[bucket] = _HashTreeNode()
+            node = child
+            depth += 1
+
+        node.entries.append((ids, position))
+        self._split_if_full(node, depth)
+
+    def _split_if_full(self, node, depth):
+        """شکستن برگ پر بر اساس آیتم جایگاه depth؛ برگ‌های عمق k دیگر شکسته نمی‌شوند"""
+        if len(node.entries) <= self.leaf_size or depth >= self.k:
+            return
+
+        node.children = {}
+        for ids, position in node.entries:
+            bucket = ids[depth] % self.branching
+            child = node.children.get(bucket)
+            if child is None:
+                child = node.children[bucket] = _HashTreeNode()
+            child.entries.append((ids, position))
+        node.entries = []
+
+        for child in node.children.values():
+            self._split_if_full(child, depth + 1)
+
+    def count_transaction(self, transaction, counts):
+        """افزایش شمارنده‌ی کاندیدهایی که زیرمجموعه‌ی تراکنش (شناسه‌های مرتب) هستند"""
+        k = self.k
+        if len(transaction) < k:
+            return
+
+        transaction_set = set(transaction)
+        visited = set()
+        stack = [(self.root, 0, 0)]
+        while stack:
+            node, start, depth = stack.pop()
+
+            if node.children is None:
+                # هر برگ در هر تراکنش فقط یک بار بررسی می‌شود
+                if id(node) in visited:
+                    continue
+                visited.add(id(node))
+                for ids, position in node.entries:
+                    if transaction_set.issuperset(ids):
+                        counts[position] += 1
+                continue
+
+            for i in range(start, len(transaction) - (k - depth) + 1):
+                child = node.children.get(transaction[i] % self.branching)
+                if child is not None:
+                    stack.append((child, i + 1, depth + 1))
+
+
+class HashTreeSupportCounter:
+    """شمارش پشتیبانی با عبور تراکنش‌ها از درخت درهم‌سازی کاندیدها (بدون ساخت بیت‌مپ)"""
+
+    def __init__(self, transactions):
+        self.encoded = EncodedTransactions.from_transactions(transactions)
+
+    def _rows(self):
+        indices = self.encoded.indices.tolist()
+        bounds = self.encoded.indptr.tolist()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            yield indices[start:end]
+
+    def count(self, itemsets):
+        itemsets = list(itemsets)
+        if not itemsets:
+            return {}
+
+        by_length = {}
+        for itemset in itemsets:
+            by_length.setdefault(len(itemset), []).append(itemset)
+
+        itemset_support = {}
+        unknown = self.encoded.n_items
+        for length, same_length in by_length.items():
+            tree = HashTree(length)
+            for position, ids in enumerate(self.encoded.encode_itemsets(same_length).tolist()):
+                # کاندید دارای آیتم ناشناخته در هیچ تراکنشی نیست
+                if unknown not in ids:
+                    tree.insert(tuple(sorted(ids)), position)
+
+            counts = [0] * len(same_length)
+            for transaction in self._rows():
+                tree.count_transaction(transaction, counts)
+            itemset_support.update(zip(same_length, counts))
+
+        return {itemset: itemset_support[itemset] for itemset in itemsets}
+
+    def close(self):
+        # درخت هر طول پس از شمارش رها می‌شود و منبعی برای آزادسازی نیست
+        pass
@@ -0,0 +1,240 @@
+# recommendations/algorithms/evaluation.py
+# ارزیابی آفلاین توصیه‌گرها با تقسیم زمانی سفارش‌ها: دقت، پوشش، تأخیر هر کاربر و زمان و حافظه‌ی آموزش
+
+import logging
+import time
+import tracemalloc
+
+import numpy as np
+
+from recommendations.algorithms.apriori import (
+    generateAssociationRules, mine_frequent_itemsets, support_threshold,
+)
+from recommendations.algorithms.copurchase_graph import CoPurchaseGraph
+from recommendations.algorithms.feature_store import read_order_items
+from recommendations.algorithms.mining_benchmark import StageTimer
+from recommendations.algorithms.product_recommendation import HybridRecommender, TRAINING_COLUMNS
+from recommendations.algorithms.rule_index import RuleIndex
+from recommendations.algorithms.support_counting import EncodedTransactions
+
+# توصیه‌گرهای قابل ارزیابی به ترتیب گزارش
+EVALUATED_RECOMMENDERS = ('hybrid', 'content', 'collaborative', 'association_rules', 'graph', 'popularity')
+
+
+class OfflineRecommender:
+    """رابط مشترک ارزیابی: fit روی ردیف‌های آموزش و recommend برای یک کاربر"""
+
+    def fit(self, train):
+        raise NotImplementedError
+
+    def recommend(self, user_id, n):
+        raise NotImplementedError
+
+
+class HybridOffline(OfflineRecommender):
+    """توصیه‌گر ترکیبی یا یکی از دو بخش آن (content یا collaborative)؛ بدون فیلتر موجودی انبار"""
+
+    def __init__(self, mode='hybrid', engine=None):
+        self.mode = mode
+        self.engine = engine
+
+    def fit(self, train):
+        self.recommender = HybridRecommender(engine=self.engine).fit(train.copy())
+        # تعداد سفارش‌های هر کاربر در داده‌ی آموزش به جای شمارش سفارش‌ها از پایگاه داده
+        self.order_counts = train.groupby('user_id')['order_id'].nunique().to_dict()
+        return self
+
+    def recommend(self, user_id, n):
+        if self.mode == 'content':
+            return [name for name, _ in self.recommender.get_content_recommendations(user_id, n)]
+        if self.mode == 'collaborative':
+            return self.recommender.get_collaborative_recommendations(user_id, n)
+
+        content_recs = self.recommender.get_content_recommendations(user_id, n)
+        collab_recs = self.recommender.get_collaborative_recommendations(user_id, n)
+        ranked, _ = self.recommender.blend_recommendations(
+            content_recs, collab_recs, self.order_counts.get(user_id, 0)
+        )
+        return [name for name, _ in ranked[:n]]
+
+
+class AssociationRulesOffline(OfflineRecommender):
+    """قوانین انجمنی کاوش‌شده روی سبدهای آموزش؛ سبد هر کاربر همه‌ی محصولات خریده‌شده‌ی اوست"""
+
+    def __init__(self, min_support=0.01, min_confidence=0.1, max_k=3):
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.max_k = max_k
+
+    def fit(self, train):
+        baskets = train.groupby('order_id', observed=True)['product_name'].apply(lambda names: list(set(names)))
+        transactions = EncodedTransactions.from_transactions(baskets)
+        levels = mine_frequent_itemsets(
+            transactions, self.max_k, support_threshold(self.min_support, len(transactions))
+        )
+        rules = generateAssociationRules(levels, None, self.min_confidence, total_transactions=len(transactions))
+        self.index = RuleIndex.from_rules(rules)
+        self.histories = train.groupby('user_id')['product_name'].apply(set).to_dict()
+        return self
+
+    def recommend(self, user_id, n):
+        return [rule['product'] for rule in self.index.recommend(self.histories.get(user_id, ()), limit=n)]
+
+
+class GraphOffline(OfflineRecommender):
+    """personalized PageRank روی گراف هم‌خریدی سبدهای آموزش، از محصولات خریده‌شده‌ی هر کاربر"""
+
+    def fit(self, train):
+        baskets = train.groupby('order_id', observed=True)['product_name'].apply(lambda names: list(set(names)))
+        self.graph = CoPurchaseGraph.build(EncodedTransactions.from_transactions(baskets))
+        purchases = train.groupby(['user_id', 'product_name'], observed=True)['order_item_quantity'].sum()
+        self.seeds = {}
+        for (user_id, product_name), quantity in purchases.items():
+            self.seeds.setdefault(user_id, {})[product_name] = quantity
+        return self
+
+    def recommend(self, user_id, n):
+        return [name for name, _ in self.graph.recommend(self.seeds.get(user_id, {}), n)]
+
+
+class PopularityOffline(OfflineRecommender):
+    """پرفروش‌ترین محصولات داده‌ی آموزش برای همه‌ی کاربران (مثل popular_recommendations)"""
+
+    def fit(self, train):
+        counts = train['product_name'].value_counts(sort=False)
+        counts = counts[counts > 0]
+        # ترتیب ثابت برای تعداد برابر
+        self.ranked = sorted(counts.items(), key=lambda x: (-x[1], x[0]))
+        return self
+
+    def recommend(self, user_id, n):
+        return [name for name, _ in self.ranked[:n]]
+
+
+def build_offline_recommender(name, engine=None, min_support=0.01, min_confidence=0.1):
+    if name in ('hybrid', 'content', 'collaborative'):
+        return HybridOffline(mode=name, engine=engine)
+    if name == 'association_rules':
+        return AssociationRulesOffline(min_support=min_support, min_confidence=min_confidence)
+    if name == 'graph':
+        return GraphOffline()
+    if name == 'popularity':
+        return PopularityOffline()
+    raise ValueError(f"Unknown recommender '{name}', expected one of {EVALUATED_RECOMMENDERS}")
+
+
+def time_split(df, test_fraction=0.2):
+    """
+    تقسیم زمانی ردیف‌ها: سفارش‌های ثبت‌شده از زمان مرز به بعد داده‌ی آزمون هستند.
+    مرز چندک (1 - test_fraction) زمان سفارش‌هاست تا حدود test_fraction سفارش‌ها در آزمون باشند
+    """
+    orders = df.drop_duplicates('order_id')['order_created_at'].dropna()
+    if orders.empty:
+        raise ValueError("No dated orders to split")
+    cutoff = orders.quantile(1 - test_fraction)
+    is_test = df['order_created_at'] >= cutoff
+    return df[~is_test], df[is_test], cutoff
+
+
+def relevant_items(train, test):
+    """محصولات هر کاربر در داده‌ی آزمون که در داده‌ی آموزش نخریده بود؛ فقط کاربرانی که در آموزش هستند"""
+    history = train.groupby('user_id')['product_name'].apply(set).to_dict()
+    relevant = {}
+    for user_id, names in test.groupby('user_id')['product_name'].apply(set).items():
+        if user_id in history:
+            new_items = names - history[user_id]
+            if new_items:
+                relevant[user_id] = new_items
+    return relevant
+
+
+def evaluate_recommender(recommender, train, relevant, k, catalog_size, trace_memory=True):
+    """آموزش و ارزیابی یک توصیه‌گر؛ خروجی دیکشنری معیارها"""
+    timer = StageTimer(trace_memory=trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with timer.stage('training'):
+            recommender.fit(train)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    precisions = []
+    recalls = []
+    latencies = []
+    recommended = set()
+    empty = 0
+    for user_id, items in relevant.items():
+        start = time.perf_counter()
+        recommendations = recommender.recommend(user_id, k)[:k]
+        latencies.append(time.perf_counter() - start)
+
+        if not recommendations:
+            empty += 1
+        recommended.update(recommendations)
+        hits = len(items.intersection(recommendations))
+        precisions.append(hits / k)
+        recalls.append(hits / len(items))
+
+    latencies = np.array(latencies) * 1000
+    return {
+        f'precision_at_{k}': float(np.mean(precisions)),
+        f'recall_at_{k}': float(np.mean(recalls)),
+        'coverage': len(recommended) / catalog_size if catalog_size else 0.0,
+        'users_without_recommendations': empty,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'mean': float(latencies.mean()),
+        },
+        'training': timer.stages['training'],
+    }
+
+
+def run_evaluation(recommenders=EVALUATED_RECOMMENDERS, k=10, test_fraction=0.2, max_users=1000, engine=None,
+                   min_support=0.01, min_confidence=0.1, trace_memory=True, seed=0):
+    """
+    تقسیم زمانی ردیف‌های سفارش (پرداخت‌شده یا تحویل‌شده)، آموزش هر توصیه‌گر روی بخش آموزش
+    و سنجش روی خریدهای جدید حداکثر max_users کاربر نمونه در بخش آزمون
+    """
+    df = read_order_items(TRAINING_COLUMNS + ['order_id', 'order_created_at'])
+    df = HybridRecommender().clean_data(df.dropna(subset=['user_id', 'product_name']))
+    train, test, cutoff = time_split(df, test_fraction)
+
+    relevant = relevant_items(train, test)
+    if not relevant:
+        raise ValueError("No test users with new purchases after the split")
+    if max_users and len(relevant) > max_users:
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(sorted(relevant), size=max_users, replace=False)
+        relevant = {user_id: relevant[user_id] for user_id in sorted(sample.tolist())}
+
+    catalog_size = int(train['product_name'].nunique())
+    results = {}
+
+    # لاگ هر درخواست در زمان‌سنجی حساب نمی‌شود
+    logging.disable(logging.INFO)
+    try:
+        for name in recommenders:
+            recommender = build_offline_recommender(
+                name, engine=engine, min_support=min_support, min_confidence=min_confidence
+            )
+            results[name] = evaluate_recommender(
+                recommender, train, relevant, k, catalog_size, trace_memory=trace_memory
+            )
+    finally:
+        logging.disable(logging.NOTSET)
+
+    return {
+        'split': {
+            'cutoff': cutoff.isoformat(),
+            'train_rows': int(len(train)),
+            'test_rows': int(len(test)),
+            'train_orders': int(train['order_id'].nunique()),
+            'test_orders': int(test['order_id'].nunique()),
+            'catalog_size': catalog_size,
+            'evaluated_users': len(relevant),
+        },
+        'results': results,
+    }
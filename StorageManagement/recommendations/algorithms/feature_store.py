@@ -0,0 +1,267 @@
+# recommendations/algorithms/feature_store.py
+# ذخیره‌ی ستونی داده‌های سفارش‌ها برای الگوریتم‌های توصیه: هر ستون یک آرایه‌ی .npy قابل memory-map
+# ستون‌های متنی با دیکشنری کدگذاری می‌شوند (آرایه‌ی کدها + جدول مقادیر یکتا) و به صورت Categorical خوانده می‌شوند
+
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from recommendations.algorithms.model_artifact import create_version, latest_version, load_artifact, publish_version
+
+logger = logging.getLogger(__name__)
+
+# ریشه‌ی پوشه‌ی داده‌های ستونی و نام مجموعه‌ی ردیف‌های سفارش
+FEATURE_STORE_ROOT = 'recommendations/data/features'
+ORDER_ITEMS = 'order_items'
+
+# تعداد نسخه‌های نگه‌داشته‌شده؛ خواننده‌ها تا پایان کار نسخه‌ی قبلی را map کرده‌اند
+FEATURE_STORE_KEEP_VERSIONS = 2
+
+# تعداد ردیف‌های هر بار کپی از فایل خام به آرایه‌ی نهایی هنگام انتشار
+COPY_CHUNK_SIZE = 1_000_000
+
+# خروجی متنی قدیمی؛ تا اولین اجرای خروجی ستونی به عنوان جایگزین خوانده می‌شود
+ORDER_ITEMS_CSV_PATH = 'recommendations/data/order_items_data.csv'
+
+# نوع هر ستون: category (کدگذاری دیکشنری)، int، float، bool یا datetime (UTC)
+ORDER_ITEM_COLUMNS = {
+    # اطلاعات کاربر
+    'user_id': 'int',
+    'user_email': 'category',
+    'user_phone': 'category',
+    'first_name': 'category',
+    'last_name': 'category',
+    # اطلاعات آدرس
+    'province': 'category',
+    'city': 'category',
+    # اطلاعات محصول
+    'product_name': 'category',
+    'product_avg_score': 'float',
+    'product_categories': 'category',
+    # اطلاعات ویژگی محصول
+    'size': 'category',
+    'color': 'category',
+    'buy_price': 'float',
+    'sell_price': 'float',
+    'weight': 'float',
+    'can_sale': 'bool',
+    'total_stock': 'int',
+    # اطلاعات سفارش
+    'order_id': 'int',
+    'order_status': 'category',
+    'payment_method': 'category',
+    'order_total_price': 'float',
+    'order_discount': 'float',
+    'order_tax': 'float',
+    'order_shipping_price': 'float',
+    'order_final_price': 'float',
+    'order_created_at': 'datetime',
+    'order_paid_at': 'datetime',
+    'order_shipped_at': 'datetime',
+    'order_tracking_code': 'category',
+    # اطلاعات آیتم سفارش
+    'order_item_quantity': 'int',
+    'order_item_price': 'float',
+    'order_item_discount': 'float',
+    'order_item_total_price': 'float',
+    # اطلاعات امتیاز
+    'user_rating': 'float',
+    'rating_date': 'datetime',
+}
+
+
+def decode_column(name, arrays, kind):
+    if kind == 'category':
+        return pd.Categorical.from_codes(arrays[f'{name}_codes'], categories=arrays[f'{name}_values'])
+    if kind == 'datetime':
+        return pd.Series(arrays[name]).dt.tz_localize('UTC')
+    return arrays[name]
+
+
+def array_names(name, kind):
+    return [f'{name}_codes', f'{name}_values'] if kind == 'category' else [name]
+
+
+def _code_dtype(size):
+    # مثل pd.Categorical کوچک‌ترین نوع صحیح علامت‌دار که -1 (خالی) را هم جا دهد
+    for dtype in (np.int8, np.int16, np.int32):
+        if size < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class OrderItemsWriter:
+    """
+    نوشتن ستون‌های ردیف‌های سفارش بخش به بخش در یک نسخه‌ی جدید: هر بخش کدگذاری و به فایل خام
+    همان ستون اضافه می‌شود و close() آرایه‌های نهایی را می‌سازد و نسخه را منتشر می‌کند.
+    حافظه به اندازه‌ی یک بخش و جدول مقادیر یکتای ستون‌های متنی است.
+    """
+
+    def __init__(self, root=FEATURE_STORE_ROOT):
+        self.root = root
+        self.rows = 0
+        self.version, self.temp_dir = create_version(ORDER_ITEMS, root)
+        # دیکشنری مقدار -> کد هر ستون متنی که با دیدن مقادیر جدید بزرگ می‌شود
+        self.categories = {name: {} for name, kind in ORDER_ITEM_COLUMNS.items() if kind == 'category'}
+        # ستون‌های int/bool بدون مقدار خالی در پایان به نوع اصلی برمی‌گردند
+        self.has_nulls = {name: False for name in ORDER_ITEM_COLUMNS}
+        self.files = {name: open(self._raw_path(name), 'wb') for name in ORDER_ITEM_COLUMNS}
+
+    def _raw_path(self, name):
+        return os.path.join(self.temp_dir, f'.{name}.raw')
+
+    @staticmethod
+    def _raw_dtype(kind):
+        if kind == 'category':
+            return np.int64
+        if kind == 'datetime':
+            return np.dtype('datetime64[ns]')
+        return np.float64
+
+    def append(self, columns):
+        """اضافه کردن یک بخش (دیکشنری نام ستون -> لیست مقادیر، None برای خالی)"""
+        rows = len(columns['order_id'])
+        for name, kind in ORDER_ITEM_COLUMNS.items():
+            values = columns[name]
+            if len(values) != rows:
+                raise ValueError(f"Column '{name}' has {len(values)} values, expected {rows}")
+
+            if kind == 'category':
+                codes = self.categories[name]
+                array = np.fromiter(
+                    (-1 if value is None else codes.setdefault(str(value), len(codes)) for value in values),
+                    dtype=np.int64, count=rows
+                )
+            elif kind == 'datetime':
+                stamps = pd.to_datetime(pd.Series(values, dtype=object), utc=True)
+                array = stamps.dt.tz_convert(None).to_numpy(dtype='datetime64[ns]')
+            else:
+                # مقادیر خالی مثل read_csv به NaN تبدیل می‌شوند
+                array = np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+                self.has_nulls[name] = self.has_nulls[name] or any(value is None for value in values)
+            array.tofile(self.files[name])
+
+        self.rows += rows
+
+    def _finish_column(self, name, kind):
+        """ساخت آرایه‌های .npy نهایی یک ستون از فایل خام، COPY_CHUNK_SIZE ردیف در هر بار"""
+        raw_path = self._raw_path(name)
+        raw = np.memmap(raw_path, dtype=self._raw_dtype(kind), mode='r', shape=(self.rows,)) if self.rows else None
+
+        if kind == 'category':
+            # مقادیر مثل pd.Categorical مرتب می‌شوند؛ remap[-1] کد خالی را -1 نگه می‌دارد
+            values = sorted(self.categories[name])
+            remap = np.empty(len(values) + 1, dtype=np.int64)
+            remap[[self.categories[name][value] for value in values]] = np.arange(len(values))
+            remap[-1] = -1
+            outputs = {f'{name}_codes': (_code_dtype(len(values)), lambda part: remap[part])}
+            np.save(os.path.join(self.temp_dir, f'{name}_values.npy'), np.asarray(values, dtype=str), allow_pickle=False)
+        elif kind in ('int', 'bool') and not self.has_nulls[name]:
+            outputs = {name: (np.int64 if kind == 'int' else bool, lambda part: part)}
+        else:
+            outputs = {name: (self._raw_dtype(kind), lambda part: part)}
+
+        for array_name, (dtype, convert) in outputs.items():
+            path = os.path.join(self.temp_dir, f'{array_name}.npy')
+            if not self.rows:
+                np.save(path, np.empty(0, dtype=dtype), allow_pickle=False)
+                continue
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(self.rows,))
+            for start in range(0, self.rows, COPY_CHUNK_SIZE):
+                out[start:start + COPY_CHUNK_SIZE] = convert(raw[start:start + COPY_CHUNK_SIZE])
+            out.flush()
+            del out
+
+        del raw
+        os.remove(raw_path)
+        return array_names(name, kind)
+
+    def close(self):
+        """ساخت آرایه‌های نهایی و جابه‌جایی اتمیک LATEST به نسخه‌ی جدید؛ خروجی نام نسخه"""
+        for f in self.files.values():
+            f.close()
+
+        try:
+            names = [
+                array_name
+                for name, kind in ORDER_ITEM_COLUMNS.items()
+                for array_name in self._finish_column(name, kind)
+            ]
+        except Exception:
+            self.discard()
+            raise
+
+        return publish_version(
+            ORDER_ITEMS,
+            self.version,
+            self.temp_dir,
+            names,
+            meta={
+                'created_at': timezone.now().isoformat(),
+                'rows': self.rows,
+                'columns': ORDER_ITEM_COLUMNS,
+            },
+            root=self.root,
+            keep=FEATURE_STORE_KEEP_VERSIONS
+        )
+
+    def discard(self):
+        """رها کردن نسخه‌ی نیمه‌کاره؛ خوانندگان همچنان نسخه‌ی قبلی را می‌بینند"""
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def write_order_items(columns, root=FEATURE_STORE_ROOT):
+    """نوشتن ستون‌های ردیف‌های سفارش (دیکشنری نام ستون -> لیست مقادیر) در یک نسخه‌ی جدید؛ خروجی نام نسخه"""
+    writer = OrderItemsWriter(root=root)
+    try:
+        writer.append(columns)
+    except Exception:
+        writer.discard()
+        raise
+    return writer.close()
+
+
+def read_order_items(columns=None, version=None, root=FEATURE_STORE_ROOT, csv_file_path=ORDER_ITEMS_CSV_PATH):
+    """
+    خواندن فقط ستون‌های خواسته‌شده از آخرین نسخه (memory-map)؛ ستون‌های متنی Categorical هستند.
+    اگر هنوز خروجی ستونی ساخته نشده باشد از CSV قدیمی خوانده می‌شود.
+    """
+    columns = list(columns or ORDER_ITEM_COLUMNS)
+    unknown = [name for name in columns if name not in ORDER_ITEM_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown order item columns: {unknown}")
+
+    names = [array_name for name in columns for array_name in array_names(name, ORDER_ITEM_COLUMNS[name])]
+    artifact = load_artifact(ORDER_ITEMS, version, root=root, names=names)
+    if artifact is None:
+        logger.warning(f"No columnar order items found, reading {csv_file_path} (run export_csv_from_models)")
+        df = pd.read_csv(
+            csv_file_path,
+            usecols=columns,
+            dtype={name: 'category' for name in columns if ORDER_ITEM_COLUMNS[name] == 'category'}
+        )[columns]
+        for name in columns:
+            if ORDER_ITEM_COLUMNS[name] == 'datetime':
+                df[name] = pd.to_datetime(df[name], utc=True, format='ISO8601')
+        return df
+
+    arrays, meta = artifact
+    # copy=False تا ستون‌های عددی همان آرایه‌های map شده بمانند
+    return pd.DataFrame({name: decode_column(name, arrays, meta['columns'][name]) for name in columns}, copy=False)
+
+
+def order_items_version(root=FEATURE_STORE_ROOT, csv_file_path=ORDER_ITEMS_CSV_PATH):
+    """نام آخرین نسخه‌ی ردیف‌های سفارش؛ بدون خروجی ستونی، زمان تغییر فایل CSV (یا None)"""
+    version = latest_version(ORDER_ITEMS, root)
+    if version is not None:
+        return version
+    try:
+        return f'csv@{os.path.getmtime(csv_file_path)}'
+    except OSError:
+        return None
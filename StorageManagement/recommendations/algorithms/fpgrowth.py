@@ -0,0 +1,176 @@
+# recommendations/algorithms/fpgrowth.py
+# الگوریتم FP-Growth برای یافتن آیتم‌ست‌های پرتکرار بدون تولید کاندید
+
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from recommendations.algorithms.support_counting import EncodedTransactions, support_threshold
+
+
+class FPTree:
+    """درخت FP؛ گره‌ها در لیست‌های موازی نگه داشته می‌شوند تا سربار اشیای پایتون کم باشد"""
+
+    def __init__(self):
+        # گره صفر ریشه است
+        self.items = [-1]
+        self.counts = [0]
+        self.parents = [-1]
+        self.children = [{}]
+        # جدول سرآیند: آیتم -> لیست گره‌های آن آیتم
+        self.header = {}
+
+    def insert(self, path, count=1):
+        """افزودن یک مسیر مرتب‌شده (بر اساس رتبه‌ی تکرار) به درخت"""
+        node = 0
+        for item in path:
+            child = self.children[node].get(item)
+            if child is None:
+                child = len(self.items)
+                self.items.append(item)
+                self.counts.append(0)
+                self.parents.append(node)
+                self.children.append({})
+                self.children[node][item] = child
+                self.header.setdefault(item, []).append(child)
+            self.counts[child] += count
+            node = child
+
+    def prefix_path(self, node):
+        """مسیر از ریشه تا والد گره (بدون خود گره)"""
+        path = []
+        node = self.parents[node]
+        while node > 0:
+            path.append(self.items[node])
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self):
+        return len(self.items) - 1
+
+
+def _mine_tree(tree, suffix, min_support, max_k, results):
+    """استخراج بازگشتی آیتم‌ست‌ها از درخت‌های شرطی"""
+    for item, nodes in tree.header.items():
+        support = sum(tree.counts[node] for node in nodes)
+        if support < min_support:
+            continue
+
+        itemset = suffix + (item,)
+        results[len(itemset)][itemset] = support
+
+        if len(itemset) >= max_k:
+            continue
+
+        # پایگاه الگوی شرطی: مسیرهای پیشوندی هر گره با وزن تعداد آن گره
+        pattern_base = [(tree.prefix_path(node), tree.counts[node]) for node in nodes]
+
+        item_counts = defaultdict(int)
+        for path, count in pattern_base:
+            for path_item in path:
+                item_counts[path_item] += count
+
+        frequent = {path_item for path_item, count in item_counts.items() if count >= min_support}
+        if not frequent:
+            continue
+
+        conditional_tree = FPTree()
+        for path, count in pattern_base:
+            filtered_path = [path_item for path_item in path if path_item in frequent]
+            if filtered_path:
+                conditional_tree.insert(filtered_path, count)
+
+        _mine_tree(conditional_tree, itemset, min_support, max_k, results)
+
+
+def build_fp_tree(encoded, min_support):
+    """ساخت درخت FP از تراکنش‌های کدگذاری‌شده؛ شمارش آیتم‌ها روی آرایه‌ها انجام می‌شود"""
+    item_counts = np.bincount(encoded.indices, minlength=encoded.n_items)
+    frequent_mask = item_counts >= min_support
+
+    # رتبه‌ی هر آیتم پرتکرار (پرتکرارترین = صفر)؛ آیتم‌های کم‌تکرار رتبه‌ی -1 دارند
+    frequent_ids = np.flatnonzero(frequent_mask)
+    order = frequent_ids[np.lexsort((frequent_ids, -item_counts[frequent_ids]))]
+    rank = np.full(encoded.n_items, -1, dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    tree = FPTree()
+    indptr = encoded.indptr.tolist()
+    item_rank = rank[encoded.indices]
+
+    for start, end in zip(indptr[:-1], indptr[1:]):
+        ranks = item_rank[start:end]
+        ranks = np.sort(ranks[ranks >= 0])
+        if len(ranks):
+            tree.insert(order[ranks].tolist())
+
+    return tree
+
+
+def _named_levels(results, items, max_k):
+    """تبدیل شناسه‌ها به نام محصولات و مرتب‌سازی هر آیتم‌ست، مانند خروجی apriori"""
+    all_frequent_itemsets = []
+    for k in range(1, max_k + 1):
+        if k > 1 and not results.get(k):
+            break
+        level = {
+            tuple(sorted(items[item_id] for item_id in itemset)): support
+            for itemset, support in results[k].items()
+        }
+        print(f"Frequent {k}-itemsets: {len(level)} items")
+        all_frequent_itemsets.append(level)
+    return all_frequent_itemsets
+
+
+def fpgrowth(transactions, max_k, min_support):
+    """
+    اجرای FP-Growth روی تراکنش‌های در حافظه (داده‌های ستونی یا CSV)؛ تراکنش‌ها یک بار به آرایه‌های CSR
+    کدگذاری می‌شوند. برای خواندن جریانی از پایگاه داده stream_fpgrowth را ببینید.
+    خروجی همان ساختار apriori() است: [{itemset: support}, ...]
+    """
+    encoded = EncodedTransactions.from_transactions(transactions)
+    print(f"Starting FP-Growth with {len(encoded)} transactions, {encoded.n_items} unique items")
+
+    tree = build_fp_tree(encoded, min_support)
+    print(f"FP-tree built with {len(tree)} nodes")
+
+    results = defaultdict(dict)
+    _mine_tree(tree, (), min_support, max_k, results)
+    return _named_levels(results, encoded.items, max_k)
+
+
+def stream_fpgrowth(make_baskets, max_k, min_support):
+    """
+    FP-Growth بدون نگه‌داشتن تراکنش‌ها در حافظه: یک پیمایش برای شمارش آیتم‌ها و پیمایش دوم برای
+    افزودن هر سبد به درخت؛ حافظه فقط به اندازه‌ی درخت فشرده و شمارش آیتم‌هاست.
+    make_baskets: تابعی که هر بار یک iterator تازه از سبدهای خرید (لیست نام محصولات) می‌دهد
+    min_support: نسبت حداقل پشتیبانی
+    خروجی: (سطوح [{itemset: support}]، تعداد تراکنش‌ها، تعداد محصولات یکتا)
+    """
+    item_counts = Counter()
+    total_transactions = 0
+    for basket in make_baskets():
+        item_counts.update(set(basket))
+        total_transactions += 1
+
+    min_support_count = support_threshold(min_support, total_transactions)
+    print(f"Starting FP-Growth with {total_transactions} transactions, {len(item_counts)} unique items")
+
+    # پرتکرارترین آیتم رتبه‌ی صفر را دارد؛ ترتیب ثابت برای آیتم‌های هم‌تکرار
+    items = sorted(
+        (item for item, count in item_counts.items() if count >= min_support_count),
+        key=lambda item: (-item_counts[item], item)
+    )
+    rank = {item: item_rank for item_rank, item in enumerate(items)}
+
+    tree = FPTree()
+    for basket in make_baskets():
+        path = sorted({rank[item] for item in basket if item in rank})
+        if path:
+            tree.insert(path)
+    print(f"FP-tree built with {len(tree)} nodes")
+
+    results = defaultdict(dict)
+    _mine_tree(tree, (), min_support_count, max_k, results)
+    return _named_levels(results, items, max_k), total_transactions, len(item_counts)
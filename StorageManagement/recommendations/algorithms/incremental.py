@@ -0,0 +1,226 @@
+# recommendations/algorithms/incremental.py
+# به‌روزرسانی افزایشی آیتم‌ست‌های پرتکرار (روش FUP) فقط با سفارش‌های جدید
+
+from contextlib import closing
+
+from django.db import transaction
+
+from recommendations.algorithms.apriori import (
+    apriori, generateAssociationRules, get_support_counter,
+    load_transactions, get_unique_items, save_association_rules, print_sample_rules, support_threshold, CSV_FILE_PATH,
+)
+from recommendations.algorithms.candidate_generation import generate_candidates
+from recommendations.algorithms.transaction_sources import load_transactions_from_db, pending_order_ids, paid_order_ids
+from recommendations.models import FrequentItemset, MiningState
+
+
+def fup_update(old_frequent, old_total, delta_transactions, min_support, max_k, rescan, backend='bitmap',
+               workers=None):
+    """
+    به‌روزرسانی آیتم‌ست‌های پرتکرار با الگوریتم FUP.
+    old_frequent: {itemset: support} آیتم‌ست‌های پرتکرار داده‌های قبلی
+    rescan: تابعی که پشتیبانی آیتم‌ست‌های داده‌شده را در داده‌های قبلی می‌شمارد
+    خروجی: (لیست سطوح [{itemset: support}]، تعداد کل تراکنش‌ها، تعداد آیتم‌ست‌های بازشماری‌شده)
+    """
+    delta_total = len(delta_transactions)
+    new_total = old_total + delta_total
+    threshold = support_threshold(min_support, new_total)
+    delta_threshold = min_support * delta_total
+
+    with closing(get_support_counter(backend, delta_transactions, workers=workers)) as delta_counter:
+        all_frequent_itemsets = []
+        current_frequent = None
+        rescanned = 0
+
+        for k in range(1, max_k + 1):
+            old_level = {itemset: support for itemset, support in old_frequent.items() if len(itemset) == k}
+
+            if k == 1:
+                # کاندیدهای تک‌عنصری: آیتم‌های سفارش‌های جدید به‌علاوه‌ی آیتم‌های پرتکرار قبلی
+                delta_items = get_unique_items(delta_transactions)
+                candidates = sorted({(item,) for item in delta_items} | set(old_level))
+            else:
+                candidates = generate_candidates(current_frequent, k)
+
+            if not candidates:
+                break
+
+            delta_support = delta_counter.count(candidates)
+            level = {}
+            needs_rescan = []
+
+            for itemset in candidates:
+                if itemset in old_level:
+                    # قبلاً پرتکرار بوده: پشتیبانی قبلی معلوم است
+                    support = old_level[itemset] + delta_support[itemset]
+                    if support >= threshold:
+                        level[itemset] = support
+                elif delta_support[itemset] > 0 and delta_support[itemset] >= delta_threshold:
+                    # قبلاً پرتکرار نبوده؛ فقط اگر در داده‌های جدید پرتکرار باشد ممکن است از آستانه عبور کند
+                    needs_rescan.append(itemset)
+
+            if needs_rescan:
+                old_support = rescan(needs_rescan)
+                rescanned += len(needs_rescan)
+                for itemset in needs_rescan:
+                    support = old_support.get(itemset, 0) + delta_support[itemset]
+                    if support >= threshold:
+                        level[itemset] = support
+
+            if k > 1 and not level:
+                break
+
+            print(f"Frequent {k}-itemsets: {len(level)} items ({len(needs_rescan)} rescanned)")
+            all_frequent_itemsets.append(level)
+            current_frequent = list(level)
+
+    return all_frequent_itemsets, new_total, rescanned
+
+
+def load_frequent_itemsets():
+    """بارگذاری آیتم‌ست‌های پرتکرار ذخیره‌شده به صورت {itemset: support}"""
+    return {
+        tuple(items): support_count
+        for items, support_count in FrequentItemset.objects.values_list('items', 'support_count')
+    }
+
+
+def save_mining_state(frequent_itemsets, total_transactions, last_order_id, min_support, max_k, source,
+                      pending=()):
+    """ذخیره‌ی آیتم‌ست‌های پرتکرار و نقطه‌ی پایان پردازش (high-water mark)"""
+    with transaction.atomic():
+        FrequentItemset.objects.all().delete()
+        FrequentItemset.objects.bulk_create(
+            [
+                FrequentItemset(items=list(itemset), size=len(itemset), support_count=support)
+                for level in frequent_itemsets
+                for itemset, support in level.items()
+            ],
+            batch_size=1000
+        )
+        MiningState.objects.all().delete()
+        MiningState.objects.create(
+            last_order_id=last_order_id,
+            pending_order_ids=list(pending),
+            total_transactions=total_transactions,
+            min_support=min_support,
+            max_k=max_k,
+            source=source
+        )
+
+
+def is_compatible(state, min_support, max_k, source):
+    """آیا نتیجه‌ی اجرای قبلی با همین پارامترها و همین منبع ساخته شده است"""
+    return (
+        state is not None and state.min_support == min_support and state.max_k == max_k
+        and state.source == source
+    )
+
+
+def extract_frequent_patterns_incrementally(min_support=0.01, min_confidence=0.5, max_k=3, backend='bitmap',
+                                            csv_file_path=CSV_FILE_PATH, workers=None, source='store',
+                                            rebuild=False):
+    """
+    استخراج افزایشی الگوها: فقط سفارش‌های بعد از آخرین اجرا شمرده می‌شوند.
+    در منبع db سفارش‌های در انتظارِ زیر high-water mark که پس از آن پرداخت شده‌اند هم به داده‌های جدید اضافه می‌شوند.
+    FUP فقط افزودن را پوشش می‌دهد (لغو سفارش‌های شمرده‌شده نه)، پس rebuild دوره‌ای پایه را از ابتدا می‌سازد
+    """
+    try:
+        state = MiningState.objects.first()
+
+        # در اولین اجرا، با تغییر پارامترها یا منبع، یا با درخواست بازسازی، پایه از ابتدا ساخته می‌شود
+        if rebuild or not is_compatible(state, min_support, max_k, source):
+            print("Rebuilding frequent itemsets from the full order history...")
+            transactions, last_order_id, _ = load_transactions(csv_file_path, source=source)
+            unique_items = get_unique_items(transactions)
+            threshold = support_threshold(min_support, len(transactions))
+            frequent_itemsets = apriori(
+                transactions, unique_items, max_k, threshold, backend=backend, workers=workers
+            )
+            total_transactions = len(transactions)
+            delta_count = total_transactions
+            rescanned = 0
+            last_order_id = last_order_id or 0
+        else:
+            # سفارش‌هایی که در اجرای قبلی در انتظار پرداخت بودند و اکنون پرداخت شده‌اند
+            late_order_ids = paid_order_ids(state.pending_order_ids) if source == 'db' else []
+            print(f"Loading orders after order {state.last_order_id} ({len(late_order_ids)} paid late)...")
+            if source == 'db':
+                delta, last_order_id, _ = load_transactions_from_db(
+                    after_order_id=state.last_order_id, include_order_ids=late_order_ids
+                )
+            else:
+                delta, last_order_id, _ = load_transactions(
+                    csv_file_path, after_order_id=state.last_order_id, source=source
+                )
+            delta_count = len(delta)
+            # سفارش‌های دیرپرداخت شناسه‌ی کوچک‌تری از high-water mark دارند
+            last_order_id = max(last_order_id or 0, state.last_order_id)
+
+            if not delta:
+                print("No new orders since last run")
+                return {
+                    'success': True,
+                    'total_rules': 0,
+                    'saved_rules': 0,
+                    'total_transactions': state.total_transactions,
+                    'new_transactions': 0,
+                    'rescanned_itemsets': 0
+                }
+
+            old_transactions = []
+
+            def rescan(itemsets):
+                # داده‌های قبلی فقط در صورت نیاز و فقط یک بار بارگذاری می‌شوند؛ سفارش‌های دیرپرداخت جزو داده‌های جدیدند
+                if not old_transactions:
+                    if source == 'db':
+                        loaded, _, _ = load_transactions_from_db(
+                            until_order_id=state.last_order_id, exclude_order_ids=late_order_ids
+                        )
+                    else:
+                        loaded, _, _ = load_transactions(
+                            csv_file_path, until_order_id=state.last_order_id, source=source
+                        )
+                    old_transactions.append(get_support_counter(backend, loaded, workers=workers))
+                return old_transactions[0].count(itemsets)
+
+            print(f"Updating frequent itemsets with {delta_count} new transactions...")
+            try:
+                frequent_itemsets, total_transactions, rescanned = fup_update(
+                    load_frequent_itemsets(), state.total_transactions, delta,
+                    min_support, max_k, rescan, backend=backend, workers=workers
+                )
+            finally:
+                for counter in old_transactions:
+                    counter.close()
+
+        # فقط منبع db وضعیت سفارش‌ها را فیلتر می‌کند
+        pending = pending_order_ids(last_order_id) if source == 'db' else []
+        save_mining_state(
+            frequent_itemsets, total_transactions, last_order_id, min_support, max_k, source, pending
+        )
+
+        print("Generating association rules...")
+        rules = generateAssociationRules(
+            frequent_itemsets, None, min_confidence, total_transactions=total_transactions
+        )
+        print(f"Generated {len(rules)} association rules")
+
+        saved_count = save_association_rules(rules, total_transactions=total_transactions)
+        print_sample_rules(rules)
+
+        return {
+            'success': True,
+            'total_rules': len(rules),
+            'saved_rules': saved_count,
+            'total_transactions': total_transactions,
+            'new_transactions': delta_count,
+            'rescanned_itemsets': rescanned
+        }
+
+    except Exception as e:
+        print(f"Error in extract_frequent_patterns_incrementally: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,130 @@
+# recommendations/algorithms/mining_benchmark.py
+# اندازه‌گیری زمان و حافظه‌ی هر مرحله‌ی کاوش الگو روی سبدهای مصنوعی
+
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+from django.db import transaction
+
+from recommendations.algorithms.apriori import (
+    generateAssociationRules, get_support_counter, removeItemset, support_threshold,
+)
+from recommendations.algorithms.candidate_generation import generate_candidates
+from recommendations.algorithms.support_counting import EncodedTransactions
+from recommendations.algorithms.synthetic import generate_transactions
+from recommendations.services import RuleSetService
+
+# مراحل گزارش‌شده به ترتیب اجرا
+BENCHMARK_STAGES = ('encoding', 'candidate_generation', 'support_counting', 'rule_generation', 'db_persistence')
+
+
+class StageTimer:
+    """جمع زمان و بیشینه‌ی حافظه‌ی (tracemalloc) هر مرحله؛ یک مرحله ممکن است چند بار اجرا شود"""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.stages.setdefault(name, {'seconds': 0.0, 'peak_bytes': 0 if self.trace_memory else None})
+            stats['seconds'] += elapsed
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                stats['peak_bytes'] = max(stats['peak_bytes'], peak - base)
+
+
+def run_mining_benchmark(n_orders, n_items=2000, mean_basket_size=4.0, popularity_exponent=1.1, min_support=0.005,
+                         min_confidence=0.5, max_k=3, backend='bitmap', workers=None, persist=True, trace_memory=True,
+                         seed=0):
+    """
+    اجرای مرحله‌به‌مرحله‌ی Apriori روی n_orders سفارش مصنوعی.
+    ذخیره در پایگاه داده داخل یک تراکنش انجام و در پایان برگردانده (rollback) می‌شود.
+    """
+    generated = generate_transactions(
+        n_orders, n_items=n_items, mean_basket_size=mean_basket_size,
+        popularity_exponent=popularity_exponent, seed=seed
+    )
+    # سبدها به صورت نام محصولات، مثل خروجی load_transactions
+    baskets = list(generated)
+    del generated
+
+    timer = StageTimer(trace_memory=trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+
+    counter = None
+    try:
+        with timer.stage('encoding'):
+            encoded = EncodedTransactions.from_transactions(baskets)
+        del baskets
+
+        threshold = support_threshold(min_support, len(encoded))
+
+        # همان حلقه‌ی apriori() با زمان‌سنجی جداگانه‌ی هر مرحله
+        with timer.stage('support_counting'):
+            counter = get_support_counter(backend, encoded, workers=workers)
+            itemsets_1_support = counter.count([(item,) for item in encoded.items])
+            current_frequent = removeItemset(itemsets_1_support, threshold)
+        levels = [{itemset: itemsets_1_support[itemset] for itemset in current_frequent}]
+        candidate_counts = [len(itemsets_1_support)]
+
+        for k in range(2, max_k + 1):
+            with timer.stage('candidate_generation'):
+                candidates = generate_candidates(current_frequent, k)
+            if not candidates:
+                break
+            candidate_counts.append(len(candidates))
+
+            with timer.stage('support_counting'):
+                candidate_support = counter.count(candidates)
+                current_frequent = removeItemset(candidate_support, threshold)
+            if not current_frequent:
+                break
+            levels.append({itemset: candidate_support[itemset] for itemset in current_frequent})
+
+        with timer.stage('rule_generation'):
+            rules = generateAssociationRules(levels, None, min_confidence, total_transactions=len(encoded))
+
+        if persist:
+            with timer.stage('db_persistence'):
+                with transaction.atomic():
+                    RuleSetService.create_rule_set(rules, total_transactions=len(encoded))
+                    transaction.set_rollback(True)
+    finally:
+        if counter is not None:
+            counter.close()
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        'orders': n_orders,
+        'order_items': int(len(encoded.indices)),
+        'unique_products': encoded.n_items,
+        'candidates_per_level': candidate_counts,
+        'frequent_per_level': [len(level) for level in levels],
+        'rules': len(rules),
+        'stages': {name: timer.stages[name] for name in BENCHMARK_STAGES if name in timer.stages},
+        'total_seconds': sum(stats['seconds'] for stats in timer.stages.values()),
+    }
+
+
+def benchmark_environment():
+    """اطلاعات محیط اجرا برای مقایسه‌ی نتایج اجراهای مختلف"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
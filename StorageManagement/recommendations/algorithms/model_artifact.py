@@ -0,0 +1,128 @@
+# recommendations/algorithms/model_artifact.py
+# ذخیره و بارگذاری نسخه‌دار مدل‌های آموزش‌دیده به صورت آرایه‌های .npy قابل memory-map
+
+import json
+import os
+import shutil
+
+import numpy as np
+from django.utils import timezone
+
+# ریشه‌ی پوشه‌ی مدل‌ها؛ هر مدل یک زیرپوشه و هر نسخه یک زیرپوشه‌ی دیگر دارد
+MODEL_ROOT = 'recommendations/data/models'
+
+# فایل اشاره‌گر به آخرین نسخه‌ی کامل هر مدل
+LATEST_FILE = 'LATEST'
+META_FILE = 'meta.json'
+
+# تعداد نسخه‌های نگه‌داشته‌شده‌ی هر مدل
+MODEL_KEEP_VERSIONS = 3
+
+
+def model_dir(name, root=MODEL_ROOT):
+    return os.path.join(root, name)
+
+
+def latest_version(name, root=MODEL_ROOT):
+    """نام آخرین نسخه‌ی منتشرشده (یا None)"""
+    try:
+        with open(os.path.join(model_dir(name, root), LATEST_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def create_version(name, root=MODEL_ROOT):
+    """ساخت پوشه‌ی موقت یک نسخه‌ی جدید برای نوشتن آرایه‌ها؛ خروجی: (نام نسخه، مسیر پوشه‌ی موقت)"""
+    base = model_dir(name, root)
+    os.makedirs(base, exist_ok=True)
+
+    version = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    temp_dir = os.path.join(base, f'.tmp-{version}')
+    os.makedirs(temp_dir)
+    return version, temp_dir
+
+
+def publish_version(name, version, temp_dir, array_names, meta=None, root=MODEL_ROOT, keep=MODEL_KEEP_VERSIONS):
+    """
+    نوشتن meta، انتقال پوشه‌ی موقت به نام نسخه و جابه‌جایی اتمیک LATEST به آن؛
+    در صورت خطا پوشه‌ی موقت حذف می‌شود. خروجی: نام نسخه
+    """
+    base = model_dir(name, root)
+    try:
+        with open(os.path.join(temp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(
+                {**(meta or {}), 'version': version, 'arrays': sorted(array_names)},
+                f, ensure_ascii=False, indent=2, default=str
+            )
+
+        os.rename(temp_dir, os.path.join(base, version))
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    latest_temp = os.path.join(base, f'.{LATEST_FILE}.tmp')
+    with open(latest_temp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(latest_temp, os.path.join(base, LATEST_FILE))
+
+    purge_old_versions(name, root=root, keep=keep)
+    return version
+
+
+def save_artifact(name, arrays, meta=None, root=MODEL_ROOT, keep=MODEL_KEEP_VERSIONS):
+    """
+    نوشتن آرایه‌ها در یک نسخه‌ی جدید و جابه‌جایی اتمیک LATEST به آن.
+    خوانندگان تا پایان نوشتن، نسخه‌ی قبلی را می‌بینند. خروجی: نام نسخه
+    """
+    version, temp_dir = create_version(name, root)
+
+    try:
+        for array_name, array in arrays.items():
+            array = np.asarray(array)
+            if array.dtype == object:
+                raise ValueError(f"Array '{array_name}' has object dtype and cannot be memory-mapped")
+            np.save(os.path.join(temp_dir, f'{array_name}.npy'), array, allow_pickle=False)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    return publish_version(name, version, temp_dir, arrays, meta=meta, root=root, keep=keep)
+
+
+def load_artifact(name, version=None, root=MODEL_ROOT, mmap=True, names=None):
+    """بارگذاری یک نسخه (پیش‌فرض آخرین نسخه)، همه‌ی آرایه‌ها یا فقط names؛ خروجی: (دیکشنری آرایه‌ها، meta) یا None"""
+    version = version or latest_version(name, root)
+    if version is None:
+        return None
+
+    path = os.path.join(model_dir(name, root), version)
+    with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    # آرایه‌ها از روی دیسک map می‌شوند و فقط صفحات خوانده‌شده در حافظه می‌آیند
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        array_name: np.load(os.path.join(path, f'{array_name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+        for array_name in (meta['arrays'] if names is None else names)
+    }
+    return arrays, meta
+
+
+def purge_old_versions(name, root=MODEL_ROOT, keep=MODEL_KEEP_VERSIONS):
+    """حذف نسخه‌های قدیمی؛ نسخه‌ی LATEST هیچ‌وقت حذف نمی‌شود"""
+    base = model_dir(name, root)
+    latest = latest_version(name, root)
+    versions = sorted(
+        entry for entry in os.listdir(base)
+        if not entry.startswith('.') and os.path.isdir(os.path.join(base, entry))
+    )
+
+    removed = 0
+    for version in versions[:max(0, len(versions) - keep)]:
+        if version == latest:
+            continue
+        # پردازه‌هایی که نسخه را map کرده‌اند تا بستن فایل به آن دسترسی دارند
+        shutil.rmtree(os.path.join(base, version), ignore_errors=True)
+        removed += 1
+    return removed
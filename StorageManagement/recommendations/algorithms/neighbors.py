@@ -0,0 +1,123 @@
+# recommendations/algorithms/neighbors.py
+# جستجوی نزدیک‌ترین همسایه‌ها برای collaborative filtering: KNN کامل یا تقریبی با LSH ابرصفحه‌های تصادفی
+
+import numpy as np
+from scipy import sparse
+from sklearn.neighbors import NearestNeighbors
+
+# روش‌های قابل انتخاب با تنظیم RECOMMENDER_NEIGHBORS_BACKEND
+NEIGHBORS_BACKENDS = ('exact', 'approx')
+
+# تعداد جدول‌های hash و بیت‌های هر جدول؛ جدول بیشتر recall بالاتر و بیت بیشتر سطل‌های کوچک‌تر
+# (با 32x6 روی 100 هزار کاربر مصنوعی recall@5 حدود 0.65 در حدود یک دهم زمان KNN کامل؛ benchmark_neighbors)
+LSH_TABLES = 32
+LSH_BITS = 6
+
+# سقف تعداد کاندیدهای هر پرس‌وجو که فاصله‌ی دقیقشان محاسبه می‌شود
+LSH_MAX_CANDIDATES = 10000
+
+# تعداد سطرهایی که هم‌زمان روی ابرصفحه‌ها تصویر می‌شوند
+LSH_PROJECTION_CHUNK = 10000
+
+
+class CosineLSHIndex:
+    """
+    نزدیک‌ترین همسایه‌های تقریبی با فاصله‌ی کسینوسی؛ API مشابه NearestNeighbors (fit و kneighbors).
+    علامت تصویر هر سطر روی ابرصفحه‌های تصادفی کد سطل آن است و فاصله‌ی دقیق فقط برای کاندیدهای
+    هم‌سطل محاسبه می‌شود.
+    """
+    metric = 'cosine'
+
+    def __init__(self, n_neighbors=5, n_tables=LSH_TABLES, n_bits=LSH_BITS,
+                 max_candidates=LSH_MAX_CANDIDATES, seed=0):
+        if not 0 < n_bits <= 62:
+            raise ValueError("n_bits must be between 1 and 62")
+        self.n_neighbors = n_neighbors
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.max_candidates = max_candidates
+        self.seed = seed
+
+    def fit(self, X):
+        self._X = sparse.csr_matrix(X)
+        self._inverse_norms = _inverse_row_norms(self._X)
+
+        rng = np.random.default_rng(self.seed)
+        self._planes = rng.standard_normal((self._X.shape[1], self.n_tables * self.n_bits)).astype(np.float32)
+        self._bit_weights = np.left_shift(1, np.arange(self.n_bits, dtype=np.int64))
+
+        # سطرهای هر جدول مرتب بر اساس کد سطل تا سطل هر پرس‌وجو با searchsorted پیدا شود
+        # کدها و شماره‌ی سطرها با کوچک‌ترین نوع داده‌ی کافی نگه داشته می‌شوند
+        codes = self._hash(self._X)
+        order = np.argsort(codes, axis=0, kind='stable')
+        self._sorted_codes = np.take_along_axis(codes, order, axis=0).astype(
+            np.min_scalar_type((1 << self.n_bits) - 1)
+        )
+        self._order = order.astype(np.min_scalar_type(max(0, self._X.shape[0] - 1)))
+        return self
+
+    def _hash(self, X):
+        codes = np.empty((X.shape[0], self.n_tables), dtype=np.int64)
+        for start in range(0, X.shape[0], LSH_PROJECTION_CHUNK):
+            # سطرها float32 می‌شوند تا ماتریس ابرصفحه‌ها در هر فراخوانی به float64 تبدیل نشود
+            projections = np.asarray(X[start:start + LSH_PROJECTION_CHUNK].astype(np.float32) @ self._planes)
+            bits = (projections > 0).reshape(-1, self.n_tables, self.n_bits)
+            codes[start:start + LSH_PROJECTION_CHUNK] = bits @ self._bit_weights
+        return codes
+
+    def _candidates(self, codes):
+        parts = []
+        for table, code in enumerate(codes):
+            column = self._sorted_codes[:, table]
+            # کد با نوع داده‌ی ستون تا searchsorted کل ستون را تبدیل نکند
+            code = column.dtype.type(code)
+            left = np.searchsorted(column, code, side='left')
+            right = np.searchsorted(column, code, side='right')
+            parts.append(self._order[left:right, table].astype(np.int64))
+        candidates, collisions = np.unique(np.concatenate(parts), return_counts=True)
+
+        # سطرهایی که در جدول‌های بیشتری هم‌سطل شده‌اند شبیه‌ترند؛ فقط max_candidates تای آن‌ها بررسی می‌شوند
+        if len(candidates) > self.max_candidates:
+            top = np.argpartition(-collisions, self.max_candidates - 1)[:self.max_candidates]
+            candidates = np.sort(candidates[top])
+        return candidates
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        n_neighbors = min(n_neighbors or self.n_neighbors, self._X.shape[0])
+        X = sparse.csr_matrix(X)
+        codes = self._hash(X)
+        query_inverse_norms = _inverse_row_norms(X)
+
+        distances = np.empty((X.shape[0], n_neighbors))
+        indices = np.empty((X.shape[0], n_neighbors), dtype=np.int64)
+        for i in range(X.shape[0]):
+            candidates = self._candidates(codes[i])
+            # اگر سطل‌ها کاندید کافی نداشته باشند جستجو برای این سطر کامل انجام می‌شود
+            if len(candidates) < n_neighbors:
+                candidates = np.arange(self._X.shape[0])
+
+            similarities = (
+                (self._X[candidates] @ X[i].T).toarray().ravel()
+                * self._inverse_norms[candidates] * query_inverse_norms[i]
+            )
+            candidate_distances = 1 - similarities
+            top = np.lexsort((candidates, candidate_distances))[:n_neighbors]
+            distances[i] = candidate_distances[top]
+            indices[i] = candidates[top]
+
+        return (distances, indices) if return_distance else indices
+
+
+def _inverse_row_norms(X):
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    return np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+
+
+def build_neighbors_index(backend='exact', n_neighbors=5):
+    """شاخص همسایه‌ها برای روش داده‌شده ('exact' یا 'approx')"""
+    if backend == 'exact':
+        # brute force روی سطرهای پراکنده
+        return NearestNeighbors(n_neighbors=n_neighbors, metric='cosine', algorithm='brute')
+    if backend == 'approx':
+        return CosineLSHIndex(n_neighbors=n_neighbors)
+    raise ValueError(f"Unknown neighbors backend '{backend}', expected one of {NEIGHBORS_BACKENDS}")
@@ -1,19 +1,32 @@
 # recommendations/algorithms/algorithms/product_recommendation.py
 # توصیه‌گر ترکیبی برای محصولات (content-based + collaborative)
 import time  # برای اندازه‌گیری زمان اجرا
+import threading  # برای بارگذاری یک‌باره‌ی مدل در هر پردازه
+from itertools import chain  # برای پیمایش توصیه‌های اصلی و جایگزین
 
+import numpy as np  # برای محاسبات برداری روی آرایه‌های مدل
 import pandas as pd  # برای پردازش داده‌ها
+from scipy import sparse  # برای ماتریس پراکنده‌ی کاربر-محصول
 from sklearn.preprocessing import StandardScaler  # برای نرمال‌سازی ویژگی‌ها
-from sklearn.metrics.pairwise import cosine_similarity  # برای محاسبه شباهت کسینوسی
-from sklearn.neighbors import NearestNeighbors  # برای KNN در collaborative filtering
 import logging  # برای لاگ‌گیری
-from typing import Dict, List, Any, Tuple  # تایپینگ برای توابع
+from typing import Dict, List, Any, Tuple, Optional, Iterable, Iterator  # تایپینگ برای توابع
 import logging.config  # برای پیکربندی لاگر
 
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
 # مدل‌های Django مربوط به محصولات، سفارش‌ها و کاربران
-from products.models import Product
-from orders.models import Order
+from products.models import Product, ProductProperty
+from orders.models import Order, OrderItem
 from users.models import User, Profile
+from recommendations.models import UserRecommendation
+from recommendations.algorithms.model_artifact import save_artifact, load_artifact, latest_version
+from recommendations.algorithms.neighbors import build_neighbors_index
+from recommendations.algorithms.als import implicit_als
+from recommendations.algorithms.feature_store import read_order_items
+from recommendations.services import RecommendationService, TrendingService
 
 # پیکربندی لاگر برای نمایش لاگ‌ها در کنسول
 LOGGING = {
@@ -37,41 +50,93 @@ logging.config.dictConfig(LOGGING)
 # ایجاد لاگر با نام ماژول جاری
 logger = logging.getLogger(__name__)
 
+# نام مدل در پوشه‌ی مدل‌ها
+MODEL_NAME = 'hybrid'
+
+# روش‌های بخش collaborative قابل انتخاب با تنظیم RECOMMENDER_COLLABORATIVE_ENGINE
+COLLABORATIVE_ENGINES = ('knn', 'als')
+
+# ستون‌هایی از داده‌های سفارش که توصیه‌گر می‌خواند
+TRAINING_COLUMNS = [
+    'user_id', 'product_name', 'product_avg_score', 'product_categories', 'buy_price', 'sell_price',
+    'order_status', 'order_item_quantity', 'user_rating',
+]
+
+# ترتیب ویژگی‌های عددی بردار محتوایی کاربر و محصول؛ ستون‌های دسته‌بندی پس از آن‌ها می‌آیند
+CONTENT_FEATURES = ['profit_margin', 'user_rating', 'product_avg_score']
+
+# فاصله‌ی زمانی (ثانیه) بین بررسی‌های انتشار نسخه‌ی جدید مدل
+MODEL_CHECK_INTERVAL = 30
+
+# حداقل موجودی برای پیشنهاد یک محصول
+MIN_RECOMMENDABLE_STOCK = 3
+
+# ضریب واکشی کاندید بیشتر تا پس از حذف محصولات ناموجود هنوز n نتیجه باقی بماند
+CANDIDATE_OVERFETCH = 3
+
+# مدت اعتبار (ثانیه) تصویر موجودی محصولات در حافظه‌ی هر پردازه
+AVAILABILITY_TTL = 60
+
+# سقف تعداد خانه‌های ماتریس امتیاز (کاربر × محصول) که در حالت دسته‌ای هم‌زمان ساخته می‌شوند
+BATCH_SCORE_CELLS = 1 << 24
+
+# اندازه‌ی هر دسته در نوشتن توصیه‌ها و خواندن اطلاعات محصولات
+RECOMMENDATION_BATCH_SIZE = 1000
+
 
 # کلاس اصلی توصیه‌گر ترکیبی
 class HybridRecommender:
-    def __init__(self):
-        # مقیاس‌گذار استاندارد و KNN با معیار کسینوسی
+    def __init__(self, neighbors_backend: Optional[str] = None, engine: Optional[str] = None,
+                 als_params: Optional[Dict[str, Any]] = None):
+        # مقیاس‌گذار استاندارد و KNN با معیار کسینوسی (کامل یا تقریبی بر اساس تنظیمات)
         self.scaler = StandardScaler()
-        self.knn = NearestNeighbors(n_neighbors=5, metric='cosine')
+        self.neighbors_backend = neighbors_backend or getattr(settings, 'RECOMMENDER_NEIGHBORS_BACKEND', 'exact')
+        self.knn = build_neighbors_index(self.neighbors_backend, n_neighbors=5)
+        # روش collaborative: همسایه‌های کاربر (knn) یا تجزیه‌ی ماتریس خریدها (als)
+        self.engine = engine or getattr(settings, 'RECOMMENDER_COLLABORATIVE_ENGINE', 'knn')
+        if self.engine not in COLLABORATIVE_ENGINES:
+            raise ValueError(f"Unknown collaborative engine '{self.engine}', expected one of {COLLABORATIVE_ENGINES}")
+        # پارامترهای اختیاری implicit_als (factors، regularization، alpha، iterations)
+        self.als_params = dict(als_params or {})
+        # آرایه‌های مدل آموزش‌دیده (پس از fit یا load) و نسخه‌ی ذخیره‌شده‌ی آن
+        self.model = None
+        self.version = None
+        # ماتریس‌های پراکنده‌ی کاربر-محصول و کاربر-دسته‌بندی ساخته‌شده از آرایه‌های مدل
+        self.user_item = None
+        self.user_categories = None
 
     def load_data(self) -> pd.DataFrame:
         try:
-            # بارگذاری داده‌ها از CSV
-            logger.info("Loading order items data from CSV...")
-            df = pd.read_csv('recommendations/data/order_items_data.csv')
-            logger.info(f"Raw data loaded: {df.shape[0]} rows")
+            # بارگذاری فقط ستون‌های لازم از داده‌های ستونی (memory-map)
+            logger.info("Loading order items data from feature store...")
+            start = time.time()
+            df = read_order_items(TRAINING_COLUMNS)
+            logger.info(f"Raw data loaded: {df.shape[0]} rows in {time.time() - start:.2f} seconds")
+            return self.clean_data(df)
+        except Exception as e:
+            # در صورت بروز خطا
+            logger.error(f"Error loading data: {str(e)}")
+            raise
 
-            # فیلتر سفارش‌های پرداخت‌شده یا تحویل داده‌شده
-            df = df[df['order_status'].isin(['paid', 'delivered'])]
-            logger.info(f"Filtered paid/delivered orders: {df.shape[0]} rows")
+    def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        """فیلتر ردیف‌های سفارش و پر کردن نمرات خالی؛ ورودی fit همین خروجی است"""
+        try:
+            # فیلتر سفارش‌های خریداری‌شده (پرداخت‌شده، ارسال‌شده یا تحویل داده‌شده)
+            df = df[df['order_status'].isin(Order.PURCHASED_STATUSES)]
+            logger.info(f"Filtered purchased orders: {df.shape[0]} rows")
 
             # پر کردن نمرات خالی کاربران با میانگین نمرات آن کاربر یا نمره میانگین محصول
             df['user_rating'] = df['user_rating'].fillna(df.groupby('user_id')['user_rating'].transform('mean'))
             df['user_rating'] = df['user_rating'].fillna(df['product_avg_score'])
 
-            # پردازش دسته‌بندی‌ها به صورت لیست رشته‌ها
-            df['product_categories'] = df['product_categories'].fillna('')
-            df['product_categories'] = df['product_categories'].apply(
-                lambda x: [cat.strip() for cat in str(x).split(',') if cat.strip()]
-            )
+            # دسته‌بندی‌ها (Categorical رشته‌های جداشده با کاما) در prepare_category_features یک بار برای هر محصول تجزیه می‌شوند
 
             # نمایش چند نمونه برای بررسی صحت داده‌ها
             logger.debug("Sample processed data:\n" + df.head().to_string())
             return df
         except Exception as e:
             # در صورت بروز خطا
-            logger.error(f"Error loading data: {str(e)}")
+            logger.error(f"Error cleaning data: {str(e)}")
             raise
 
     def prepare_content_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -88,64 +153,276 @@ class HybridRecommender:
         # نمایش ویژگی‌های نرمال‌شده
         logger.debug(f"Scaled features:\n{df[numerical_features].head().to_string()}")
 
-        # استخراج همه دسته‌بندی‌های یکتا
-        all_categories = set()
-        for categories in df['product_categories']:
-            all_categories.update(categories)
-        logger.info(f"Found {len(all_categories)} unique product categories")
-
-        # ایجاد ویژگی دودویی برای هر دسته‌بندی
-        for category in all_categories:
-            df[f'category_{category}'] = df['product_categories'].apply(lambda x: 1 if category in x else 0)
-
         logger.info(f"Content features prepared in {time.time() - start:.2f} seconds")
         return df
 
-    def prepare_collaborative_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def prepare_category_features(self, df: pd.DataFrame) -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+        """ماتریس پراکنده‌ی چندبرچسبی (محصول × دسته‌بندی)؛ خروجی: (ماتریس، نام محصولات مرتب، واژگان دسته‌بندی)"""
+        start = time.time()
+        logger.info("Encoding product categories...")
+
+        # تجزیه‌ی دسته‌بندی‌ها فقط یک بار برای هر محصول، نه برای هر ردیف سفارش
+        products = df.dropna(subset=['product_name']).drop_duplicates('product_name').sort_values('product_name')
+        product_names = products['product_name'].to_numpy(dtype=str)
+        categories = (
+            products['product_categories'].astype(object).fillna('').astype(str).reset_index(drop=True)
+            .str.split(',').explode().str.strip()
+        )
+        categories = categories[categories != '']
+
+        # واژگان مرتب دسته‌بندی‌ها با مدل ذخیره می‌شود تا ستون‌ها بین آموزش و استفاده ثابت بمانند
+        vocabulary, category_codes = np.unique(categories.to_numpy(dtype=str), return_inverse=True)
+        product_categories = sparse.csr_matrix(
+            (np.ones(len(category_codes)), (categories.index.to_numpy(), category_codes)),
+            shape=(len(product_names), len(vocabulary))
+        )
+        # دسته‌بندی تکراری در رشته‌ی یک محصول یک بار حساب می‌شود
+        product_categories.data[:] = 1
+
+        logger.info(
+            f"Found {len(vocabulary)} unique product categories "
+            f"(encoded in {time.time() - start:.2f} seconds)"
+        )
+        return product_categories, product_names, vocabulary
+
+    def prepare_collaborative_features(self, df: pd.DataFrame) -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
         start = time.time()
         logger.info("Preparing collaborative filtering matrix...")
 
-        # ساخت ماتریس کاربر-محصول با نمرات
-        user_item_matrix = df.pivot_table(
-            index='user_id',
-            columns='product_name',
-            values='user_rating',
-            fill_value=0
+        # کدگذاری عددی کاربران و محصولات؛ ترتیب مرتب مثل سطرها و ستون‌های pivot_table
+        ratings = df[['user_id', 'product_name', 'user_rating']].dropna()
+        user_ids, user_codes = np.unique(ratings['user_id'].to_numpy(dtype=np.int64), return_inverse=True)
+        product_names, product_codes = np.unique(ratings['product_name'].to_numpy(dtype=str), return_inverse=True)
+
+        # میانگین نمرات هر جفت (کاربر، محصول)؛ کلیدها به ترتیب سطر و سپس ستون مرتب می‌شوند
+        keys = user_codes.astype(np.int64) * len(product_names) + product_codes
+        pairs, pair_codes = np.unique(keys, return_inverse=True)
+        values = (
+            np.bincount(pair_codes, weights=ratings['user_rating'].to_numpy(dtype=np.float64))
+            / np.bincount(pair_codes)
         )
 
-        # آموزش مدل KNN بر روی این ماتریس
-        self.knn.fit(user_item_matrix)
+        # ماتریس CSR مستقیم از جفت‌ها؛ حافظه متناسب با تعداد نمرات است نه کاربر × محصول
+        rows = pairs // len(product_names)
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(user_ids)), out=indptr[1:])
+        user_item_matrix = sparse.csr_matrix(
+            (values, (pairs % len(product_names)).astype(np.int32), indptr),
+            shape=(len(user_ids), len(product_names))
+        )
+        # نمره‌ی صفر مثل خانه‌ی خالی pivot_table به معنی «امتیاز نداده» است
+        user_item_matrix.eliminate_zeros()
 
-        logger.info(f"User-item matrix shape: {user_item_matrix.shape} (prepared in {time.time() - start:.2f} seconds)")
-        return user_item_matrix
+        logger.info(
+            f"User-item matrix shape: {user_item_matrix.shape}, {user_item_matrix.nnz} ratings "
+            f"(prepared in {time.time() - start:.2f} seconds)"
+        )
+        return user_item_matrix, user_ids, product_names
+
+    def prepare_interaction_features(self, df: pd.DataFrame, user_ids: np.ndarray,
+                                     product_names: np.ndarray) -> sparse.csr_matrix:
+        """ماتریس پراکنده‌ی بازخورد ضمنی (مجموع تعداد خرید هر کاربر از هر محصول) هم‌تراز با ماتریس کاربر-محصول"""
+        purchases = df[['user_id', 'product_name', 'order_item_quantity']].dropna()
+        purchase_users = purchases['user_id'].to_numpy(dtype=np.int64)
+        purchase_products = purchases['product_name'].to_numpy(dtype=str)
+
+        # فقط کاربران و محصولاتی که سطر و ستون ماتریس کاربر-محصول هستند
+        rows = np.minimum(np.searchsorted(user_ids, purchase_users), max(len(user_ids) - 1, 0))
+        columns = np.minimum(np.searchsorted(product_names, purchase_products), max(len(product_names) - 1, 0))
+        known = (user_ids[rows] == purchase_users) & (product_names[columns] == purchase_products)
+
+        # خانه‌های تکراری (چند سفارش از یک محصول) در تبدیل به CSR جمع می‌شوند
+        interactions = sparse.coo_matrix(
+            (purchases['order_item_quantity'].to_numpy(dtype=np.float64)[known], (rows[known], columns[known])),
+            shape=(len(user_ids), len(product_names))
+        ).tocsr()
+        interactions.eliminate_zeros()
+        return interactions
+
+    def fit(self, df: Optional[pd.DataFrame] = None) -> 'HybridRecommender':
+        start = time.time()
+        if df is None:
+            df = self.load_data()
+        df = self.prepare_content_features(df)
+        categories = self.prepare_category_features(df)
+        matrix, user_ids, product_names = self.prepare_collaborative_features(df)
+
+        self.model = self._build_model(df, matrix, user_ids, product_names, categories)
+        if self.engine == 'als':
+            als_start = time.time()
+            interactions = self.prepare_interaction_features(df, user_ids, product_names)
+            self.model['user_factors'], self.model['item_factors'] = implicit_als(interactions, **self.als_params)
+            logger.info(
+                f"ALS factors trained on {interactions.nnz} purchases in {time.time() - als_start:.2f} seconds"
+            )
+        self.version = None
+        self._index_model()
+
+        logger.info(f"Model trained in {time.time() - start:.2f} seconds")
+        return self
+
+    def _build_model(self, df: pd.DataFrame, matrix: sparse.csr_matrix, user_ids: np.ndarray,
+                     product_names: np.ndarray,
+                     categories: Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]) -> Dict[str, np.ndarray]:
+        product_categories, category_products, vocabulary = categories
+
+        # پروفایل عددی هر کاربر: میانگین ویژگی‌های نرمال‌شده‌ی ردیف‌های او
+        user_profiles = df.groupby('user_id')[CONTENT_FEATURES].mean().reindex(user_ids)
+
+        # پروفایل دسته‌بندی هر کاربر: میانگین بردار دسته‌بندی محصولات ردیف‌های او با ضرب ماتریس‌های پراکنده
+        rows = df[['user_id', 'product_name']].dropna()
+        row_users = rows['user_id'].to_numpy(dtype=np.int64)
+        user_rows = np.minimum(np.searchsorted(user_ids, row_users), len(user_ids) - 1)
+        known = user_ids[user_rows] == row_users
+        incidence = sparse.csr_matrix(
+            (
+                np.ones(int(known.sum())),
+                (user_rows[known], np.searchsorted(category_products, rows['product_name'].to_numpy(dtype=str)[known]))
+            ),
+            shape=(len(user_ids), len(category_products))
+        )
+        row_counts = np.asarray(incidence.sum(axis=1)).ravel()
+        user_categories = (
+            sparse.diags(1 / np.maximum(row_counts, 1)) @ incidence @ product_categories
+        ).tocsr()
+
+        # بردار عددی هر محصول از اولین ردیف آن محصول
+        product_features = (
+            df.drop_duplicates('product_name')
+            .set_index('product_name')[CONTENT_FEATURES]
+            .reindex(product_names)
+        )
 
-    def get_content_recommendations(self, user_id: int, df: pd.DataFrame, n: int = 5) -> List[Tuple[str, float]]:
+        # ماتریس‌های پراکنده هر کدام به صورت سه آرایه‌ی CSR ذخیره می‌شوند
+        return {
+            'user_ids': user_ids,
+            'product_names': product_names,
+            **_csr_arrays('user_item', matrix),
+            'user_profiles': user_profiles.to_numpy(dtype=np.float64),
+            **_csr_arrays('user_categories', user_categories),
+            'product_features': product_features.to_numpy(dtype=np.float64),
+            **_csr_arrays(
+                'product_categories',
+                product_categories[np.searchsorted(category_products, product_names)]
+            ),
+            'category_vocabulary': vocabulary,
+            'scaler_mean': self.scaler.mean_,
+            'scaler_scale': self.scaler.scale_,
+        }
+
+    def _index_model(self):
+        n_users = len(self.model['user_ids'])
+        n_products = len(self.model['product_names'])
+        n_categories = len(self.model['category_vocabulary'])
+
+        # ماتریس‌های پراکنده از آرایه‌های مدل (بدون کپی آرایه‌های memory-map شده)
+        self.user_item = _csr_from_arrays(self.model, 'user_item', (n_users, n_products))
+        self.user_categories = _csr_from_arrays(self.model, 'user_categories', (n_users, n_categories))
+        product_categories = _csr_from_arrays(self.model, 'product_categories', (n_products, n_categories))
+
+        # بردار محصول: ویژگی‌های عددی و ستون‌های دسته‌بندی، با طول واحد (float32)
+        # تا شباهت کسینوسی یک ضرب ماتریس پراکنده باشد
+        features = np.asarray(self.model['product_features'])
+        self.content_valid = ~np.isnan(features).any(axis=1)
+        vectors = sparse.hstack(
+            [sparse.csr_matrix(np.where(self.content_valid[:, None], features, 0)), product_categories],
+            format='csr'
+        )
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        inverse_norms = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+        self.product_vectors = (sparse.diags(inverse_norms) @ vectors).astype(np.float32).tocsr()
+        self.content_invalid = np.flatnonzero(~self.content_valid)
+
+        if self.engine == 'als' and 'user_factors' not in self.model:
+            logger.warning("Model has no ALS factors, falling back to KNN collaborative filtering")
+            self.engine = 'knn'
+
+        # شاخص همسایه‌ها روی سطرهای پراکنده‌ی ماتریس کاربر-محصول (یک بار پس از آموزش یا بارگذاری)
+        if self.engine == 'knn':
+            self.knn.fit(self.user_item)
+
+    def save(self) -> str:
+        """ذخیره‌ی مدل آموزش‌دیده به صورت یک نسخه‌ی جدید؛ خروجی نام نسخه"""
+        if self.model is None:
+            raise ValueError("Model is not trained")
+
+        self.version = save_artifact(
+            MODEL_NAME,
+            self.model,
+            meta={
+                'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+                'users': int(len(self.model['user_ids'])),
+                'products': int(len(self.model['product_names'])),
+                'ratings': int(len(self.model['user_item_data'])),
+                'content_features': CONTENT_FEATURES,
+                'categories': int(len(self.model['category_vocabulary'])),
+                'scaler_features': ['profit_margin', 'product_avg_score', 'user_rating'],
+                'knn': {
+                    'n_neighbors': self.knn.n_neighbors,
+                    'metric': self.knn.metric,
+                    'backend': self.neighbors_backend
+                },
+                'collaborative': {
+                    'engine': self.engine,
+                    **({'als': self.als_params, 'factors': int(self.model['user_factors'].shape[1])}
+                       if self.engine == 'als' else {}),
+                },
+            }
+        )
+        logger.info(f"Model saved as version {self.version}")
+        return self.version
+
+    @classmethod
+    def load(cls, version: Optional[str] = None) -> Optional['HybridRecommender']:
+        """بارگذاری مدل ذخیره‌شده (آرایه‌ها memory-map می‌شوند)؛ اگر مدلی نباشد None"""
+        artifact = load_artifact(MODEL_NAME, version)
+        if artifact is None:
+            return None
+
+        arrays, meta = artifact
+        # روش collaborative همانی است که مدل با آن آموزش دیده (مدل‌های قدیمی‌تر knn)
+        recommender = cls(engine=meta.get('collaborative', {}).get('engine', 'knn'))
+        recommender.model = arrays
+        recommender.version = meta['version']
+        recommender._index_model()
+        logger.info(f"Loaded model version {recommender.version}")
+        return recommender
+
+    def _user_row(self, user_id: int) -> Optional[int]:
+        # شناسه‌ی کاربران مرتب است
+        user_ids = self.model['user_ids']
+        row = int(np.searchsorted(user_ids, user_id))
+        if row < len(user_ids) and user_ids[row] == user_id:
+            return row
+        return None
+
+    def has_user(self, user_id: int) -> bool:
+        """آیا کاربر در مدل آموزش‌دیده ردیف دارد؛ کاربران بدون خرید (یا پیش از آموزش مدل) ندارند"""
+        return self.model is not None and self._user_row(user_id) is not None
+
+    def _top_products(self, scores: np.ndarray, n: int) -> List[Tuple[str, float]]:
+        top = self._top_n_rows(scores[None, :], n)[0]
+        product_names = self.model['product_names']
+        return [(str(product_names[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def get_content_recommendations(self, user_id: int, n: int = 5) -> List[Tuple[str, float]]:
         try:
             logger.info(f"Generating content-based recommendations for user {user_id}...")
-            user_ratings = df[df['user_id'] == user_id]
+            row = self._user_row(user_id)
 
-            if user_ratings.empty:
+            if row is None:
                 logger.warning(f"No ratings found for user {user_id}")
                 return []
 
-            # بردار نماینده‌ی پروفایل کاربر از ویژگی‌های عددی
-            user_profile_vector = user_ratings[
-                ['profit_margin', 'user_rating', 'product_avg_score']].mean().values.reshape(1, -1)
-
-            # استخراج بردارهای محصولات یکتا
-            product_vectors = df.drop_duplicates('product_name')[
-                ['product_name', 'profit_margin', 'user_rating', 'product_avg_score']]
-            product_vectors = product_vectors.dropna()
+            # بردار نماینده‌ی پروفایل کاربر از ویژگی‌های عددی و دسته‌بندی‌ها
+            if np.isnan(self.model['user_profiles'][row]).any():
+                logger.warning(f"Incomplete content profile for user {user_id}")
+                return []
 
-            # محاسبه شباهت کسینوسی با هر محصول
-            similarities = []
-            for _, row in product_vectors.iterrows():
-                vec = row[['profit_margin', 'user_rating', 'product_avg_score']].values.reshape(1, -1)
-                sim = cosine_similarity(user_profile_vector, vec)[0][0]
-                similarities.append((row['product_name'], sim))
+            # شباهت کسینوسی با همه‌ی محصولات؛ همان مسیر حالت دسته‌ای با یک سطر
+            scores = self.content_scores_batch(np.array([row]))[0]
 
-            # مرتب‌سازی و انتخاب بهترین‌ها
-            sorted_sims = sorted(similarities, key=lambda x: x[1], reverse=True)[:n]
+            sorted_sims = self._top_products(scores, n)
             for product, score in sorted_sims:
                 logger.debug(f"Content-based score - {product}: {score:.4f}")
 
@@ -154,36 +431,197 @@ class HybridRecommender:
             logger.error(f"Error in content recommendation: {e}")
             return []
 
-    def get_collaborative_recommendations(self, user_id: int, matrix: pd.DataFrame, n: int = 5) -> List[str]:
+    def get_collaborative_recommendations(self, user_id: int, n: int = 5) -> List[str]:
         try:
             logger.info(f"Generating collaborative recommendations for user {user_id}...")
-            if user_id not in matrix.index:
+            row = self._user_row(user_id)
+            if row is None:
                 logger.warning(f"User {user_id} not found in collaborative matrix")
                 return []
 
-            # بردار کاربر و پیدا کردن نزدیک‌ترین کاربران
-            user_vector = pd.DataFrame([matrix.loc[user_id].values], columns=matrix.columns)
-            distances, indices = self.knn.kneighbors(user_vector)
-
-            similar_users = matrix.iloc[indices[0]]
+            # بردار پراکنده‌ی کاربر و پیدا کردن نزدیک‌ترین کاربران
+            matrix = self.user_item
+            user_vector = matrix[row]
+            if self.engine == 'als':
+                # امتیاز همه‌ی محصولات با یک ضرب داخلی بردار پنهان کاربر در بردارهای محصولات
+                scores = self.model['item_factors'] @ self.model['user_factors'][row]
+            else:
+                distances, indices = self.knn.kneighbors(user_vector)
 
-            # میانگین نمرات کاربران مشابه
-            recommendations = similar_users.mean().sort_values(ascending=False)
+                # میانگین نمرات کاربران مشابه
+                scores = np.asarray(matrix[indices[0]].mean(axis=0)).ravel()
 
             # حذف آیتم‌هایی که قبلاً توسط کاربر مشاهده یا امتیاز داده شده‌اند
-            already_rated = matrix.loc[user_id]
-            recommendations = recommendations[already_rated == 0]
+            scores[user_vector.indices] = -np.inf
 
             # انتخاب n محصول برتر
-            top_recs = recommendations.head(n).index.tolist()
-            for product, score in recommendations.head(n).items():
+            top_recs = self._top_products(scores, n)
+            for product, score in top_recs:
                 logger.debug(f"Collaborative score - {product}: {score:.4f}")
 
-            return top_recs
+            return [product for product, _ in top_recs]
         except Exception as e:
             logger.error(f"Error in collaborative recommendation: {e}")
             return []
 
+    @staticmethod
+    def _top_n_rows(scores: np.ndarray, n: int) -> np.ndarray:
+        # n امتیاز برتر هر سطر با argpartition و سپس مرتب‌سازی همان n ستون
+        k = min(n, scores.shape[1])
+        if k == 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+        top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1)
+
+    def content_scores_batch(self, rows: np.ndarray) -> np.ndarray:
+        # امتیاز محتوایی چند کاربر در یک ضرب ماتریسی با بردارهای واحد محصولات
+        profiles = np.asarray(self.model['user_profiles'][rows])
+        valid_users = ~np.isnan(profiles).any(axis=1)
+        profiles = np.hstack([np.where(valid_users[:, None], profiles, 0), self.user_categories[rows].toarray()])
+        norms = np.linalg.norm(profiles, axis=1)
+        unit_profiles = np.divide(
+            profiles, norms[:, None], out=np.zeros_like(profiles), where=norms[:, None] > 0
+        ).astype(np.float32)
+
+        scores = np.ascontiguousarray((self.product_vectors @ unit_profiles.T).T)
+        scores[:, self.content_invalid] = -np.inf
+        scores[~valid_users] = -np.inf
+        return scores
+
+    def collaborative_scores_batch(self, rows: np.ndarray, neighbors: Optional[np.ndarray] = None) -> np.ndarray:
+        # میانگین نمرات همسایه‌های هر کاربر (یا ضرب بردارهای پنهان در als)؛ محصولات امتیازداده‌شده حذف می‌شوند
+        n_rows = len(rows)
+        if self.engine == 'als':
+            scores = self.model['user_factors'][rows] @ self.model['item_factors'].T
+        else:
+            # میانگین با ضرب یک ماتریس پراکنده‌ی (کاربر × همسایه) با وزن 1/k در سطرهای همسایه‌ها
+            k = neighbors.shape[1]
+            averaging = sparse.csr_matrix(
+                (np.full(n_rows * k, 1.0 / k), np.arange(n_rows * k), np.arange(0, n_rows * k + 1, k)),
+                shape=(n_rows, n_rows * k)
+            )
+            scores = (averaging @ self.user_item[neighbors.ravel()]).toarray()
+
+        rated = self.user_item[rows]
+        scores[np.repeat(np.arange(n_rows), np.diff(rated.indptr)), rated.indices] = -np.inf
+        return scores
+
+    def iter_batch_recommendations(self, user_ids: Optional[Iterable[int]] = None,
+                                   n: int = 5) -> Iterator[Tuple[int, List[Tuple[str, float]], List[str]]]:
+        """توصیه‌های محتوایی و مشارکتی همه‌ی کاربران (یا کاربران داده‌شده) با یک فراخوانی kneighbors"""
+        model_user_ids = self.model['user_ids']
+        if user_ids is None:
+            rows = np.arange(len(model_user_ids))
+        else:
+            user_ids = np.unique(np.fromiter(user_ids, dtype=np.int64))
+            positions = np.searchsorted(model_user_ids, user_ids)
+            # فقط کاربرانی که در مدل هستند
+            found = positions < len(model_user_ids)
+            found[found] = model_user_ids[positions[found]] == user_ids[found]
+            rows = positions[found]
+        if len(rows) == 0:
+            return
+
+        # همسایه‌های همه‌ی کاربران در یک فراخوانی روی کل ماتریس (als به همسایه نیاز ندارد)
+        neighbors = None
+        if self.engine == 'knn':
+            n_neighbors = min(self.knn.n_neighbors, len(model_user_ids))
+            _, neighbors = self.knn.kneighbors(self.user_item[rows], n_neighbors=n_neighbors)
+
+        product_names = self.model['product_names']
+        chunk_size = max(1, BATCH_SCORE_CELLS // max(1, len(product_names)))
+        for start in range(0, len(rows), chunk_size):
+            chunk_rows = rows[start:start + chunk_size]
+            content_scores = self.content_scores_batch(chunk_rows)
+            collab_scores = self.collaborative_scores_batch(
+                chunk_rows, None if neighbors is None else neighbors[start:start + chunk_size]
+            )
+            content_top = self._top_n_rows(content_scores, n)
+            collab_top = self._top_n_rows(collab_scores, n)
+
+            for i, row in enumerate(chunk_rows):
+                content_recs = [
+                    (str(product_names[j]), float(content_scores[i, j]))
+                    for j in content_top[i] if np.isfinite(content_scores[i, j])
+                ]
+                collab_recs = [str(product_names[j]) for j in collab_top[i] if np.isfinite(collab_scores[i, j])]
+                yield int(model_user_ids[row]), content_recs, collab_recs
+
+    @staticmethod
+    def blend_recommendations(content_recs: List[Tuple[str, float]], collab_recs: List[str],
+                              order_count: int) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any]]:
+        """
+        ترکیب وزن‌دار توصیه‌های محتوایی و مشارکتی (وزن‌ها بر اساس تعداد سفارش کاربر)، بدون بررسی موجودی.
+        خروجی: ([(نام محصول، {score، source})] مرتب بر اساس امتیاز، metadata وزن‌ها)
+        """
+        # تنظیم وزن‌دهی بر اساس تعداد سفارش
+        if order_count == 0:
+            alpha, beta, reason = 0.7, 0.3, "new user (cold start)"
+        elif order_count < 10:
+            alpha, beta, reason = 0.5, 0.5, "few orders"
+        else:
+            alpha, beta, reason = 0.3, 0.7, "experienced user"
+
+        final = {}
+
+        # افزودن توصیه‌های content-based به دیکشنری نهایی با وزن alpha
+        for name, score in content_recs:
+            final[name] = {'score': score * alpha, 'source': 'content'}
+
+        # افزودن توصیه‌های collaborative به دیکشنری با وزن beta
+        for name in collab_recs:
+            if name not in final:
+                final[name] = {'score': beta, 'source': 'collaborative'}
+
+        # مرتب‌سازی توصیه‌ها بر اساس امتیاز نهایی
+        sorted_products = sorted(final.items(), key=lambda x: x[1]['score'], reverse=True)
+        metadata = {
+            'user_order_count': order_count,
+            'alpha': alpha,
+            'beta': beta,
+            'reason': reason
+        }
+        return sorted_products, metadata
+
+    def _rank_available(self, content_recs: List[Tuple[str, float]], collab_recs: List[str], order_count: int,
+                        n: int, details: Dict[str, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        ترکیب n کاندید برتر هر روش و حذف محصولات ناموجود؛ جای خالی با کاندیدهای اضافه (واکشی بیشتر) پر می‌شود.
+        اگر همه‌ی n کاندید برتر موجود باشند نتیجه همان ترکیب n تایی است.
+        """
+        sorted_products, metadata = self.blend_recommendations(content_recs[:n], collab_recs[:n], order_count)
+        backfill, _ = self.blend_recommendations(content_recs[n:], collab_recs[n:], order_count)
+
+        results = []
+        seen = set()
+        for product_name, data in chain(sorted_products, backfill):
+            if product_name in seen:
+                continue
+            seen.add(product_name)
+
+            product = details.get(product_name)
+            if product is None:
+                logger.debug(f"Product '{product_name}' not found in DB, skipping...")
+                continue
+            if not product['in_stock']:
+                logger.debug(f"Product '{product_name}' has insufficient stock, skipping...")
+                continue
+
+            results.append({
+                'product_name': product_name,
+                'product_image': product['image'],
+                'product_avg_score': product['avg_score'],
+                'score': round(data['score'], 3),
+                'source': data['source']
+            })
+
+            # محدود کردن به n نتیجه
+            if len(results) >= n:
+                break
+
+        return results, metadata
+
     def get_hybrid_recommendations(self, user_email: str, n: int = 5) -> Dict[str, Any]:
         try:
             logger.info(f"Getting hybrid recommendations for user: {user_email}")
@@ -193,75 +631,36 @@ class HybridRecommender:
             user_id = user.id
             logger.info(f"User ID resolved: {user_id}")
 
-            # اجرای مراحل توصیه‌گر
-            df = self.load_data()
-            df = self.prepare_content_features(df)
-            matrix = self.prepare_collaborative_features(df)
+            # کاربر جدید (بدون ردیف در مدل) یا پیش از آموزش مدل: محصولات پرطرفدار استان او از جدول از پیش محاسبه‌شده؛
+            # آموزش فقط در train_recommender انجام می‌شود
+            if not self.has_user(user_id):
+                logger.info(f"User {user_id} is not in the model, serving trending products")
+                province = RecommendationService.user_provinces([user_id]).get(user_id)
+                return RecommendationService.fallback_recommendations(province=province)
 
-            content_recs = self.get_content_recommendations(user_id, df, n)
-            collab_recs = self.get_collaborative_recommendations(user_id, matrix, n)
+            # کاندیدهای بیشتر از n تا حذف محصولات ناموجود به کوئری دوم نیاز نداشته باشد
+            content_recs = self.get_content_recommendations(user_id, n * CANDIDATE_OVERFETCH)
+            collab_recs = self.get_collaborative_recommendations(user_id, n * CANDIDATE_OVERFETCH)
+
+            # موجودی همه‌ی کاندیدها از تصویر حافظه یا یک کوئری annotate شده
+            details = get_product_availability(
+                [product_name for product_name, _ in content_recs] + collab_recs
+            )
 
             # تنظیم وزن‌دهی بر اساس تعداد سفارش
             order_count = Order.objects.filter(user=user).count()
-            if order_count == 0:
-                alpha, beta, reason = 0.7, 0.3, "new user (cold start)"
-            elif order_count < 10:
-                alpha, beta, reason = 0.5, 0.5, "few orders"
-            else:
-                alpha, beta, reason = 0.3, 0.7, "experienced user"
-
-            logger.info(f"Order count: {order_count} | alpha: {alpha}, beta: {beta} ({reason})")
-
-            final = {}
-
-            # افزودن توصیه‌های content-based به دیکشنری نهایی با وزن alpha
-            for name, score in content_recs:
-                final[name] = {'score': score * alpha, 'source': 'content'}
-
-            # افزودن توصیه‌های collaborative به دیکشنری با وزن beta
-            for name in collab_recs:
-                if name not in final:
-                    final[name] = {'score': beta, 'source': 'collaborative'}
-
-            # مرتب‌سازی توصیه‌ها بر اساس امتیاز نهایی
-            sorted_products = sorted(final.items(), key=lambda x: x[1]['score'], reverse=True)
-
-            results = []
-            for product_name, data in sorted_products:
-                # بررسی وجود محصول در دیتابیس
-                product = Product.objects.filter(name=product_name).first()
-                if not product:
-                    logger.warning(f"Product '{product_name}' not found in DB, skipping...")
-                    continue
-                if not product.productproperty_set.filter(total_stock__gte=3).exists():
-                    logger.warning(f"Product '{product_name}' has insufficient stock, skipping...")
-                    continue
-
-                # آماده‌سازی نتیجه نهایی توصیه‌شده
-                result = {
-                    'product_name': product.name,
-                    'product_image': product.image.url if product.image else None,
-                    'product_avg_score': product.avg_score,
-                    'score': round(data['score'], 3),
-                    'source': data['source']
-                }
-                results.append(result)
-                logger.debug(f"Added final recommendation: {result}")
-
-                # محدود کردن به n نتیجه
-                if len(results) >= n:
-                    break
+            results, metadata = self._rank_available(content_recs, collab_recs, order_count, n, details)
+
+            logger.info(
+                f"Order count: {order_count} | alpha: {metadata['alpha']}, beta: {metadata['beta']} "
+                f"({metadata['reason']})"
+            )
 
             logger.info(f"Final recommendation count: {len(results)}")
             return {
                 'success': True,
                 'recommendations': results,
-                'metadata': {
-                    'user_order_count': order_count,
-                    'alpha': alpha,
-                    'beta': beta,
-                    'reason': reason
-                }
+                'metadata': metadata
             }
         except Exception as e:
             logger.error(f"Hybrid recommendation error: {e}")
@@ -269,3 +668,243 @@ class HybridRecommender:
                 'success': False,
                 'error': str(e)
             }
+
+
+def _csr_arrays(prefix: str, matrix: sparse.csr_matrix) -> Dict[str, np.ndarray]:
+    # سه آرایه‌ی یک ماتریس CSR برای ذخیره در مدل
+    return {
+        f'{prefix}_data': matrix.data,
+        f'{prefix}_indices': matrix.indices,
+        f'{prefix}_indptr': matrix.indptr,
+    }
+
+
+def _csr_from_arrays(model: Dict[str, np.ndarray], prefix: str, shape: Tuple[int, int]) -> sparse.csr_matrix:
+    return sparse.csr_matrix(
+        (model[f'{prefix}_data'], model[f'{prefix}_indices'], model[f'{prefix}_indptr']),
+        shape=shape,
+        copy=False
+    )
+
+
+_recommender = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_recommender() -> Optional[HybridRecommender]:
+    """
+    توصیه‌گر هر پردازه: آخرین نسخه‌ی مدل یک بار بارگذاری و با انتشار نسخه‌ی جدید جایگزین می‌شود.
+    پیش از اولین اجرای train_recommender خروجی None است و فراخواننده محصولات پرطرفدار را برمی‌گرداند
+    """
+    global _recommender, _checked_at
+
+    if _recommender is not None and time.monotonic() - _checked_at < MODEL_CHECK_INTERVAL:
+        return _recommender
+
+    with _lock:
+        if _recommender is None or time.monotonic() - _checked_at >= MODEL_CHECK_INTERVAL:
+            version = latest_version(MODEL_NAME)
+            if version is None:
+                if _recommender is None:
+                    logger.warning("No trained model found, run train_recommender")
+            elif _recommender is None or _recommender.version != version:
+                _recommender = HybridRecommender.load(version)
+            _checked_at = time.monotonic()
+
+    return _recommender
+
+
+def load_product_details(product_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """اطلاعات نمایشی و وضعیت موجودی محصولات؛ یک کوئری annotate شده برای هر دسته"""
+    in_stock = ProductProperty.objects.filter(product=OuterRef('pk'), total_stock__gte=MIN_RECOMMENDABLE_STOCK)
+    product_names = list(product_names)
+    details = {}
+    for start in range(0, len(product_names), RECOMMENDATION_BATCH_SIZE):
+        products = Product.objects.filter(
+            name__in=product_names[start:start + RECOMMENDATION_BATCH_SIZE]
+        ).only('name', 'image', 'avg_score').annotate(in_stock=Exists(in_stock))
+        for product in products:
+            details[product.name] = {
+                'image': product.image.url if product.image else None,
+                'avg_score': product.avg_score,
+                'in_stock': product.in_stock
+            }
+    return details
+
+
+_availability = {}
+_availability_loaded_at = 0.0
+_availability_lock = threading.Lock()
+
+
+def get_product_availability(product_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    اطلاعات نمایشی و موجودی محصولات از تصویر کوتاه‌مدت (AVAILABILITY_TTL) حافظه‌ی پردازه؛
+    محصولاتی که در تصویر نیستند با یک کوئری annotate شده خوانده می‌شوند
+    """
+    global _availability, _availability_loaded_at
+
+    product_names = set(product_names)
+    with _availability_lock:
+        if time.monotonic() - _availability_loaded_at >= AVAILABILITY_TTL:
+            _availability = {}
+            _availability_loaded_at = time.monotonic()
+        snapshot = _availability
+        missing = product_names - snapshot.keys()
+
+    if missing:
+        details = load_product_details(missing)
+        with _availability_lock:
+            # محصولات ناموجود در دیتابیس هم (با None) نگه داشته می‌شوند تا دوباره پرس‌وجو نشوند
+            snapshot.update({product_name: details.get(product_name) for product_name in missing})
+
+    return {
+        product_name: snapshot[product_name]
+        for product_name in product_names
+        if snapshot.get(product_name) is not None
+    }
+
+
+def popular_recommendations(n: int = 5) -> Dict[str, Any]:
+    """توصیه‌های عمومی (پرفروش‌ترین محصولات موجود) برای کاربرانی که هنوز توصیه‌ی شخصی ندارند"""
+    popular = list(
+        OrderItem.objects.filter(order__status__in=Order.PURCHASED_STATUSES, product__isnull=False)
+        .values('product__product')
+        .annotate(order_count=Count('id'))
+        .order_by('-order_count')
+        .values_list('product__product', 'order_count')[:n * CANDIDATE_OVERFETCH]
+    )
+    details = get_product_availability(product_name for product_name, _ in popular)
+
+    results = []
+    for product_name, order_count in popular:
+        product = details.get(product_name)
+        if product is None or not product['in_stock']:
+            continue
+        results.append({
+            'product_name': product_name,
+            'product_image': product['image'],
+            'product_avg_score': product['avg_score'],
+            'score': round(order_count / popular[0][1], 3),
+            'source': 'popular'
+        })
+        if len(results) >= n:
+            break
+
+    return {
+        'success': True,
+        'recommendations': results,
+        'metadata': {'user_order_count': 0, 'reason': 'fallback (popular products)'}
+    }
+
+
+def trending_recommendations(n: int = 5, category: Optional[str] = None,
+                             province: Optional[str] = None) -> Dict[str, Any]:
+    """توصیه‌های محصولات پرطرفدار (تعداد خرید کاهش‌یافته با زمان)، کلی یا برای یک دسته‌بندی یا استان"""
+    if category:
+        scope, scope_value = 'category', category
+    elif province:
+        scope, scope_value = 'province', province
+    else:
+        scope, scope_value = 'global', ''
+
+    trending = TrendingService.top(n * CANDIDATE_OVERFETCH, scope, scope_value)
+    details = get_product_availability(product_name for product_name, _ in trending)
+
+    results = []
+    for product_name, score in trending:
+        product = details.get(product_name)
+        if product is None or not product['in_stock']:
+            continue
+        results.append({
+            'product_name': product_name,
+            'product_image': product['image'],
+            'product_avg_score': product['avg_score'],
+            'score': round(score / trending[0][1], 3),
+            'source': 'trending'
+        })
+        if len(results) >= n:
+            break
+
+    return {
+        'success': True,
+        'recommendations': results,
+        'metadata': {
+            'user_order_count': 0,
+            'reason': 'fallback (trending products)',
+            'scope': scope,
+            'scope_value': scope_value
+        }
+    }
+
+
+def _upsert_user_recommendations(objects: List[UserRecommendation]):
+    # MySQL کلید یکتا را خودش تشخیص می‌دهد و unique_fields را نمی‌پذیرد
+    kwargs = {}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['user']
+    UserRecommendation.objects.bulk_create(
+        objects, update_conflicts=True, update_fields=['data', 'updated_at'], **kwargs
+    )
+
+
+def refresh_recommendations(recommender: HybridRecommender, users=None, n: int = 5,
+                            batch_size: int = RECOMMENDATION_BATCH_SIZE) -> int:
+    """
+    محاسبه‌ی دسته‌ای توصیه‌ها برای کاربران داده‌شده (پیش‌فرض همه) و نوشتن آن‌ها با upsert دسته‌ای.
+    کاربران batch_size تا batch_size امتیازدهی، بررسی موجودی و ذخیره می‌شوند تا حافظه به اندازه‌ی یک دسته بماند.
+    خروجی: تعداد کاربران به‌روزرسانی‌شده (کاربران خارج از مدل شمرده نمی‌شوند)
+    """
+    if users is None:
+        users = User.objects.all()
+    user_ids = list(users.order_by('id').values_list('id', flat=True))
+
+    updated = 0
+    for start in range(0, len(user_ids), batch_size):
+        updated += _refresh_recommendations_chunk(recommender, user_ids[start:start + batch_size], n)
+    return updated
+
+
+def _refresh_recommendations_chunk(recommender: HybridRecommender, user_ids: List[int], n: int) -> int:
+    # امتیازدهی، موجودی و upsert یک دسته از کاربران
+    order_counts = dict(
+        Order.objects.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(count=Count('id'))
+        .values_list('user_id', 'count')
+    )
+    recommendations = {
+        user_id: (content_recs, collab_recs)
+        for user_id, content_recs, collab_recs in recommender.iter_batch_recommendations(
+            user_ids, n * CANDIDATE_OVERFETCH
+        )
+    }
+    # اطلاعات و موجودی فقط برای کاندیدهای رتبه‌بندی‌شده‌ی همین کاربران، نه کل کاتالوگ
+    details = get_product_availability(
+        product_name
+        for content_recs, collab_recs in recommendations.values()
+        for product_name in chain((name for name, _ in content_recs), collab_recs)
+    )
+
+    # کاربران جدید (بدون ردیف در مدل) ذخیره نمی‌شوند و محصولات پرطرفدار را هنگام درخواست می‌گیرند؛
+    # توصیه‌های قبلی آن‌ها حذف می‌شود تا داده‌ی کهنه برگردانده نشود
+    cold_start = [user_id for user_id in user_ids if user_id not in recommendations]
+    if cold_start:
+        UserRecommendation.objects.filter(user_id__in=cold_start).delete()
+
+    now = timezone.now()
+    pending = []
+    for user_id, (content_recs, collab_recs) in recommendations.items():
+        results, metadata = recommender._rank_available(
+            content_recs, collab_recs, order_counts.get(user_id, 0), n, details
+        )
+        pending.append(UserRecommendation(
+            user_id=user_id,
+            data={'success': True, 'recommendations': results, 'metadata': metadata},
+            updated_at=now
+        ))
+
+    if pending:
+        _upsert_user_recommendations(pending)
+    return len(pending)
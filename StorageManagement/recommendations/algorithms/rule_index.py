@@ -0,0 +1,173 @@
+# recommendations/algorithms/rule_index.py
+# ایندکس درون‌حافظه‌ای قوانین انجمنی نسخه‌ی فعال برای پیشنهاد بر اساس سبد خرید
+
+import itertools
+import threading
+import time
+from math import comb
+
+from products.models import Product
+from recommendations.models import AssociationRule, RuleProduct
+from recommendations.services import RuleSetService, RULE_BATCH_SIZE
+
+# فاصله‌ی زمانی (ثانیه) بین بررسی‌های تغییر نسخه‌ی فعال قوانین
+RULE_INDEX_CHECK_INTERVAL = 5
+
+
+class RuleIndex:
+    """نگاشت مجموعه‌ی مقدم -> لیست محصولات تالی مرتب بر اساس لیفت"""
+
+    def __init__(self, rule_set_id, antecedents, products):
+        self.rule_set_id = rule_set_id
+        # {frozenset(antecedent): [(product_name, lift, confidence, support)]}
+        self.antecedents = antecedents
+        # {product_name: Product}
+        self.products = products
+        # مقدم‌ها بر اساس طول، برای سبدهای بزرگ
+        self.by_size = {}
+        for antecedent in antecedents:
+            self.by_size.setdefault(len(antecedent), []).append(antecedent)
+
+    @classmethod
+    def build(cls, rule_set_id):
+        """ساخت ایندکس با سه کوئری (قوانین، محصولات قوانین، جزئیات محصولات تالی)"""
+        if rule_set_id is None:
+            return cls(None, {}, {})
+
+        rule_metrics = {
+            rule_id: (lift, confidence, support)
+            for rule_id, lift, confidence, support in AssociationRule.objects.filter(
+                rule_set_id=rule_set_id
+            ).values_list('id', 'lift', 'confidence', 'support')
+        }
+
+        rule_antecedents = {}
+        rule_consequents = {}
+        for rule_id, product_name, is_antecedent in RuleProduct.objects.filter(
+            rule__rule_set_id=rule_set_id
+        ).values_list('rule_id', 'product_id', 'is_antecedent').iterator(chunk_size=RULE_BATCH_SIZE):
+            target = rule_antecedents if is_antecedent else rule_consequents
+            target.setdefault(rule_id, []).append(product_name)
+
+        antecedents = _rank_consequents(
+            (antecedent, rule_consequents.get(rule_id, ()), *rule_metrics[rule_id])
+            for rule_id, antecedent in rule_antecedents.items()
+        )
+
+        product_names = list({name for consequents in antecedents.values() for name, _, _, _ in consequents})
+        products = {}
+        for start in range(0, len(product_names), RULE_BATCH_SIZE):
+            products.update(
+                (product.name, product)
+                for product in Product.objects.filter(
+                    name__in=product_names[start:start + RULE_BATCH_SIZE]
+                ).only('name', 'image', 'avg_score')
+            )
+
+        return cls(rule_set_id, antecedents, products)
+
+    @classmethod
+    def from_rules(cls, rules):
+        """ایندکس قوانین تولیدشده در حافظه (خروجی generateAssociationRules) بدون پایگاه داده؛ محصولات همان نام‌ها هستند"""
+        antecedents = _rank_consequents(
+            (rule['antecedent'], rule['consequent'], rule['lift'], rule['confidence'], rule['support'])
+            for rule in rules
+        )
+        products = {name: name for consequents in antecedents.values() for name, _, _, _ in consequents}
+        return cls(None, antecedents, products)
+
+    def _matching_antecedents(self, basket):
+        """مقدم‌هایی که زیرمجموعه‌ی سبد هستند"""
+        for size, antecedents in self.by_size.items():
+            if size > len(basket):
+                continue
+            # برای سبدهای بزرگ پیمایش مقدم‌ها از ساخت همه‌ی زیرمجموعه‌ها ارزان‌تر است
+            if comb(len(basket), size) <= len(antecedents):
+                for subset in itertools.combinations(basket, size):
+                    subset = frozenset(subset)
+                    if subset in self.antecedents:
+                        yield subset
+            else:
+                for antecedent in antecedents:
+                    if antecedent <= basket:
+                        yield antecedent
+
+    def recommend(self, product_names, limit=10):
+        """محصولات تالی قوانینی که مقدمشان در سبد است؛ خروجی مرتب بر اساس لیفت"""
+        basket = frozenset(product_names)
+        if not basket or not self.antecedents:
+            return []
+
+        best = {}
+        for antecedent in self._matching_antecedents(basket):
+            for product_name, lift, confidence, support in self.antecedents[antecedent]:
+                if product_name in basket:
+                    continue
+                current = best.get(product_name)
+                if current is None or (lift, confidence) > current[:2]:
+                    best[product_name] = (lift, confidence, support)
+
+        ranked = sorted(best.items(), key=lambda x: (-x[1][0], -x[1][1], x[0]))
+        return [
+            {
+                'product': self.products[product_name],
+                'confidence': confidence,
+                'lift': lift,
+                'support': support
+            }
+            for product_name, (lift, confidence, support) in ranked
+            if product_name in self.products
+        ][:limit]
+
+
+def _rank_consequents(rules):
+    """(مقدم، محصولات تالی، لیفت، اعتماد، پشتیبانی) -> {frozenset(مقدم): محصولات تالی مرتب بر اساس لیفت}"""
+    # بهترین قانون هر (مقدم، محصول تالی) بر اساس لیفت
+    best = {}
+    for antecedent, consequent_names, lift, confidence, support in rules:
+        consequents = best.setdefault(frozenset(antecedent), {})
+        for product_name in consequent_names:
+            current = consequents.get(product_name)
+            if current is None or (lift, confidence) > current[:2]:
+                consequents[product_name] = (lift, confidence, support)
+
+    return {
+        antecedent: sorted(
+            ((name, lift, confidence, support) for name, (lift, confidence, support) in consequents.items()),
+            key=lambda x: (-x[1], -x[2], x[0])
+        )
+        for antecedent, consequents in best.items()
+    }
+
+
+_rule_index = None
+_active_rule_set_id = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def active_rule_set_id():
+    """شناسه‌ی نسخه‌ی فعال قوانین در هر پردازه؛ حداکثر هر چند ثانیه یک بار از پایگاه داده خوانده می‌شود"""
+    global _active_rule_set_id, _checked_at
+
+    if _checked_at is not None and time.monotonic() - _checked_at < RULE_INDEX_CHECK_INTERVAL:
+        return _active_rule_set_id
+
+    _active_rule_set_id = RuleSetService.active_rule_set_id()
+    _checked_at = time.monotonic()
+    return _active_rule_set_id
+
+
+def get_rule_index():
+    """ایندکس هر پردازه؛ با تغییر نسخه‌ی فعال قوانین بازسازی می‌شود"""
+    global _rule_index
+
+    active_id = active_rule_set_id()
+    if _rule_index is not None and _rule_index.rule_set_id == active_id:
+        return _rule_index
+
+    with _lock:
+        if _rule_index is None or _rule_index.rule_set_id != active_id:
+            _rule_index = RuleIndex.build(active_id)
+
+    return _rule_index
@@ -0,0 +1,244 @@
+# recommendations/algorithms/support_counting.py
+# موتور شمارش پشتیبانی آیتم‌ست‌ها با بیت‌مپ‌های فشرده (NumPy)
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# هر کلمه‌ی بیت‌مپ ۶۴ تراکنش را نگه می‌دارد
+WORD_BITS = 64
+
+# سقف تعداد کلمه‌هایی که هنگام AND کردن یک دسته از کاندیدها هم‌زمان در حافظه ساخته می‌شوند
+MAX_WORDS_PER_BATCH = 1 << 22
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount_rows(words):
+        """تعداد بیت‌های یک در هر سطر"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount_rows(words):
+        """تعداد بیت‌های یک در هر سطر (جدول جست‌وجوی بایتی برای NumPy قدیمی)"""
+        words = np.ascontiguousarray(words)
+        return _BYTE_POPCOUNT[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def support_threshold(min_support, total_transactions):
+    """تبدیل نسبت حداقل پشتیبانی به تعداد تراکنش"""
+    return max(1, total_transactions * min_support)
+
+
+class EncodedTransactions:
+    """تراکنش‌هایی که نام محصولاتشان یک بار به شناسه‌ی عددی تبدیل شده است (قالب CSR)"""
+
+    def __init__(self, items, indptr, indices):
+        self.items = list(items)
+        self.item_to_id = {item: item_id for item_id, item in enumerate(self.items)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """کدگذاری تراکنش‌ها؛ ورودی می‌تواند هر iterable از سبدهای خرید باشد"""
+        if isinstance(transactions, cls):
+            return transactions
+
+        item_to_id = {}
+        indptr = array('q', [0])
+        indices = array('i')
+
+        for transaction in transactions:
+            # هر محصول در یک تراکنش فقط یک بار شمرده می‌شود
+            ids = {item_to_id.setdefault(item, len(item_to_id)) for item in transaction}
+            indices.extend(sorted(ids))
+            indptr.append(len(indices))
+
+        return cls(
+            list(item_to_id),
+            np.frombuffer(indptr, dtype=np.int64),
+            np.frombuffer(indices, dtype=np.int32),
+        )
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __iter__(self):
+        # بازگرداندن تراکنش‌ها به صورت لیست نام محصولات
+        items = self.items
+        for start, end in zip(self.indptr[:-1].tolist(), self.indptr[1:].tolist()):
+            yield [items[item_id] for item_id in self.indices[start:end].tolist()]
+
+    @property
+    def n_items(self):
+        return len(self.items)
+
+    def encode_itemsets(self, itemsets):
+        """تبدیل آیتم‌ست‌های k تایی به آرایه‌ی (m, k) از شناسه‌ها؛ آیتم ناشناخته = n_items"""
+        itemsets = list(itemsets)
+        if not itemsets:
+            return np.empty((0, 0), dtype=np.int64)
+
+        unknown = self.n_items
+        lookup = self.item_to_id
+        return np.array(
+            [[lookup.get(item, unknown) for item in itemset] for itemset in itemsets],
+            dtype=np.int64,
+        )
+
+
+def build_bitmaps(indptr, indices, n_items):
+    """ساخت بیت‌مپ تراکنش‌های هر آیتم؛ یک سطر صفر اضافه برای آیتم‌های ناشناخته"""
+    n_transactions = len(indptr) - 1
+    n_words = max(1, (n_transactions + WORD_BITS - 1) // WORD_BITS)
+    bitmaps = np.zeros((n_items + 1, n_words), dtype=np.uint64)
+
+    if len(indices) == 0:
+        return bitmaps
+
+    # شماره‌ی تراکنش هر درایه و جایگاه آن در بیت‌مپ
+    rows = np.repeat(np.arange(n_transactions, dtype=np.int64), np.diff(indptr))
+    flat = indices.astype(np.int64) * n_words + (rows // WORD_BITS)
+    bits = np.left_shift(np.uint64(1), (rows % WORD_BITS).astype(np.uint64))
+
+    # بیت‌های هر کلمه متمایزند، پس جمع آن‌ها همان OR است
+    order = np.argsort(flat, kind='stable')
+    flat = flat[order]
+    bits = bits[order]
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    bitmaps.reshape(-1)[flat[starts]] = np.add.reduceat(bits, starts)
+    return bitmaps
+
+
+def count_support(bitmaps, candidate_ids):
+    """پشتیبانی هر کاندید = popcount حاصل AND بیت‌مپ آیتم‌هایش"""
+    n_candidates = len(candidate_ids)
+    counts = np.zeros(n_candidates, dtype=np.int64)
+    if n_candidates == 0:
+        return counts
+
+    k = candidate_ids.shape[1]
+    batch_size = max(1, MAX_WORDS_PER_BATCH // bitmaps.shape[1])
+
+    for start in range(0, n_candidates, batch_size):
+        ids = candidate_ids[start:start + batch_size]
+        acc = bitmaps[ids[:, 0]]
+        for column in range(1, k):
+            np.bitwise_and(acc, bitmaps[ids[:, column]], out=acc)
+        counts[start:start + batch_size] = _popcount_rows(acc)
+
+    return counts
+
+
+class BitmapSupportCounter:
+    """شمارش پشتیبانی با بیت‌مپ‌های uint64 که یک بار برای همه‌ی سطوح Apriori ساخته می‌شوند"""
+
+    def __init__(self, transactions):
+        self.encoded = EncodedTransactions.from_transactions(transactions)
+        self.bitmaps = build_bitmaps(self.encoded.indptr, self.encoded.indices, self.encoded.n_items)
+
+    def count(self, itemsets):
+        itemsets = list(itemsets)
+        if not itemsets:
+            return {}
+
+        # آیتم‌ست‌ها ممکن است طول‌های متفاوت داشته باشند؛ هر طول جداگانه شمرده می‌شود
+        by_length = {}
+        for itemset in itemsets:
+            by_length.setdefault(len(itemset), []).append(itemset)
+
+        itemset_support = {}
+        for same_length in by_length.values():
+            candidate_ids = self.encoded.encode_itemsets(same_length)
+            counts = count_support(self.bitmaps, candidate_ids).tolist()
+            itemset_support.update(zip(same_length, counts))
+
+        return {itemset: itemset_support[itemset] for itemset in itemsets}
+
+    def close(self):
+        # بیت‌مپ‌ها در همین پردازه‌اند و منبع دیگری برای آزادسازی نیست
+        pass
+
+
+# بیت‌مپ‌های بخشی از تراکنش‌ها که این پردازه شمارش آن را بر عهده دارد
+_shard_bitmaps = None
+
+
+def _init_shard(indptr, indices, n_items):
+    """
+    initializer پردازه‌ی هر بخش: آرایه‌های CSR بخش فقط یک بار به پردازه فرستاده می‌شوند
+    و بیت‌مپ‌های آن یک بار ساخته و برای همه‌ی سطوح نگه داشته می‌شوند
+    """
+    global _shard_bitmaps
+    _shard_bitmaps = build_bitmaps(indptr, indices, n_items)
+
+
+def _count_shard_support(candidate_ids):
+    """شمارش پشتیبانی کاندیدها در بخش همین پردازه (در پردازه‌ی جداگانه اجرا می‌شود)"""
+    return count_support(_shard_bitmaps, candidate_ids)
+
+
+class ParallelSupportCounter:
+    """
+    شمارش پشتیبانی موازی: تراکنش‌ها به N بخش تقسیم می‌شوند و هر بخش یک پردازه‌ی ثابت دارد.
+    پردازه‌ها در اولین شمارش ساخته می‌شوند و تا close() برای همه‌ی سطوح می‌مانند
+    """
+
+    def __init__(self, transactions, workers=None):
+        self.encoded = EncodedTransactions.from_transactions(transactions)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._executors = None
+
+        # هر بخش فقط آرایه‌های عددی CSR خودش را دارد، نه لیست نام محصولات
+        bounds = np.linspace(0, len(self.encoded), self.workers + 1).astype(np.int64)
+        indptr = self.encoded.indptr
+        self.shards = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end <= start:
+                continue
+            shard_indptr = indptr[start:end + 1] - indptr[start]
+            shard_indices = self.encoded.indices[indptr[start]:indptr[end]]
+            self.shards.append((shard_indptr, shard_indices))
+
+    def _start_executors(self):
+        # یک پردازه برای هر بخش تا بیت‌مپ‌های هر بخش فقط در یک پردازه ساخته شوند
+        if self._executors is None:
+            self._executors = [
+                ProcessPoolExecutor(
+                    max_workers=1, initializer=_init_shard,
+                    initargs=(shard_indptr, shard_indices, self.encoded.n_items)
+                )
+                for shard_indptr, shard_indices in self.shards
+            ]
+        return self._executors
+
+    def count(self, itemsets):
+        itemsets = list(itemsets)
+        if not itemsets:
+            return {}
+
+        by_length = {}
+        for itemset in itemsets:
+            by_length.setdefault(len(itemset), []).append(itemset)
+
+        executors = self._start_executors()
+        itemset_support = {}
+        for same_length in by_length.values():
+            # برای هر طول فقط شناسه‌های کاندیدها فرستاده می‌شوند؛ آیتم ناشناخته به سطر صفر می‌رود
+            candidate_ids = self.encoded.encode_itemsets(same_length)
+            futures = [executor.submit(_count_shard_support, candidate_ids) for executor in executors]
+            counts = np.zeros(len(same_length), dtype=np.int64)
+            for future in futures:
+                counts += future.result()
+            itemset_support.update(zip(same_length, counts.tolist()))
+
+        return {itemset: itemset_support[itemset] for itemset in itemsets}
+
+    def close(self):
+        """پایان پردازه‌های بخش‌ها؛ پس از پایان استخراج فراخوانی می‌شود"""
+        if self._executors is not None:
+            for executor in self._executors:
+                executor.shutdown()
+            self._executors = None
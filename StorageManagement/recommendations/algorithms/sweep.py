@@ -0,0 +1,147 @@
+# recommendations/algorithms/sweep.py
+# کاوش با چند آستانه: پشتیبانی‌ها یک بار با کمترین آستانه شمرده می‌شوند و بقیه‌ی آستانه‌ها از همان جدول به دست می‌آیند
+
+import itertools
+import os
+import pickle
+import time
+
+import numpy as np
+
+from recommendations.algorithms.apriori import load_transactions, mine_frequent_itemsets, support_threshold
+from recommendations.algorithms.transaction_sources import transaction_source_version
+
+SUPPORT_TABLE_PATH = 'recommendations/data/support_table.pkl'
+
+
+def build_support_table(min_support, max_k, algorithm='apriori', backend='bitmap', workers=None, source='store'):
+    """شمارش یک‌باره‌ی پشتیبانی همه‌ی آیتم‌ست‌های پرتکرار در کمترین آستانه"""
+    # نسخه پیش از خواندن گرفته می‌شود تا تغییرات هم‌زمان به بازشماری در اجرای بعدی منجر شوند
+    source_version = transaction_source_version(source)
+    transactions, last_order_id, _ = load_transactions(source=source)
+    levels = mine_frequent_itemsets(
+        transactions, max_k, support_threshold(min_support, len(transactions)),
+        algorithm=algorithm, backend=backend, workers=workers
+    )
+    return {
+        'min_support': min_support,
+        'max_k': max_k,
+        'source': source,
+        'source_version': source_version,
+        'total_transactions': len(transactions),
+        'last_order_id': last_order_id,
+        'supports': {itemset: support for level in levels for itemset, support in level.items()},
+    }
+
+
+def save_support_table(table, path=SUPPORT_TABLE_PATH):
+    """ذخیره‌ی جدول پشتیبانی روی دیسک (نوشتن در فایل موقت و جایگزینی اتمیک)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def load_support_table(path=SUPPORT_TABLE_PATH):
+    """بارگذاری جدول پشتیبانی ذخیره‌شده (یا None)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def is_reusable(table, min_support, max_k, source, source_version):
+    """
+    جدولی که با آستانه‌ی کمتر و طول بیشتر شمرده شده برای آستانه‌های بالاتر هم کافی است،
+    به شرط آن‌که داده‌های منبع از زمان شمارش تغییر نکرده باشند
+    """
+    return (
+        table is not None
+        and table['source'] == source
+        and source_version is not None
+        and table.get('source_version') == source_version
+        and table['min_support'] <= min_support
+        and table['max_k'] >= max_k
+    )
+
+
+class RuleSweep:
+    """پشتیبانی و اعتماد همه‌ی قوانین ممکن در کمترین آستانه؛ قوانین هر آستانه‌ی بالاتر فقط یک ماسک NumPy است"""
+
+    def __init__(self, supports, total_transactions, max_k):
+        self.total_transactions = total_transactions
+        rule_support = []
+        antecedent_support = []
+
+        for itemset, itemset_support in supports.items():
+            if len(itemset) < 2 or len(itemset) > max_k:
+                continue
+            for i in range(1, len(itemset)):
+                for antecedent in itertools.combinations(itemset, i):
+                    rule_support.append(itemset_support)
+                    antecedent_support.append(supports.get(tuple(sorted(antecedent)), 0))
+
+        self.rule_support = np.array(rule_support, dtype=np.int64)
+        self.antecedent_support = np.array(antecedent_support, dtype=np.int64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.confidence = np.where(
+                self.antecedent_support > 0, self.rule_support / self.antecedent_support, 0.0
+            )
+
+    def __len__(self):
+        return len(self.rule_support)
+
+    def mask(self, min_support, min_confidence):
+        """قوانینی که با این آستانه‌ها تولید می‌شدند (آیتم‌ست پرتکرار و اعتماد کافی)"""
+        threshold = support_threshold(min_support, self.total_transactions)
+        return (self.rule_support >= threshold) & (self.confidence >= min_confidence)
+
+    def grid(self, support_values, confidence_values):
+        """تعداد قوانین و زمان استخراج هر خانه؛ خروجی: [(min_support, min_confidence, تعداد، ثانیه)]"""
+        cells = []
+        for min_support in support_values:
+            for min_confidence in confidence_values:
+                start = time.perf_counter()
+                rule_count = int(np.count_nonzero(self.mask(min_support, min_confidence)))
+                cells.append((min_support, min_confidence, rule_count, time.perf_counter() - start))
+        return cells
+
+
+def sweep_frequent_patterns(support_values, confidence_values, max_k=3, algorithm='apriori', backend='bitmap',
+                            workers=None, source='store', rebuild_cache=False, cache_path=SUPPORT_TABLE_PATH):
+    """تعداد قوانین برای همه‌ی ترکیب‌های آستانه‌ها با یک بار شمارش پشتیبانی"""
+    try:
+        lowest_support = min(support_values)
+        table = None if rebuild_cache else load_support_table(cache_path)
+
+        if is_reusable(table, lowest_support, max_k, source, transaction_source_version(source)):
+            print(f"Reusing support table counted at min_support={table['min_support']}")
+            from_cache = True
+        else:
+            print(f"Counting supports once at min_support={lowest_support}...")
+            table = build_support_table(
+                lowest_support, max_k, algorithm=algorithm, backend=backend, workers=workers, source=source
+            )
+            save_support_table(table, cache_path)
+            from_cache = False
+
+        print(f"{len(table['supports'])} frequent itemsets, building candidate rules...")
+        sweep = RuleSweep(table['supports'], table['total_transactions'], max_k)
+
+        return {
+            'success': True,
+            'from_cache': from_cache,
+            'total_transactions': table['total_transactions'],
+            'frequent_itemsets': len(table['supports']),
+            'candidate_rules': len(sweep),
+            'grid': sweep.grid(sorted(support_values), sorted(confidence_values))
+        }
+
+    except Exception as e:
+        print(f"Error in sweep_frequent_patterns: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,106 @@
+# recommendations/algorithms/synthetic.py
+# تولید سبدهای خرید و امتیازهای مصنوعی برای بنچمارک الگوریتم‌های کاوش الگو و توصیه‌گر
+
+from math import comb
+
+import numpy as np
+from scipy import sparse
+
+from recommendations.algorithms.support_counting import EncodedTransactions
+
+
+def generate_transactions(n_orders, n_items=1000, mean_basket_size=4.0, popularity_exponent=1.1, seed=0):
+    """
+    سبدهای خرید مصنوعی با محبوبیت توانی (Zipf) محصولات.
+    خروجی مستقیماً EncodedTransactions است تا ساخت یک میلیون سفارش هم سریع باشد.
+    """
+    rng = np.random.default_rng(seed)
+
+    # احتمال خرید هر محصول متناسب با 1 / rank^exponent
+    weights = 1.0 / np.arange(1, n_items + 1) ** popularity_exponent
+    probabilities = weights / weights.sum()
+
+    basket_sizes = np.maximum(1, rng.poisson(mean_basket_size, n_orders))
+    draws = rng.choice(n_items, size=int(basket_sizes.sum()), p=probabilities)
+    rows = np.repeat(np.arange(n_orders, dtype=np.int64), basket_sizes)
+
+    # حذف محصولات تکراری در هر سبد
+    order = np.lexsort((draws, rows))
+    rows = rows[order]
+    draws = draws[order]
+    keep = np.r_[True, (rows[1:] != rows[:-1]) | (draws[1:] != draws[:-1])]
+    rows = rows[keep]
+    draws = draws[keep]
+
+    indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=n_orders))]
+    items = [f'محصول {item_id}' for item_id in range(n_items)]
+    return EncodedTransactions(items, indptr, draws)
+
+
+def top_item_pairs(encoded, n_pairs):
+    """جفت‌های کاندید از پرتکرارترین آیتم‌ها (برای بنچمارک شمارش پشتیبانی)"""
+    item_counts = np.bincount(encoded.indices, minlength=encoded.n_items)
+    n_top = int(np.ceil((1 + np.sqrt(1 + 8 * n_pairs)) / 2))
+    top = np.argsort(-item_counts, kind='stable')[:n_top]
+    names = sorted(encoded.items[item_id] for item_id in top)
+
+    pairs = []
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            pairs.append((names[i], names[j]))
+            if len(pairs) >= n_pairs:
+                return pairs
+    return pairs
+
+
+def generate_frequent_itemsets(n_itemsets, size=2, density=0.5, seed=0):
+    """
+    آیتم‌ست‌های پرتکرار مصنوعی size تایی (برای بنچمارک تولید کاندید).
+    density سهم ترکیب‌های پرتکرار از همه‌ی ترکیب‌های size تایی آیتم‌هاست.
+    """
+    rng = np.random.default_rng(seed)
+
+    # کوچک‌ترین تعداد آیتم که با این چگالی n_itemsets ترکیب بدهد
+    n_items = size
+    while comb(n_items, size) * density < n_itemsets:
+        n_items += 1
+
+    itemsets = set()
+    while len(itemsets) < n_itemsets:
+        draws = np.sort(rng.integers(0, n_items, size=(n_itemsets, size)), axis=1)
+        distinct = np.all(draws[:, 1:] != draws[:, :-1], axis=1)
+        for row in draws[distinct].tolist():
+            itemsets.add(tuple(row))
+            if len(itemsets) >= n_itemsets:
+                break
+
+    # نام‌ها با طول ثابت تا ترتیب رشته‌ای با ترتیب عددی یکی باشد
+    width = len(str(n_items))
+    return sorted(tuple(f'محصول {item_id:0{width}d}' for item_id in itemset) for itemset in itemsets)
+
+
+def generate_ratings(n_users, n_products, ratings_per_user=20, n_groups=100, group_share=0.8, seed=0):
+    """
+    ماتریس پراکنده‌ی کاربر-محصول مصنوعی (CSR) برای بنچمارک جستجوی همسایه‌ها.
+    هر کاربر عضو یک گروه سلیقه‌ای است و group_share از امتیازهایش به محصولات محبوب همان گروه می‌رسد.
+    """
+    rng = np.random.default_rng(seed)
+
+    group_size = max(1, min(n_products, ratings_per_user * 5))
+    group_products = rng.integers(0, n_products, size=(n_groups, group_size))
+    groups = rng.integers(0, n_groups, n_users)
+
+    counts = np.maximum(1, rng.poisson(ratings_per_user, n_users))
+    rows = np.repeat(np.arange(n_users, dtype=np.int64), counts)
+    from_group = rng.random(len(rows)) < group_share
+    columns = np.where(
+        from_group,
+        group_products[groups[rows], rng.integers(0, group_size, len(rows))],
+        rng.integers(0, n_products, len(rows))
+    )
+    ratings = rng.integers(1, 6, len(rows)).astype(np.float64)
+
+    # امتیازهای تکراری یک کاربر به یک محصول جمع و به سقف ۵ محدود می‌شوند
+    matrix = sparse.csr_matrix((ratings, (rows, columns)), shape=(n_users, n_products))
+    matrix.data = np.minimum(matrix.data, 5)
+    return matrix
@@ -0,0 +1,165 @@
+# recommendations/algorithms/transaction_sources.py
+# خواندن تراکنش‌ها (سبد خرید سفارش‌ها) مستقیماً از پایگاه داده به صورت جریانی یا از داده‌های ستونی
+
+import os
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from recommendations.algorithms.feature_store import (
+    FEATURE_STORE_ROOT, ORDER_ITEMS_CSV_PATH, order_items_version, read_order_items
+)
+from recommendations.algorithms.support_counting import EncodedTransactions
+
+# تعداد ردیف‌هایی که در هر رفت‌وبرگشت از پایگاه داده خوانده می‌شوند
+STREAM_CHUNK_SIZE = 5000
+
+# سفارش‌های در انتظار پرداختِ زیر high-water mark که تا این مدت پس از ثبت پیگیری می‌شوند؛
+# پرداخت دیرتر از آن فقط در بازسازی کامل دوره‌ای شمرده می‌شود
+PENDING_ORDER_WINDOW = timedelta(days=30)
+
+
+def iter_order_baskets(statuses=Order.PURCHASED_STATUSES, after_order_id=None, until_order_id=None,
+                       chunk_size=STREAM_CHUNK_SIZE, include_order_ids=None, exclude_order_ids=None):
+    """
+    تولید (order_id, [نام محصولات]) برای هر سفارش بدون بارگذاری کل داده در حافظه.
+    include_order_ids: سفارش‌هایی که با وجود شناسه‌ی کوچک‌تر از after_order_id خوانده می‌شوند
+    """
+    queryset = OrderItem.objects.filter(product__isnull=False)
+    if statuses:
+        queryset = queryset.filter(order__status__in=statuses)
+    if after_order_id is not None:
+        after = Q(order_id__gt=after_order_id)
+        if include_order_ids:
+            after |= Q(order_id__in=include_order_ids)
+        queryset = queryset.filter(after)
+    if until_order_id is not None:
+        queryset = queryset.filter(order_id__lte=until_order_id)
+    if exclude_order_ids:
+        queryset = queryset.exclude(order_id__in=exclude_order_ids)
+
+    # نام محصول کلید اصلی Product است، پس نیازی به join با جدول محصولات نیست
+    rows = (
+        queryset.order_by('order_id')
+        .values_list('order_id', 'product__product_id')
+        .iterator(chunk_size=chunk_size)
+    )
+    for order_id, order_rows in groupby(rows, key=itemgetter(0)):
+        yield order_id, [product_name for _, product_name in order_rows]
+
+
+def load_transactions_from_db(statuses=Order.PURCHASED_STATUSES, after_order_id=None, until_order_id=None,
+                              chunk_size=STREAM_CHUNK_SIZE, include_order_ids=None, exclude_order_ids=None):
+    """کدگذاری مستقیم سبدهای خرید از پایگاه داده؛ خروجی: (تراکنش‌ها، شناسه و تاریخ آخرین سفارش)"""
+    last_order_id = None
+
+    def baskets():
+        nonlocal last_order_id
+        for order_id, basket in iter_order_baskets(
+            statuses, after_order_id, until_order_id, chunk_size, include_order_ids, exclude_order_ids
+        ):
+            last_order_id = order_id
+            yield basket
+
+    transactions = EncodedTransactions.from_transactions(baskets())
+
+    if last_order_id is None:
+        return transactions, None, None
+
+    last_order_created_at = Order.objects.filter(id=last_order_id).values_list('created_at', flat=True).first()
+    return transactions, last_order_id, last_order_created_at
+
+
+def pending_order_ids(until_order_id, now=None):
+    """سفارش‌های اخیر تا until_order_id که هنوز پرداخت نشده‌اند و ممکن است بعداً در کاوش شرکت کنند"""
+    now = now or timezone.now()
+    return list(
+        Order.objects.filter(
+            id__lte=until_order_id, status='pending', created_at__gte=now - PENDING_ORDER_WINDOW
+        ).order_by('id').values_list('id', flat=True)
+    )
+
+
+def paid_order_ids(order_ids, statuses=Order.PURCHASED_STATUSES):
+    """سفارش‌هایی از order_ids که اکنون وضعیتشان در statuses است"""
+    if not order_ids:
+        return []
+    return list(Order.objects.filter(id__in=order_ids, status__in=statuses).order_by('id').values_list('id', flat=True))
+
+
+def load_transactions_from_store(after_order_id=None, until_order_id=None, root=FEATURE_STORE_ROOT,
+                                 csv_file_path=ORDER_ITEMS_CSV_PATH):
+    """
+    کدگذاری سبدهای خرید از کدهای دیکشنری ستون product_name در داده‌های ستونی (بدون ساخت لیست رشته‌ها)؛
+    مانند خواندن از پایگاه داده فقط سفارش‌های خریداری‌شده شمرده می‌شوند.
+    خروجی: (تراکنش‌ها، شناسه و تاریخ آخرین سفارش)
+    """
+    data = read_order_items(
+        ['order_id', 'product_name', 'order_created_at', 'order_status'], root=root, csv_file_path=csv_file_path
+    )
+    data = data[data['order_status'].isin(Order.PURCHASED_STATUSES)]
+
+    # محدود کردن به بازه‌ی شناسه‌ی سفارش‌ها (برای حالت افزایشی)
+    if after_order_id is not None:
+        data = data[data['order_id'] > after_order_id]
+    if until_order_id is not None:
+        data = data[data['order_id'] <= until_order_id]
+
+    # نام محصولات مثل خواندن CSV بدون فاصله‌ی اضافه؛ نام خالی شمرده نمی‌شود
+    names = np.char.strip(np.asarray(data['product_name'].cat.categories, dtype=str))
+    item_names, name_items = np.unique(names, return_inverse=True)
+    codes = data['product_name'].cat.codes.to_numpy()
+    keep = codes >= 0
+    keep[keep] = ~np.isin(item_names[name_items[codes[keep]]], ['', 'nan'])
+
+    order_ids = data['order_id'].to_numpy()[keep]
+    if len(order_ids) == 0:
+        return EncodedTransactions([], [0], []), None, None
+    row_items = name_items[codes[keep]]
+
+    # فقط محصولات به کار رفته، با شناسه‌های پشت سر هم
+    used, row_items = np.unique(row_items, return_inverse=True)
+
+    # مرتب‌سازی بر اساس سفارش و محصول؛ هر محصول در یک سفارش فقط یک بار شمرده می‌شود
+    order = np.lexsort((row_items, order_ids))
+    order_ids, row_items = order_ids[order], row_items[order]
+    first = np.ones(len(order_ids), dtype=bool)
+    first[1:] = (order_ids[1:] != order_ids[:-1]) | (row_items[1:] != row_items[:-1])
+    order_ids, row_items = order_ids[first], row_items[first]
+
+    starts = np.flatnonzero(np.r_[True, order_ids[1:] != order_ids[:-1]])
+    transactions = EncodedTransactions(
+        item_names[used].tolist(), np.r_[starts, len(order_ids)], row_items
+    )
+
+    last_order_id = int(order_ids[-1])
+    last_order_created_at = data['order_created_at'].max()
+    if pd.isna(last_order_created_at):
+        last_order_created_at = None
+    else:
+        last_order_created_at = last_order_created_at.to_pydatetime()
+    return transactions, last_order_id, last_order_created_at
+
+
+def transaction_source_version(source, csv_file_path=ORDER_ITEMS_CSV_PATH):
+    """
+    نشانه‌ی وضعیت فعلی داده‌های یک منبع؛ با سفارش جدید، پرداخت دیرهنگام یا لغو سفارش تغییر می‌کند
+    تا نتایج ذخیره‌شده‌ی قدیمی دوباره استفاده نشوند
+    """
+    if source == 'db':
+        stats = Order.objects.filter(status__in=Order.PURCHASED_STATUSES).aggregate(last=Max('id'), total=Count('id'))
+        return f"{stats['last'] or 0}:{stats['total']}"
+    if source == 'store':
+        return order_items_version(csv_file_path=csv_file_path)
+    if source == 'csv':
+        try:
+            return f'csv@{os.path.getmtime(csv_file_path)}'
+        except OSError:
+            return None
+    raise ValueError(f"Unknown transaction source: {source}")
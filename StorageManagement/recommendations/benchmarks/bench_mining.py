@@ -0,0 +1,75 @@
+# recommendations/benchmarks/bench_mining.py
+# بنچمارک مراحل کاوش الگو با pytest-benchmark؛ نام فایل test_* نیست تا در اجرای عادی تست‌ها جمع‌آوری نشود.
+# اجرا: pytest recommendations/benchmarks/bench_mining.py --benchmark-json=bench.json
+# سفارش‌های یک میلیونی فقط با MINING_BENCHMARK_LARGE=1 اجرا می‌شوند.
+
+import os
+
+import django
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'StorageManagement.settings')
+django.setup()
+
+pytest.importorskip('pytest_benchmark')
+
+from recommendations.algorithms.apriori import (  # noqa: E402
+    generateAssociationRules, get_support_counter, removeItemset, support_threshold,
+)
+from recommendations.algorithms.candidate_generation import generate_candidates  # noqa: E402
+from recommendations.algorithms.fpgrowth import fpgrowth  # noqa: E402
+from recommendations.algorithms.support_counting import EncodedTransactions  # noqa: E402
+from recommendations.algorithms.synthetic import generate_transactions  # noqa: E402
+
+ORDER_COUNTS = [1000, 100000]
+if os.environ.get('MINING_BENCHMARK_LARGE'):
+    ORDER_COUNTS.append(1000000)
+
+MIN_SUPPORT = 0.005
+MIN_CONFIDENCE = 0.5
+
+
+@pytest.fixture(scope='module', params=ORDER_COUNTS, ids=lambda n: f'{n}_orders')
+def encoded(request):
+    return generate_transactions(request.param, n_items=2000, seed=0)
+
+
+@pytest.fixture(scope='module')
+def baskets(encoded):
+    return list(encoded)
+
+
+@pytest.fixture(scope='module')
+def threshold(encoded):
+    return support_threshold(MIN_SUPPORT, len(encoded))
+
+
+@pytest.fixture(scope='module')
+def frequent_pairs(encoded, threshold):
+    counter = get_support_counter('bitmap', encoded)
+    frequent_1 = removeItemset(counter.count([(item,) for item in encoded.items]), threshold)
+    return removeItemset(counter.count(generate_candidates(frequent_1, 2)), threshold)
+
+
+def test_encoding(benchmark, baskets):
+    benchmark(EncodedTransactions.from_transactions, baskets)
+
+
+def test_candidate_generation(benchmark, frequent_pairs):
+    benchmark(generate_candidates, frequent_pairs, 3)
+
+
+@pytest.mark.parametrize('backend', ['bitmap', 'hashtree'])
+def test_support_counting(benchmark, encoded, frequent_pairs, backend):
+    counter = get_support_counter(backend, encoded)
+    candidates = generate_candidates(frequent_pairs, 3) or frequent_pairs
+    benchmark(counter.count, candidates)
+
+
+def test_rule_generation(benchmark, encoded, threshold):
+    levels = fpgrowth(encoded, 3, threshold)
+    benchmark(generateAssociationRules, levels, None, MIN_CONFIDENCE, len(encoded))
+
+
+def test_fpgrowth(benchmark, encoded, threshold):
+    benchmark.pedantic(fpgrowth, args=(encoded, 3, threshold), rounds=3)
@@ -21,7 +21,42 @@ beat_schedule = {
     },
     'frequent_pattern_mining': {
         'task': 'recommendations.tasks.frequent_pattern_mining',
-        'schedule': crontab(hour='*/24'),
+        'schedule': crontab(minute=30),  # Run every hour (incremental update)
+        'options': {'queue': 'recommendations'}
+    },
+    'rebuild_frequent_patterns': {
+        'task': 'recommendations.tasks.rebuild_frequent_patterns',
+        'schedule': crontab(minute=0, hour=1),  # Run every night (full rebuild)
+        'options': {'queue': 'recommendations'}
+    },
+    'purge_stale_rule_sets': {
+        'task': 'recommendations.tasks.purge_stale_rule_sets',
+        'schedule': crontab(minute=0, hour=3),
+        'options': {'queue': 'recommendations'}
+    },
+    'train_recommender': {
+        'task': 'recommendations.tasks.train_recommender',
+        'schedule': crontab(minute=15, hour=2),  # Run every night
+        'options': {'queue': 'recommendations'}
+    },
+    'build_copurchase_graph': {
+        'task': 'recommendations.tasks.build_copurchase_graph',
+        'schedule': crontab(minute=40, hour=2),  # Run every night
+        'options': {'queue': 'recommendations'}
+    },
+    'refresh_fallback_recommendations': {
+        'task': 'recommendations.tasks.refresh_fallback_recommendations',
+        'schedule': crontab(minute=45),  # Run every hour
+        'options': {'queue': 'recommendations'}
+    },
+    'refresh_dirty_recommendations': {
+        'task': 'recommendations.tasks.refresh_dirty_recommendations',
+        'schedule': crontab(minute='*/10'),  # Run every 10 minutes
+        'options': {'queue': 'recommendations'}
+    },
+    'update_trending_products': {
+        'task': 'recommendations.tasks.update_trending_products',
+        'schedule': crontab(minute='*/15'),  # Run every 15 minutes (incremental update)
         'options': {'queue': 'recommendations'}
     }
 } 
\ No newline at end of file
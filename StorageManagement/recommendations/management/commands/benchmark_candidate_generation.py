@@ -0,0 +1,81 @@
+# recommendations/management/commands/benchmark_candidate_generation.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.algorithms.apriori import generateCandidate
+from recommendations.algorithms.candidate_generation import generate_candidates
+from recommendations.algorithms.synthetic import generate_frequent_itemsets
+
+
+class Command(BaseCommand):
+    help = 'Benchmark prefix-join candidate generation against the legacy pairwise generator'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 50000],
+            help='Numbers of frequent (k-1)-itemsets to generate candidates from (default: 1000 10000 50000)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=3,
+            help='Size of the generated candidates (default: 3)'
+        )
+        parser.add_argument(
+            '--density',
+            type=float,
+            default=0.5,
+            help='Share of all (k-1)-combinations of the item pool that are frequent (default: 0.5)'
+        )
+        parser.add_argument(
+            '--legacy-limit',
+            type=int,
+            default=1000,
+            help='Largest input size the legacy generator is run on, it is far slower than linear (default: 1000)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated itemsets (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        k = options['k']
+        if k < 2:
+            self.stdout.write(self.style.ERROR('--k must be at least 2'))
+            return
+
+        self.stdout.write(
+            f'{"itemsets":<10}{"candidates":>12}{"prefix-join":>14}{"legacy":>12}{"speedup":>10}'
+        )
+        for size in options['sizes']:
+            itemsets = generate_frequent_itemsets(size, size=k - 1, density=options['density'], seed=options['seed'])
+
+            start = time.perf_counter()
+            candidates = generate_candidates(itemsets, k)
+            elapsed = time.perf_counter() - start
+
+            if size > options['legacy_limit']:
+                self.stdout.write(f'{size:<10}{len(candidates):>12}{elapsed:>13.3f}s{"skipped":>12}{"-":>10}')
+                continue
+
+            start = time.perf_counter()
+            legacy_candidates = generateCandidate(itemsets, k)
+            legacy_elapsed = time.perf_counter() - start
+
+            if set(legacy_candidates) != set(candidates):
+                self.stdout.write(self.style.ERROR(f'Candidates for {size} itemsets differ from the legacy generator'))
+                return
+
+            self.stdout.write(
+                f'{size:<10}{len(candidates):>12}{elapsed:>13.3f}s{legacy_elapsed:>11.3f}s'
+                f'{legacy_elapsed / max(elapsed, 1e-9):>9.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
@@ -0,0 +1,129 @@
+# recommendations/management/commands/benchmark_collaborative.py
+
+import logging
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from recommendations.algorithms.als import ALS_FACTORS, ALS_ITERATIONS, ALS_ALPHA, ALS_REGULARIZATION
+from recommendations.algorithms.product_recommendation import HybridRecommender
+
+
+class Command(BaseCommand):
+    help = 'Compare the KNN and ALS collaborative engines offline on leave-one-out hit-rate@k and query latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=500,
+            help='Number of sampled users with one held-out purchase each (default: 500)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=10,
+            help='Number of recommendations per user (default: 10)'
+        )
+        parser.add_argument(
+            '--factors',
+            type=int,
+            default=ALS_FACTORS,
+            help=f'ALS latent factors (default: {ALS_FACTORS})'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=ALS_ITERATIONS,
+            help=f'ALS iterations (default: {ALS_ITERATIONS})'
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=ALS_ALPHA,
+            help=f'ALS confidence scale for purchase quantities (default: {ALS_ALPHA})'
+        )
+        parser.add_argument(
+            '--regularization',
+            type=float,
+            default=ALS_REGULARIZATION,
+            help=f'ALS L2 regularization (default: {ALS_REGULARIZATION})'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the held-out sample (default: 0)'
+        )
+
+    def _hold_out(self, df, n_users, seed):
+        # یک محصول تصادفی از هر کاربر نمونه که دست کم دو محصول خریده و محصولش خریدار دیگری هم دارد
+        pairs = df[['user_id', 'product_name']].dropna().drop_duplicates()
+        buyers = pairs.groupby('product_name')['user_id'].transform('size')
+        products_per_user = pairs.groupby('user_id')['product_name'].transform('size')
+        candidates = pairs[(buyers > 1) & (products_per_user > 1)]
+
+        rng = np.random.default_rng(seed)
+        held_out = candidates.sample(frac=1, random_state=rng).drop_duplicates('user_id')
+        held_out = held_out.head(n_users).set_index('user_id')['product_name']
+
+        # همه‌ی ردیف‌های جفت‌های کنار گذاشته‌شده از داده‌ی آموزش حذف می‌شوند
+        keys = df['user_id'].map(held_out)
+        return df[keys != df['product_name']].reset_index(drop=True), held_out
+
+    def _evaluate(self, recommender, held_out, k):
+        latencies = []
+        hits = 0
+        for user_id, product_name in held_out.items():
+            start = time.perf_counter()
+            recommendations = recommender.get_collaborative_recommendations(user_id, k)
+            latencies.append(time.perf_counter() - start)
+            hits += product_name in recommendations
+        return hits / len(held_out), np.array(latencies) * 1000
+
+    def handle(self, *args, **options):
+        try:
+            df = HybridRecommender().load_data()
+            train, held_out = self._hold_out(df, options['users'], options['seed'])
+            if held_out.empty:
+                self.stdout.write(self.style.ERROR('Not enough purchase history to hold out any products'))
+                return
+            self.stdout.write(f'Training rows: {len(train)}, held-out users: {len(held_out)}')
+
+            k = options['k']
+            als_params = {
+                'factors': options['factors'],
+                'iterations': options['iterations'],
+                'alpha': options['alpha'],
+                'regularization': options['regularization'],
+            }
+            engines = [
+                ('knn', HybridRecommender(engine='knn')),
+                (f'als ({options["factors"]} factors)', HybridRecommender(engine='als', als_params=als_params)),
+            ]
+
+            results = []
+            # لاگ هر درخواست در زمان‌سنجی حساب نمی‌شود
+            logging.disable(logging.INFO)
+            try:
+                for name, recommender in engines:
+                    start = time.perf_counter()
+                    recommender.fit(train.copy())
+                    train_time = time.perf_counter() - start
+                    hit_rate, latencies = self._evaluate(recommender, held_out, k)
+                    results.append((name, train_time, latencies, hit_rate))
+            finally:
+                logging.disable(logging.NOTSET)
+
+            self.stdout.write(f'{"engine":<22}{"train s":>10}{"p50 ms":>10}{"p95 ms":>10}{"hit@" + str(k):>10}')
+            for name, train_time, latencies, hit_rate in results:
+                self.stdout.write(
+                    f'{name:<22}{train_time:>10.2f}{np.percentile(latencies, 50):>10.2f}'
+                    f'{np.percentile(latencies, 95):>10.2f}{hit_rate:>10.3f}'
+                )
+
+            self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'An error occurred: {e}'))
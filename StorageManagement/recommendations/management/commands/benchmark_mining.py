@@ -0,0 +1,152 @@
+# recommendations/management/commands/benchmark_mining.py
+
+import json
+import os
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recommendations.algorithms.apriori import SUPPORT_COUNTING_BACKENDS
+from recommendations.algorithms.mining_benchmark import run_mining_benchmark, benchmark_environment
+
+BENCHMARK_OUTPUT_DIR = 'recommendations/data/benchmarks'
+
+
+class Command(BaseCommand):
+    help = 'Time each Apriori stage (encoding, candidates, counting, rules, DB) on generated baskets and write JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--orders',
+            type=int,
+            nargs='+',
+            default=[1000, 100000, 1000000],
+            help='Generated order counts to benchmark (default: 1000 100000 1000000)'
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=2000,
+            help='Number of distinct products (default: 2000)'
+        )
+        parser.add_argument(
+            '--basket-size',
+            type=float,
+            default=4.0,
+            help='Mean number of products per order (default: 4.0)'
+        )
+        parser.add_argument(
+            '--popularity-exponent',
+            type=float,
+            default=1.1,
+            help='Power-law exponent of product popularity (default: 1.1)'
+        )
+        parser.add_argument(
+            '--min-support',
+            type=float,
+            default=0.005,
+            help='Minimum support ratio (default: 0.005)'
+        )
+        parser.add_argument(
+            '--min-confidence',
+            type=float,
+            default=0.5,
+            help='Minimum confidence threshold (default: 0.5)'
+        )
+        parser.add_argument(
+            '--max-itemset-size',
+            type=int,
+            default=3,
+            help='Maximum itemset size (default: 3)'
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(SUPPORT_COUNTING_BACKENDS),
+            default='bitmap',
+            help='Support counting engine (default: bitmap)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes for the parallel backend (default: CPU count)'
+        )
+        parser.add_argument(
+            '--skip-db',
+            action='store_true',
+            help='Do not time rule persistence (it always runs inside a rolled back transaction)'
+        )
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='Disable tracemalloc; timings are closer to production but peak memory is not reported'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated data (default: 0)'
+        )
+        parser.add_argument(
+            '--output',
+            help=f'JSON result path (default: {BENCHMARK_OUTPUT_DIR}/mining_<timestamp>.json)'
+        )
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        runs = []
+
+        for n_orders in options['orders']:
+            self.stdout.write(f'Benchmarking {n_orders} orders...')
+            result = run_mining_benchmark(
+                n_orders,
+                n_items=options['items'],
+                mean_basket_size=options['basket_size'],
+                popularity_exponent=options['popularity_exponent'],
+                min_support=options['min_support'],
+                min_confidence=options['min_confidence'],
+                max_k=options['max_itemset_size'],
+                backend=options['backend'],
+                workers=options['workers'],
+                persist=not options['skip_db'],
+                trace_memory=not options['no_memory'],
+                seed=options['seed']
+            )
+            runs.append(result)
+
+            self.stdout.write(
+                f'  {result["order_items"]} order items, {result["unique_products"]} products, '
+                f'candidates per level {result["candidates_per_level"]}, {result["rules"]} rules'
+            )
+            self.stdout.write(f'  {"stage":<22}{"seconds":>10}{"peak MiB":>12}')
+            for stage, stats in result['stages'].items():
+                peak = '-' if stats['peak_bytes'] is None else f'{stats["peak_bytes"] / 2 ** 20:.1f}'
+                self.stdout.write(f'  {stage:<22}{stats["seconds"]:>10.3f}{peak:>12}')
+            self.stdout.write(f'  {"total":<22}{result["total_seconds"]:>10.3f}')
+
+        report = {
+            'started_at': started_at.isoformat(),
+            'environment': benchmark_environment(),
+            'parameters': {
+                'items': options['items'],
+                'basket_size': options['basket_size'],
+                'popularity_exponent': options['popularity_exponent'],
+                'min_support': options['min_support'],
+                'min_confidence': options['min_confidence'],
+                'max_itemset_size': options['max_itemset_size'],
+                'backend': options['backend'],
+                'workers': options['workers'],
+                'trace_memory': not options['no_memory'],
+                'seed': options['seed'],
+            },
+            'runs': runs,
+        }
+
+        output = options['output'] or os.path.join(
+            BENCHMARK_OUTPUT_DIR, f'mining_{started_at.strftime("%Y%m%d_%H%M%S")}.json'
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f'Benchmark written to {output}'))
@@ -0,0 +1,143 @@
+# recommendations/management/commands/benchmark_neighbors.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from recommendations.algorithms.neighbors import (
+    CosineLSHIndex, build_neighbors_index, LSH_BITS, LSH_MAX_CANDIDATES,
+)
+from recommendations.algorithms.product_recommendation import HybridRecommender
+from recommendations.algorithms.synthetic import generate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Benchmark recall@k and query latency of the approximate (LSH) neighbor search against exact KNN'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=100000,
+            help='Number of generated users (default: 100000)'
+        )
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=20000,
+            help='Number of generated products (default: 20000)'
+        )
+        parser.add_argument(
+            '--ratings-per-user',
+            type=int,
+            default=20,
+            help='Average ratings per generated user (default: 20)'
+        )
+        parser.add_argument(
+            '--model',
+            action='store_true',
+            help='Use the user-item matrix of the latest published model instead of generated ratings'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=200,
+            help='Number of sampled query users (default: 200)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=5,
+            help='Number of neighbors (default: 5)'
+        )
+        parser.add_argument(
+            '--tables',
+            type=int,
+            nargs='+',
+            default=[8, 16, 32, 64],
+            help='LSH table counts to compare (default: 8 16 32 64)'
+        )
+        parser.add_argument(
+            '--bits',
+            type=int,
+            default=LSH_BITS,
+            help=f'Hash bits per LSH table (default: {LSH_BITS})'
+        )
+        parser.add_argument(
+            '--max-candidates',
+            type=int,
+            default=LSH_MAX_CANDIDATES,
+            help=f'Candidate cap per LSH query (default: {LSH_MAX_CANDIDATES})'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated data and query sample (default: 0)'
+        )
+
+    def _run(self, index, matrix, queries, k):
+        start = time.perf_counter()
+        index.fit(matrix)
+        build_time = time.perf_counter() - start
+
+        latencies = []
+        neighbors = []
+        for row in queries:
+            start = time.perf_counter()
+            _, indices = index.kneighbors(matrix[row], n_neighbors=k)
+            latencies.append(time.perf_counter() - start)
+            neighbors.append(indices[0])
+        return build_time, np.array(latencies) * 1000, neighbors
+
+    def _report(self, name, build_time, latencies, recall):
+        self.stdout.write(
+            f'{name:<26}{build_time:>10.2f}{np.percentile(latencies, 50):>10.2f}'
+            f'{np.percentile(latencies, 95):>10.2f}{recall:>10.3f}'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['model']:
+                recommender = HybridRecommender.load()
+                if recommender is None:
+                    self.stdout.write(self.style.ERROR('No published model found, run train_recommender first'))
+                    return
+                matrix = recommender.user_item
+            else:
+                self.stdout.write(
+                    f'Generating {options["users"]} users x {options["products"]} products '
+                    f'({options["ratings_per_user"]} ratings per user)...'
+                )
+                matrix = generate_ratings(
+                    options['users'], options['products'],
+                    ratings_per_user=options['ratings_per_user'], seed=options['seed']
+                )
+            self.stdout.write(f'User-item matrix: {matrix.shape[0]} x {matrix.shape[1]}, {matrix.nnz} ratings')
+
+            k = options['k']
+            rng = np.random.default_rng(options['seed'])
+            queries = rng.choice(matrix.shape[0], size=min(options['queries'], matrix.shape[0]), replace=False)
+
+            self.stdout.write(f'{"backend":<26}{"build s":>10}{"p50 ms":>10}{"p95 ms":>10}{"recall@" + str(k):>10}')
+            build_time, latencies, exact = self._run(build_neighbors_index('exact', k), matrix, queries, k)
+            self._report('exact', build_time, latencies, 1.0)
+
+            for tables in options['tables']:
+                index = CosineLSHIndex(
+                    n_neighbors=k, n_tables=tables, n_bits=options['bits'],
+                    max_candidates=options['max_candidates'], seed=options['seed']
+                )
+                build_time, latencies, approx = self._run(index, matrix, queries, k)
+                # سهم همسایه‌های دقیق که جستجوی تقریبی هم پیدا کرده است
+                recall = np.mean([
+                    len(np.intersect1d(found, expected)) / len(expected)
+                    for found, expected in zip(approx, exact)
+                ])
+                self._report(f'approx ({tables}x{options["bits"]} bits)', build_time, latencies, recall)
+
+            self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'An error occurred: {e}'))
@@ -0,0 +1,86 @@
+# recommendations/management/commands/benchmark_support_counting.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.algorithms.support_counting import BitmapSupportCounter, ParallelSupportCounter
+from recommendations.algorithms.synthetic import generate_transactions, top_item_pairs
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sharded multi-process support counting from 1 to N workers on generated baskets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--orders',
+            type=int,
+            default=500000,
+            help='Number of generated orders (default: 500000)'
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=2000,
+            help='Number of distinct products (default: 2000)'
+        )
+        parser.add_argument(
+            '--candidates',
+            type=int,
+            default=50000,
+            help='Number of candidate 2-itemsets to count (default: 50000)'
+        )
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Largest worker count in the scaling curve (default: CPU count)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per worker count, the best time is reported (default: 3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated data (default: 0)'
+        )
+
+    def _best_time(self, counter, candidates, repeat):
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = counter.count(candidates)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Generating {options["orders"]} orders over {options["items"]} products...')
+        encoded = generate_transactions(options['orders'], n_items=options['items'], seed=options['seed'])
+        candidates = top_item_pairs(encoded, options['candidates'])
+        self.stdout.write(f'{len(encoded.indices)} order items, {len(candidates)} candidate 2-itemsets')
+
+        baseline_time, expected = self._best_time(BitmapSupportCounter(encoded), candidates, options['repeat'])
+        self.stdout.write(f'{"bitmap (in-process)":<22}{baseline_time:>10.3f}s')
+
+        self.stdout.write(f'{"workers":<10}{"seconds":>12}{"speedup":>10}')
+        single_worker_time = None
+        for workers in range(1, options['max_workers'] + 1):
+            counter = ParallelSupportCounter(encoded, workers=workers)
+            elapsed, result = self._best_time(counter, candidates, options['repeat'])
+
+            if result != expected:
+                self.stdout.write(self.style.ERROR(f'Counts with {workers} workers differ from the bitmap counter'))
+                return
+
+            if single_worker_time is None:
+                single_worker_time = elapsed
+            self.stdout.write(f'{workers:<10}{elapsed:>12.3f}{single_worker_time / elapsed:>9.2f}x')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
@@ -0,0 +1,141 @@
+# recommendations/management/commands/evaluate_recommenders.py
+
+import json
+import os
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recommendations.algorithms.evaluation import EVALUATED_RECOMMENDERS, run_evaluation
+from recommendations.algorithms.mining_benchmark import benchmark_environment
+from recommendations.algorithms.product_recommendation import COLLABORATIVE_ENGINES
+
+BENCHMARK_OUTPUT_DIR = 'recommendations/data/benchmarks'
+
+
+class Command(BaseCommand):
+    help = ('Evaluate recommenders offline on a time-based order split '
+            '(precision/recall@k, coverage, serving latency, training time and memory) and write JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recommenders',
+            nargs='+',
+            choices=EVALUATED_RECOMMENDERS,
+            default=list(EVALUATED_RECOMMENDERS),
+            help=f'Recommenders to evaluate (default: {" ".join(EVALUATED_RECOMMENDERS)})'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=10,
+            help='Number of recommendations per user (default: 10)'
+        )
+        parser.add_argument(
+            '--test-fraction',
+            type=float,
+            default=0.2,
+            help='Share of the most recent orders used as test data (default: 0.2)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='Maximum number of sampled test users, 0 for all (default: 1000)'
+        )
+        parser.add_argument(
+            '--engine',
+            choices=COLLABORATIVE_ENGINES,
+            default=None,
+            help='Collaborative engine of the hybrid recommender (default: RECOMMENDER_COLLABORATIVE_ENGINE)'
+        )
+        parser.add_argument(
+            '--min-support',
+            type=float,
+            default=0.01,
+            help='Minimum support ratio for the association rules (default: 0.01)'
+        )
+        parser.add_argument(
+            '--min-confidence',
+            type=float,
+            default=0.1,
+            help='Minimum confidence for the association rules (default: 0.1)'
+        )
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='Disable tracemalloc; training times are closer to production but peak memory is not reported'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the sampled test users (default: 0)'
+        )
+        parser.add_argument(
+            '--output',
+            help=f'JSON report path (default: {BENCHMARK_OUTPUT_DIR}/evaluation_<timestamp>.json)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            started_at = timezone.now()
+            k = options['k']
+            evaluation = run_evaluation(
+                recommenders=options['recommenders'],
+                k=k,
+                test_fraction=options['test_fraction'],
+                max_users=options['users'],
+                engine=options['engine'],
+                min_support=options['min_support'],
+                min_confidence=options['min_confidence'],
+                trace_memory=not options['no_memory'],
+                seed=options['seed']
+            )
+
+            split = evaluation['split']
+            self.stdout.write(
+                f'Split at {split["cutoff"]}: {split["train_orders"]} train orders, {split["test_orders"]} test orders, '
+                f'{split["evaluated_users"]} evaluated users, {split["catalog_size"]} products'
+            )
+            self.stdout.write(
+                f'{"recommender":<20}{"prec@" + str(k):>10}{"recall@" + str(k):>10}{"coverage":>10}'
+                f'{"p50 ms":>10}{"p95 ms":>10}{"train s":>10}{"peak MiB":>10}'
+            )
+            for name, result in evaluation['results'].items():
+                training = result['training']
+                peak = '-' if training['peak_bytes'] is None else f'{training["peak_bytes"] / 2 ** 20:.1f}'
+                self.stdout.write(
+                    f'{name:<20}{result[f"precision_at_{k}"]:>10.4f}{result[f"recall_at_{k}"]:>10.4f}'
+                    f'{result["coverage"]:>10.3f}{result["latency_ms"]["p50"]:>10.2f}'
+                    f'{result["latency_ms"]["p95"]:>10.2f}{training["seconds"]:>10.2f}{peak:>10}'
+                )
+
+            report = {
+                'started_at': started_at.isoformat(),
+                'environment': benchmark_environment(),
+                'parameters': {
+                    'recommenders': options['recommenders'],
+                    'k': k,
+                    'test_fraction': options['test_fraction'],
+                    'users': options['users'],
+                    'engine': options['engine'],
+                    'min_support': options['min_support'],
+                    'min_confidence': options['min_confidence'],
+                    'trace_memory': not options['no_memory'],
+                    'seed': options['seed'],
+                },
+                **evaluation,
+            }
+
+            output = options['output'] or os.path.join(
+                BENCHMARK_OUTPUT_DIR, f'evaluation_{started_at.strftime("%Y%m%d_%H%M%S")}.json'
+            )
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+            self.stdout.write(self.style.SUCCESS(f'Evaluation written to {output}'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'An error occurred: {e}'))
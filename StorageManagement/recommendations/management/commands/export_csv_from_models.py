@@ -1,7 +1,10 @@
 
 import csv
 import logging
-from django.core.management.base import BaseCommand
+import os
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Q
 
 # Import models
@@ -16,144 +19,174 @@ from suppliers.models import (
     InventorySupplier, ProductDetailSupplier
 )
 from warehouses.models import Warehouse, Task, Employee, Inventory, PurchaseOrderFromSupplier, PurchaseOrderDetails, TaskForEmployee
-from discounts.models import CategoryDiscount, ProductDiscount, UserDiscount
+from discounts.models import CategoryUserDiscount, ProductDiscount, UserDiscount
+from recommendations.algorithms.feature_store import (
+    FEATURE_STORE_ROOT, ORDER_ITEM_COLUMNS, ORDER_ITEMS_CSV_PATH, OrderItemsWriter
+)
 
 logger = logging.getLogger(__name__)
 
 
-def add_data_to_csv():
-    # Define CSV file path
-    csv_file_path = 'recommendations/data/order_items_data.csv'
-    
-    # Define CSV headers
-    headers = [
-        # User Information
-        'user_id', 'user_email', 'user_phone', 'first_name', 'last_name',
-        # Address Information
-        'province', 'city',
-        # Product Information
-        'product_name', 'product_avg_score', 'product_categories',
-        # Product Property Information
-        'size', 'color', 'buy_price', 'sell_price', 'weight', 'can_sale', 'total_stock',
-        # Order Information
-        'order_id', 'order_status', 'payment_method', 'order_total_price', 'order_discount',
-        'order_tax', 'order_shipping_price', 'order_final_price', 'order_created_at',
-        'order_paid_at', 'order_shipped_at', 'order_tracking_code',
-        # Order Item Information
-        'order_item_quantity', 'order_item_price', 'order_item_discount',
-        'order_item_total_price',
-        # Rating Information
-        'user_rating', 'rating_date'
-    ]
-    
+# Rows fetched per database round trip and encoded per feature store append while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+
+def add_data_to_csv(write_csv=False, root=FEATURE_STORE_ROOT, csv_file_path=ORDER_ITEMS_CSV_PATH):
+    """
+    Export one row per order item to the columnar feature store
+    (and to the legacy CSV file when write_csv is set).
+    """
+    # Column order of the store and the CSV headers
+    headers = list(ORDER_ITEM_COLUMNS)
+    store = None
+    csvfile = None
+
     try:
-        with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            
-            # Get all order items with related data
-            order_items = OrderItem.objects.select_related(
-                'order__user',
-                'product__product',
-                'product__size',
-                'product__color'
-            ).prefetch_related(
-                'product__product__categories',
-                'order__user__addresses'  # Add prefetch for user addresses
-            )
-            
-            for index, item in enumerate(order_items):
-                if index == 15:
-                    break
-                # Get user rating for this product if exists
-                try:
-                    rating = ProductRating.objects.get(
-                        user=item.order.user,
-                        product=item.product.product
-                    )
-                    user_rating = rating.rating
-                    rating_date = rating.rating_date
-                except ProductRating.DoesNotExist:
-                    user_rating = None
-                    rating_date = None
-                
-                # Get product categories as comma-separated string
-                categories = ', '.join([cat.name for cat in item.product.product.categories.all()])
-                
-                # Get user's primary address (first address in the list)
-                user_address = None
-                if item.order.user and hasattr(item.order.user, 'addresses'):
-                    addresses = item.order.user.addresses.all()
-                    if addresses.exists():
-                        user_address = addresses.first()
-                
-                # Prepare row data
-                row_data = {
-                    # User Information
-                    'user_id': item.order.user.id if item.order.user else None,
-                    'user_email': item.order.user.email if item.order.user else None,
-                    'user_phone': item.order.user.phone_number if item.order.user else None,
-                    'first_name': item.order.user.profile.first_name if item.order.user and hasattr(item.order.user, 'profile') else None,
-                    'last_name': item.order.user.profile.last_name if item.order.user and hasattr(item.order.user, 'profile') else None,
-                    
-                    # Address Information
-                    'province': user_address.province if user_address else None,
-                    'city': user_address.city if user_address else None,
- 
-                    
-                    # Product Information
-                    'product_name': item.product.product.name if item.product else None,
-                    # 'product_description': item.product.product.description if item.product else None,
-                    'product_avg_score': item.product.product.avg_score if item.product else None,
-                    'product_categories': categories,
-                    
-                    # Product Property Information
-                    'size': item.product.size.name if item.product and item.product.size else None,
-                    'color': item.product.color.name if item.product and item.product.color else None,
-                    'buy_price': item.product.buy_price if item.product else None,
-                    'sell_price': item.product.sell_price if item.product else None,
-                    'weight': item.product.weight if item.product else None,
-                    'can_sale': item.product.can_sale if item.product else None,
-                    'total_stock': item.product.total_stock if item.product else None,
-                    
-                    # Order Information
-                    'order_id': item.order.id,
-                    'order_status': item.order.status,
-                    'payment_method': item.order.payment_method,
-                    'order_total_price': item.order.total_price,
-                    'order_discount': item.order.discount,
-                    'order_tax': item.order.tax,
-                    'order_shipping_price': item.order.shipping_price,
-                    'order_final_price': item.order.final_price,
-                    'order_created_at': item.order.created_at,
-                    'order_paid_at': item.order.paid_at,
-                    'order_shipped_at': item.order.shipped_at,
-                    'order_tracking_code': item.order.tracking_code,
-                    
-                    # Order Item Information
-                    'order_item_quantity': item.quantity,
-                    'order_item_price': item.price,
-                    'order_item_discount': item.discount,
-                    'order_item_total_price': item.total_price,
-                    
-                    # Rating Information
-                    'user_rating': user_rating,
-                    'rating_date': rating_date
-                }
-                
-                writer.writerow(row_data)
-                
-        logger.info(f"Successfully exported data to {csv_file_path}")
+        store = OrderItemsWriter(root=root)
+        if write_csv:
+            # Written next to the old file and swapped in only after a complete export
+            csvfile = open(f'{csv_file_path}.tmp', 'w', newline='', encoding='utf-8')
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(headers)
+
+        # Get all order items with related data
+        order_items = OrderItem.objects.select_related(
+            'order__user__profile',
+            'product__product',
+            'product__size',
+            'product__color'
+        ).prefetch_related(
+            'product__product__categories',
+            'order__user__addresses'  # Add prefetch for user addresses
+        ).order_by('order_id', 'id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        # Only one chunk of rows is held in memory; it is encoded and appended before the next one is read
+        while chunk := list(islice(order_items, EXPORT_CHUNK_SIZE)):
+            columns = export_chunk(chunk, headers)
+            store.append(columns)
+            if csvfile:
+                csv_writer.writerows(zip(*(columns[header] for header in headers)))
+
+        version = store.close()
+        logger.info(f"Successfully exported {store.rows} order items (feature store version {version})")
+
+        if csvfile:
+            csvfile.close()
+            os.replace(f'{csv_file_path}.tmp', csv_file_path)
+            logger.info(f"Successfully exported data to {csv_file_path}")
         return True
-        
+
     except Exception as e:
-        logger.error(f"Error exporting data to CSV: {str(e)}")
+        logger.error(f"Error exporting order data: {str(e)}")
+        if store:
+            store.discard()
+        if csvfile:
+            csvfile.close()
+            os.remove(f'{csv_file_path}.tmp')
         return False
 
 
+def export_chunk(order_items, headers):
+    """Build the export columns (header -> list of values) of one chunk of order items."""
+    columns = {header: [] for header in headers}
+
+    # Ratings of this chunk's users and products in one query instead of one query per order item
+    ratings = {
+        (user_id, product_id): (rating, rating_date)
+        for user_id, product_id, rating, rating_date in ProductRating.objects.filter(
+            user_id__in={item.order.user_id for item in order_items},
+            product_id__in={item.product.product_id for item in order_items if item.product}
+        ).values_list('user_id', 'product_id', 'rating', 'rating_date')
+    }
+
+    for item in order_items:
+        # Get user rating for this product if exists
+        user_rating, rating_date = ratings.get(
+            (item.order.user_id, item.product.product_id if item.product else None), (None, None)
+        )
+
+        # Get product categories as comma-separated string (the product may have been deleted)
+        categories = ', '.join([cat.name for cat in item.product.product.categories.all()]) if item.product else None
+
+        # Get user's primary address (first prefetched address)
+        user_address = None
+        if item.order.user and hasattr(item.order.user, 'addresses'):
+            addresses = sorted(item.order.user.addresses.all(), key=lambda address: address.pk)
+            if addresses:
+                user_address = addresses[0]
+        
+        # Prepare row data
+        row_data = {
+            # User Information
+            'user_id': item.order.user.id if item.order.user else None,
+            'user_email': item.order.user.email if item.order.user else None,
+            'user_phone': item.order.user.phone_number if item.order.user else None,
+            'first_name': item.order.user.profile.first_name if item.order.user and hasattr(item.order.user, 'profile') else None,
+            'last_name': item.order.user.profile.last_name if item.order.user and hasattr(item.order.user, 'profile') else None,
+            
+            # Address Information
+            'province': user_address.province if user_address else None,
+            'city': user_address.city if user_address else None,
+
+            
+            # Product Information
+            'product_name': item.product.product.name if item.product else None,
+            # 'product_description': item.product.product.description if item.product else None,
+            'product_avg_score': item.product.product.avg_score if item.product else None,
+            'product_categories': categories,
+            
+            # Product Property Information
+            'size': item.product.size.name if item.product and item.product.size else None,
+            'color': item.product.color.name if item.product and item.product.color else None,
+            'buy_price': item.product.buy_price if item.product else None,
+            'sell_price': item.product.sell_price if item.product else None,
+            'weight': item.product.weight if item.product else None,
+            'can_sale': item.product.can_sale if item.product else None,
+            'total_stock': item.product.total_stock if item.product else None,
+            
+            # Order Information
+            'order_id': item.order.id,
+            'order_status': item.order.status,
+            'payment_method': item.order.payment_method,
+            'order_total_price': item.order.total_price,
+            'order_discount': item.order.discount_amount,
+            'order_tax': item.order.tax,
+            'order_shipping_price': item.order.shipping_price,
+            'order_final_price': item.order.final_price,
+            'order_created_at': item.order.created_at,
+            'order_paid_at': item.order.paid_at,
+            'order_shipped_at': item.order.shipped_at,
+            'order_tracking_code': item.order.tracking_code,
+            
+            # Order Item Information
+            'order_item_quantity': item.quantity,
+            'order_item_price': item.price,
+            'order_item_discount': item.discount_amount,
+            'order_item_total_price': item.total_price,
+            
+            # Rating Information
+            'user_rating': user_rating,
+            'rating_date': rating_date
+        }
+        
+        for header in headers:
+            columns[header].append(row_data[header])
+
+    return columns
+
+
 class Command(BaseCommand):
-    help = "Export important data from models and import to csv file."
+    help = "Export important data from models to the columnar feature store used by the recommenders."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--csv',
+            action='store_true',
+            help='Also write the legacy order_items_data.csv file'
+        )
 
     def handle(self, *args, **options):
-        add_data_to_csv()
+        # Fail loudly for cron and Celery; readers keep the previous store version until the next export
+        if not add_data_to_csv(write_csv=options['csv']):
+            raise CommandError('Exporting order data failed, the feature store was not updated (see the log)')
 
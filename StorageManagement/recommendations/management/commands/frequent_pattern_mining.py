@@ -1,11 +1,15 @@
 # recommendations/management/commands/frequent_pattern_mining.py
 
 from django.core.management.base import BaseCommand
-from recommendations.algorithms.apriori import extract_frequent_patterns
+from recommendations.algorithms.apriori import (
+    extract_frequent_patterns, SUPPORT_COUNTING_BACKENDS, MINING_ALGORITHMS, TRANSACTION_SOURCES
+)
+from recommendations.algorithms.incremental import extract_frequent_patterns_incrementally
+from recommendations.algorithms.sweep import sweep_frequent_patterns
 
 
 class Command(BaseCommand):
-    help = 'Extract frequent patterns using Apriori algorithm and save association rules'
+    help = 'Extract frequent patterns using Apriori or FP-Growth and save association rules'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -26,20 +30,133 @@ class Command(BaseCommand):
             default=3,
             help='Maximum itemset size (default: 3)'
         )
+        parser.add_argument(
+            '--algorithm',
+            choices=MINING_ALGORITHMS,
+            default='apriori',
+            help='Frequent itemset mining algorithm (default: apriori)'
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(SUPPORT_COUNTING_BACKENDS),
+            default='bitmap',
+            help='Apriori support counting engine (default: bitmap, python is the reference implementation)'
+        )
+        parser.add_argument(
+            '--source',
+            choices=TRANSACTION_SOURCES,
+            default='store',
+            help='Read baskets from the exported feature store, the legacy CSV or OrderItem (default: store)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes for sharded support counting (default: 1, >1 switches bitmap to parallel)'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only count orders added since the last incremental run (FUP update, Apriori only)'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='With --incremental: mine the full history again and reset the incremental state '
+                 '(picks up canceled orders, which FUP cannot subtract)'
+        )
+        parser.add_argument(
+            '--sweep-support',
+            type=float,
+            nargs='+',
+            help='Report rule counts for these min_support values instead of saving rules; '
+                 'supports are counted once at the lowest value and cached'
+        )
+        parser.add_argument(
+            '--sweep-confidence',
+            type=float,
+            nargs='+',
+            help='min_confidence values for the sweep grid (default: --min-confidence)'
+        )
+        parser.add_argument(
+            '--rebuild-cache',
+            action='store_true',
+            help='Recount supports for the sweep even if a compatible cached table exists'
+        )
+
+    def _sweep(self, options, backend):
+        result = sweep_frequent_patterns(
+            options['sweep_support'],
+            options['sweep_confidence'] or [options['min_confidence']],
+            max_k=options['max_itemset_size'],
+            algorithm=options['algorithm'],
+            backend=backend,
+            workers=options['workers'],
+            source=options['source'],
+            rebuild_cache=options['rebuild_cache']
+        )
+        if not result['success']:
+            self.stdout.write(self.style.ERROR(f'Error: {result["error"]}'))
+            return
+
+        self.stdout.write(
+            f'Total transactions: {result["total_transactions"]}\n'
+            f'Frequent itemsets at lowest support: {result["frequent_itemsets"]}'
+            f'{" (cached)" if result["from_cache"] else ""}\n'
+            f'Candidate rules: {result["candidate_rules"]}'
+        )
+        self.stdout.write(f'{"min_support":>12}{"min_confidence":>16}{"rules":>10}{"ms":>10}')
+        for min_support, min_confidence, rule_count, seconds in result['grid']:
+            self.stdout.write(f'{min_support:>12g}{min_confidence:>16g}{rule_count:>10}{seconds * 1000:>10.2f}')
+        self.stdout.write(self.style.SUCCESS('Sweep completed'))
 
     def handle(self, *args, **options):
         self.stdout.write(
-            self.style.SUCCESS('Starting Apriori algorithm...')
+            self.style.SUCCESS(f'Starting {options["algorithm"]} algorithm...')
         )
 
+        backend = options['backend']
+        if options['workers'] > 1 and backend == 'bitmap':
+            backend = 'parallel'
+
+        if options['sweep_support']:
+            self._sweep(options, backend)
+            return
+
         try:
-            result = extract_frequent_patterns(
-                min_support=options['min_support'],
-                min_confidence=options['min_confidence'],
-                max_k=options['max_itemset_size']
-            )
+            if options['incremental']:
+                result = extract_frequent_patterns_incrementally(
+                    min_support=options['min_support'],
+                    min_confidence=options['min_confidence'],
+                    max_k=options['max_itemset_size'],
+                    backend=backend,
+                    workers=options['workers'],
+                    source=options['source'],
+                    rebuild=options['rebuild']
+                )
+            else:
+                result = extract_frequent_patterns(
+                    min_support=options['min_support'],
+                    min_confidence=options['min_confidence'],
+                    max_k=options['max_itemset_size'],
+                    backend=backend,
+                    workers=options['workers'],
+                    algorithm=options['algorithm'],
+                    source=options['source']
+                )
 
-            if result['success']:
+            if result['success'] and options['incremental']:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Successfully completed!\n'
+                        f'Total transactions: {result["total_transactions"]}\n'
+                        f'New transactions: {result["new_transactions"]}\n'
+                        f'Rescanned itemsets: {result["rescanned_itemsets"]}\n'
+                        f'Total rules generated: {result["total_rules"]}\n'
+                        f'Rules saved to database: {result["saved_rules"]}'
+                    )
+                )
+            elif result['success']:
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'Successfully completed!\n'
@@ -1,12 +1,16 @@
 # recommendations/management/commands/recommend_product.py
+import time
 from typing import Any
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from recommendations.algorithms.product_recommendation import HybridRecommender
+from recommendations.algorithms.product_recommendation import (
+    HybridRecommender, get_recommender, refresh_recommendations, RECOMMENDATION_BATCH_SIZE
+)
 from users.models import User
 from recommendations.models import UserRecommendation
 from recommendations.serializers import HybridRecommendationSerializer
+from recommendations.services import RecommendationService
 
 
 
@@ -19,18 +23,73 @@ class Command(BaseCommand):
             type=str,
             help='Run for a specific user email',
         )
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Score all selected users at once (matrix content scores, one kneighbors call, bulk upserts)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECOMMENDATION_BATCH_SIZE,
+            help=f'Rows per bulk upsert in batch mode (default: {RECOMMENDATION_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dirty',
+            action='store_true',
+            help='Only recompute users whose orders or ratings changed since their last refresh (batch mode)',
+        )
+        parser.add_argument(
+            '--retrain',
+            action='store_true',
+            help='Train and publish a new model first instead of using the latest published one',
+        )
 
     def handle(self, *args, **options):
         try:
             self.stdout.write(self.style.SUCCESS('Starting recommendation algorithm...'))
 
+            if options['dirty']:
+                start = time.time()
+                updated = RecommendationService.refresh_dirty_users()
+                self.stdout.write(self.style.SUCCESS(
+                    f'Successfully updated recommendations for {updated} changed users '
+                    f'in {time.time() - start:.2f} seconds'
+                ))
+                return
+
             if options['user_email']:
                 users = User.objects.filter(email=options['user_email'])
             else:
                 users = User.objects.all()
 
+            # مدل یک بار برای همه‌ی کاربران آموزش داده یا بارگذاری می‌شود
+            if options['retrain']:
+                recommender = HybridRecommender().fit()
+                recommender.save()
+            else:
+                recommender = get_recommender()
+                if recommender is None:
+                    self.stdout.write(self.style.ERROR(
+                        'No trained model found, run train_recommender first (or pass --retrain)'
+                    ))
+                    return
+
+            if options['batch']:
+                start = time.time()
+                updated = refresh_recommendations(recommender, users, batch_size=options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(
+                    f'Successfully updated recommendations for {updated} users in {time.time() - start:.2f} seconds'
+                ))
+                return
+
             for user in users:
-                recommender = HybridRecommender()
+                # کاربران خارج از مدل ذخیره نمی‌شوند و محصولات پرطرفدار را هنگام درخواست می‌گیرند
+                if not recommender.has_user(user.id):
+                    UserRecommendation.objects.filter(user=user).delete()
+                    self.stdout.write(self.style.WARNING(f'Skipping {user.email}, no purchase history in the model'))
+                    continue
+
                 result = recommender.get_hybrid_recommendations(user_email=user.email)
 
                 if not result['success']:
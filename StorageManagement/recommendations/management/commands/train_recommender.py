@@ -0,0 +1,40 @@
+# recommendations/management/commands/train_recommender.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.algorithms.model_artifact import MODEL_KEEP_VERSIONS, purge_old_versions
+from recommendations.algorithms.product_recommendation import HybridRecommender, MODEL_NAME
+
+
+class Command(BaseCommand):
+    help = 'Train the hybrid recommender once and publish it as a new versioned model artifact'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=MODEL_KEEP_VERSIONS,
+            help=f'Number of model versions to keep on disk (default: {MODEL_KEEP_VERSIONS})'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            self.stdout.write(self.style.SUCCESS('Training hybrid recommender...'))
+            start = time.time()
+
+            recommender = HybridRecommender().fit()
+            version = recommender.save()
+            purge_old_versions(MODEL_NAME, keep=options['keep'])
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Model version {version} published in {time.time() - start:.2f} seconds\n'
+                    f'Users: {len(recommender.model["user_ids"])}\n'
+                    f'Products: {len(recommender.model["product_names"])}'
+                )
+            )
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'An error occurred: {e}'))
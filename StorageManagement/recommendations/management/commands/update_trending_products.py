@@ -0,0 +1,30 @@
+# recommendations/management/commands/update_trending_products.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.services import RecommendationService, TrendingService
+
+
+class Command(BaseCommand):
+    help = 'Decay trending-product scores to now and add purchases since the last run (global, category, province)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Drop the stored scores and recompute them from the recent order history'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = time.time()
+            added = TrendingService.update(rebuild=options['rebuild'])
+            RecommendationService.build_fallback()
+            self.stdout.write(self.style.SUCCESS(
+                f'Added {added} purchases to trending products in {time.time() - start:.2f} seconds'
+            ))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'An error occurred: {e}'))
@@ -0,0 +1,180 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0004_remove_product_score_comment_created_date_and_more'),
+        ('users', '0005_alter_address_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MiningState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_order_id', models.BigIntegerField(default=0, verbose_name='آخرین سفارش پردازش\u200cشده')),
+                ('pending_order_ids', models.JSONField(blank=True, default=list, verbose_name='سفارش\u200cهای در انتظار پرداخت')),
+                ('total_transactions', models.PositiveIntegerField(default=0, verbose_name='تعداد کل تراکنش\u200cها')),
+                ('min_support', models.FloatField(verbose_name='حداقل پشتیبانی (نسبت)')),
+                ('max_k', models.PositiveSmallIntegerField(verbose_name='حداکثر اندازه آیتم\u200cست')),
+                ('source', models.CharField(default='store', max_length=10, verbose_name='منبع تراکنش\u200cها')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+            ],
+            options={
+                'verbose_name': 'وضعیت کاوش الگو',
+                'verbose_name_plural': 'وضعیت\u200cهای کاوش الگو',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecommendationRefreshLock',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('requested_at', models.DateTimeField(verbose_name='زمان درخواست')),
+            ],
+            options={
+                'verbose_name': 'قفل به\u200cروزرسانی توصیه',
+                'verbose_name_plural': 'قفل\u200cهای به\u200cروزرسانی توصیه',
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField(verbose_name='زمان محاسبه')),
+            ],
+            options={
+                'verbose_name': 'وضعیت محصولات پرطرفدار',
+                'verbose_name_plural': 'وضعیت\u200cهای محصولات پرطرفدار',
+            },
+        ),
+        migrations.CreateModel(
+            name='FrequentItemset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('items', models.JSONField(verbose_name='آیتم\u200cها')),
+                ('size', models.PositiveSmallIntegerField(verbose_name='اندازه')),
+                ('support_count', models.PositiveIntegerField(verbose_name='تعداد پشتیبانی')),
+            ],
+            options={
+                'verbose_name': 'آیتم\u200cست پرتکرار',
+                'verbose_name_plural': 'آیتم\u200cست\u200cهای پرتکرار',
+                'indexes': [models.Index(fields=['size'], name='recommendat_size_1369f7_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RuleSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=False, verbose_name='فعال')),
+                ('total_rules', models.PositiveIntegerField(default=0, verbose_name='تعداد قوانین')),
+                ('total_transactions', models.PositiveIntegerField(default=0, verbose_name='تعداد تراکنش\u200cها')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('activated_at', models.DateTimeField(blank=True, null=True, verbose_name='تاریخ فعال\u200cسازی')),
+            ],
+            options={
+                'verbose_name': 'نسخه قوانین انجمنی',
+                'verbose_name_plural': 'نسخه\u200cهای قوانین انجمنی',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['is_active'], name='recommendat_is_acti_99b4bb_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AssociationRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('support', models.FloatField(verbose_name='پشتیبانی')),
+                ('confidence', models.FloatField(verbose_name='اطمینان')),
+                ('lift', models.FloatField(verbose_name='لیفت')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('rule_set', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rules', to='recommendations.ruleset', verbose_name='نسخه قوانین')),
+            ],
+            options={
+                'verbose_name': 'قانون انجمنی',
+                'verbose_name_plural': 'قوانین انجمنی',
+                'ordering': ['-lift'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PendingRecommendationRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان تغییر')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_recommendation_refresh', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'کاربر نیازمند به\u200cروزرسانی توصیه',
+                'verbose_name_plural': 'کاربران نیازمند به\u200cروزرسانی توصیه',
+                'indexes': [models.Index(fields=['marked_at'], name='recommendat_marked__9604ac_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RuleProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_antecedent', models.BooleanField(default=True, help_text='اگر محصول بخش مقدم قانون باشد True، در غیر این صورت (نتیجه) False', verbose_name='آیا مقدم است؟')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rules', to='products.product')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='products', to='recommendations.associationrule', verbose_name='قانون انجمنی')),
+            ],
+            options={
+                'verbose_name': 'محصول قانون',
+                'verbose_name_plural': 'محصولات قوانین',
+                'indexes': [models.Index(fields=['product'], name='recommendat_product_73843f_idx'), models.Index(fields=['is_antecedent'], name='recommendat_is_ante_818de0_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_lift', models.FloatField(verbose_name='بهترین لیفت')),
+                ('best_confidence', models.FloatField(verbose_name='بهترین اطمینان')),
+                ('best_support', models.FloatField(verbose_name='بهترین پشتیبانی')),
+                ('rank', models.PositiveIntegerField(verbose_name='رتبه')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='products.product', verbose_name='محصول')),
+                ('related_product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='محصول مرتبط')),
+                ('rule_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='recommendations.ruleset', verbose_name='نسخه قوانین')),
+            ],
+            options={
+                'verbose_name': 'وابستگی محصول',
+                'verbose_name_plural': 'وابستگی\u200cهای محصولات',
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['rule_set', 'product', 'rank'], name='recommendat_rule_se_f6f48f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'کلی'), ('category', 'دسته\u200cبندی'), ('province', 'استان')], default='global', max_length=10, verbose_name='دامنه')),
+                ('scope_value', models.CharField(blank=True, default='', max_length=100, verbose_name='مقدار دامنه')),
+                ('score', models.FloatField(verbose_name='امتیاز')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='محصول')),
+            ],
+            options={
+                'verbose_name': 'محصول پرطرفدار',
+                'verbose_name_plural': 'محصولات پرطرفدار',
+                'indexes': [models.Index(fields=['scope', 'scope_value', '-score'], name='recommendat_scope_f51f83_idx')],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'scope_value', 'product'), name='unique_trending_product')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user',), name='unique_user_recommendation')],
+            },
+        ),
+    ]
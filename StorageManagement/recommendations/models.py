@@ -1,11 +1,40 @@
 # recommendation/models.py
 
 from django.db import models
+from django.utils import timezone
 from products.models import Product
 from users.models import User
 
 
+class RuleSet(models.Model):
+    is_active = models.BooleanField(default=False, verbose_name="فعال")
+    total_rules = models.PositiveIntegerField(default=0, verbose_name="تعداد قوانین")
+    total_transactions = models.PositiveIntegerField(default=0, verbose_name="تعداد تراکنش‌ها")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ ایجاد")
+    activated_at = models.DateTimeField(null=True, blank=True, verbose_name="تاریخ فعال‌سازی")
+
+    class Meta:
+        verbose_name = "نسخه قوانین انجمنی"
+        verbose_name_plural = "نسخه‌های قوانین انجمنی"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active']),
+        ]
+
+    def __str__(self):
+        state = "فعال" if self.is_active else "غیرفعال"
+        return f"نسخه {self.id} ({state}، {self.total_rules} قانون)"
+
+
 class AssociationRule(models.Model):
+    rule_set = models.ForeignKey(
+        RuleSet,
+        on_delete=models.CASCADE,
+        related_name='rules',
+        null=True,
+        blank=True,
+        verbose_name="نسخه قوانین"
+    )
     support = models.FloatField(verbose_name="پشتیبانی")
     confidence = models.FloatField(verbose_name="اطمینان")
     lift = models.FloatField(verbose_name="لیفت")
@@ -50,10 +79,159 @@ class RuleProduct(models.Model):
         return f"{self.product.name} ({role}) در قانون {self.rule.id}"
 
 
+class ProductAffinity(models.Model):
+    rule_set = models.ForeignKey(
+        RuleSet,
+        on_delete=models.CASCADE,
+        related_name='affinities',
+        verbose_name="نسخه قوانین"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='affinities',
+        verbose_name="محصول"
+    )
+    related_product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="محصول مرتبط"
+    )
+    best_lift = models.FloatField(verbose_name="بهترین لیفت")
+    best_confidence = models.FloatField(verbose_name="بهترین اطمینان")
+    best_support = models.FloatField(verbose_name="بهترین پشتیبانی")
+    rank = models.PositiveIntegerField(verbose_name="رتبه")
+
+    class Meta:
+        verbose_name = "وابستگی محصول"
+        verbose_name_plural = "وابستگی‌های محصولات"
+        ordering = ['rank']
+        indexes = [
+            models.Index(fields=['rule_set', 'product', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_product_id} (رتبه {self.rank})"
+
+
 class UserRecommendation(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     data = models.JSONField()
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # یک ردیف برای هر کاربر تا نوشتن دسته‌ای با upsert انجام شود
+        constraints = [
+            models.UniqueConstraint(fields=['user'], name='unique_user_recommendation')
+        ]
+
+    def __str__(self):
+        return self.user.email
+
+
+class PendingRecommendationRefresh(models.Model):
+    """کاربرانی که خرید یا امتیازشان پس از آخرین محاسبه‌ی توصیه‌ها تغییر کرده است"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='pending_recommendation_refresh')
+    marked_at = models.DateTimeField(default=timezone.now, verbose_name="زمان تغییر")
+
+    class Meta:
+        verbose_name = "کاربر نیازمند به‌روزرسانی توصیه"
+        verbose_name_plural = "کاربران نیازمند به‌روزرسانی توصیه"
+        indexes = [
+            models.Index(fields=['marked_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} ({self.marked_at})"
+
+
+class RecommendationRefreshLock(models.Model):
+    """قفل محاسبه‌ی دوباره‌ی توصیه‌های هر کاربر؛ در پایگاه داده تا بین همه‌ی پردازه‌های وب و Celery مشترک باشد"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    requested_at = models.DateTimeField(verbose_name="زمان درخواست")
+
+    class Meta:
+        verbose_name = "قفل به‌روزرسانی توصیه"
+        verbose_name_plural = "قفل‌های به‌روزرسانی توصیه"
+
+    def __str__(self):
+        return f"{self.user_id} ({self.requested_at})"
+
+
+class FrequentItemset(models.Model):
+    items = models.JSONField(verbose_name="آیتم‌ها")
+    size = models.PositiveSmallIntegerField(verbose_name="اندازه")
+    support_count = models.PositiveIntegerField(verbose_name="تعداد پشتیبانی")
+
+    class Meta:
+        verbose_name = "آیتم‌ست پرتکرار"
+        verbose_name_plural = "آیتم‌ست‌های پرتکرار"
+        indexes = [
+            models.Index(fields=['size']),
+        ]
+
+    def __str__(self):
+        return f"{', '.join(self.items)} ({self.support_count})"
+
+
+class MiningState(models.Model):
+    last_order_id = models.BigIntegerField(default=0, verbose_name="آخرین سفارش پردازش‌شده")
+    # سفارش‌های در انتظار پرداختِ زیر last_order_id؛ اگر بعداً پرداخت شوند در اجرای بعدی شمرده می‌شوند
+    pending_order_ids = models.JSONField(default=list, blank=True, verbose_name="سفارش‌های در انتظار پرداخت")
+    total_transactions = models.PositiveIntegerField(default=0, verbose_name="تعداد کل تراکنش‌ها")
+    min_support = models.FloatField(verbose_name="حداقل پشتیبانی (نسبت)")
+    max_k = models.PositiveSmallIntegerField(verbose_name="حداکثر اندازه آیتم‌ست")
+    source = models.CharField(max_length=10, default='store', verbose_name="منبع تراکنش‌ها")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ به‌روزرسانی")
+
+    class Meta:
+        verbose_name = "وضعیت کاوش الگو"
+        verbose_name_plural = "وضعیت‌های کاوش الگو"
+
+    def __str__(self):
+        return f"تا سفارش {self.last_order_id} ({self.total_transactions} تراکنش)"
+
+
+class TrendingProduct(models.Model):
+    """مجموع کاهش‌یافته‌ی زمانی تعداد خرید هر محصول، کلی یا به تفکیک دسته‌بندی یا استان"""
+    SCOPE_CHOICES = [
+        ('global', 'کلی'),
+        ('category', 'دسته‌بندی'),
+        ('province', 'استان'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, default='global', verbose_name="دامنه")
+    scope_value = models.CharField(max_length=100, blank=True, default='', verbose_name="مقدار دامنه")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="محصول"
+    )
+    score = models.FloatField(verbose_name="امتیاز")
+
+    class Meta:
+        verbose_name = "محصول پرطرفدار"
+        verbose_name_plural = "محصولات پرطرفدار"
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_value', 'product'], name='unique_trending_product')
+        ]
+        indexes = [
+            models.Index(fields=['scope', 'scope_value', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} ({self.scope} {self.scope_value}: {self.score:.2f})"
+
+
+class TrendingState(models.Model):
+    """زمان مرجع امتیازهای TrendingProduct؛ خریدهای بعد از آن در اجرای بعدی افزوده می‌شوند"""
+    computed_at = models.DateTimeField(verbose_name="زمان محاسبه")
+
+    class Meta:
+        verbose_name = "وضعیت محصولات پرطرفدار"
+        verbose_name_plural = "وضعیت‌های محصولات پرطرفدار"
+
     def __str__(self):
-        return self.user.email
\ No newline at end of file
+        return f"تا {self.computed_at}"
@@ -51,4 +51,13 @@ class HybridRecommendationSerializer(serializers.Serializer):
     product_image = serializers.ImageField()
     product_avg_score = serializers.FloatField()
     score = serializers.FloatField()
-    source = serializers.CharField()
\ No newline at end of file
+    source = serializers.CharField()
+
+
+class BasketRecommendationRequestSerializer(serializers.Serializer):
+    products = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=100
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
@@ -0,0 +1,501 @@
+# recommendations/services.py
+
+import logging
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.models import Product
+from recommendations.models import (
+    RuleSet, AssociationRule, RuleProduct, ProductAffinity, PendingRecommendationRefresh,
+    RecommendationRefreshLock, TrendingProduct, TrendingState
+)
+
+# اندازه‌ی هر دسته در bulk_create
+RULE_BATCH_SIZE = 2000
+
+# تعداد نسخه‌های غیرفعال اخیر که برای بازگشت سریع نگه داشته می‌شوند
+RULE_SET_KEEP_VERSIONS = 1
+
+# عمر توصیه‌های ذخیره‌شده‌ی هر کاربر پیش از درخواست محاسبه‌ی دوباره در پس‌زمینه
+RECOMMENDATION_MAX_AGE = timedelta(days=7)
+
+# مدت قفل محاسبه‌ی دوباره‌ی هر کاربر؛ اگر کار Celery گم شود پس از آن درخواست دوباره ارسال می‌شود
+REFRESH_LOCK_TIMEOUT = timedelta(minutes=10)
+
+# تعداد کاربران تغییرکرده که در هر دور با هم محاسبه می‌شوند
+DIRTY_REFRESH_BATCH_SIZE = 10000
+
+# توصیه‌های عمومی کاربران جدید در cache
+FALLBACK_CACHE_KEY = 'recommendations:fallback'
+FALLBACK_CACHE_TIMEOUT = 60 * 60
+
+# نیمه‌عمر وزن هر خرید در امتیاز محصولات پرطرفدار
+TRENDING_HALF_LIFE = timedelta(days=7)
+
+# بازه‌ی خریدهایی که در اولین محاسبه (یا بازسازی) شمرده می‌شوند؛ وزن خریدهای قدیمی‌تر ناچیز است
+TRENDING_BACKFILL = TRENDING_HALF_LIFE * 10
+
+# ردیف‌هایی که امتیازشان کمتر از این مقدار شود حذف می‌شوند تا جدول کوچک بماند
+TRENDING_MIN_SCORE = 0.01
+
+# عمر توصیه‌های پرطرفدار هر دامنه (کلی، دسته‌بندی یا استان) در cache
+TRENDING_CACHE_TIMEOUT = 5 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def compute_product_affinities(rules):
+    """
+    بهترین معیارهای هر جفت (محصول مقدم، محصول تالی) در میان همه‌ی قوانین
+    و رتبه‌ی هر محصول مرتبط بر اساس لیفت؛ خروجی: {product: [(related, lift, confidence, support, rank)]}
+    """
+    best = {}
+    for rule_data in rules:
+        for product_name in rule_data['antecedent']:
+            for related_name in rule_data['consequent']:
+                key = (product_name, related_name)
+                current = best.get(key)
+                if current is None:
+                    best[key] = [rule_data['lift'], rule_data['confidence'], rule_data['support']]
+                else:
+                    current[0] = max(current[0], rule_data['lift'])
+                    current[1] = max(current[1], rule_data['confidence'])
+                    current[2] = max(current[2], rule_data['support'])
+
+    by_product = {}
+    for (product_name, related_name), (lift, confidence, support) in best.items():
+        by_product.setdefault(product_name, []).append((related_name, lift, confidence, support))
+
+    affinities = {}
+    for product_name, related in by_product.items():
+        related.sort(key=lambda x: (-x[1], -x[2], -x[3], x[0]))
+        affinities[product_name] = [
+            (related_name, lift, confidence, support, rank)
+            for rank, (related_name, lift, confidence, support) in enumerate(related, start=1)
+        ]
+    return affinities
+
+
+class RuleSetService:
+    @staticmethod
+    def active_rule_set_id():
+        """شناسه‌ی نسخه‌ی فعال قوانین (یا None)"""
+        return RuleSet.objects.filter(is_active=True).values_list('id', flat=True).first()
+
+    @staticmethod
+    def resolve_product_pks(product_names, batch_size=RULE_BATCH_SIZE):
+        """نگاشت نام محصول -> کلید اصلی؛ محصولات ناموجود به صورت دسته‌ای ساخته می‌شوند"""
+        product_names = set(product_names)
+        product_pks = {}
+        for chunk in _chunks(product_names, batch_size):
+            product_pks.update(Product.objects.filter(name__in=chunk).values_list('name', 'pk'))
+
+        missing = product_names - set(product_pks)
+        if missing:
+            Product.objects.bulk_create(
+                [Product(name=name, description=f'Product: {name}') for name in missing],
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+            for chunk in _chunks(missing, batch_size):
+                product_pks.update(Product.objects.filter(name__in=chunk).values_list('name', 'pk'))
+
+        return product_pks
+
+    @staticmethod
+    def create_rule_set(rules, total_transactions=0, batch_size=RULE_BATCH_SIZE):
+        """نوشتن قوانین در یک نسخه‌ی جدید و غیرفعال با bulk_create"""
+        with transaction.atomic():
+            rule_set = RuleSet.objects.create(total_rules=len(rules), total_transactions=total_transactions)
+
+            product_pks = RuleSetService.resolve_product_pks(
+                name
+                for rule_data in rules
+                for name in (*rule_data['antecedent'], *rule_data['consequent'])
+            )
+
+            association_rules = AssociationRule.objects.bulk_create(
+                [
+                    AssociationRule(
+                        rule_set=rule_set,
+                        support=rule_data['support'],
+                        confidence=rule_data['confidence'],
+                        lift=rule_data['lift']
+                    )
+                    for rule_data in rules
+                ],
+                batch_size=batch_size
+            )
+
+            # بک‌اندهایی مثل MySQL کلید اصلی را پس از bulk_create برنمی‌گردانند
+            if any(rule.pk is None for rule in association_rules):
+                rule_ids = list(
+                    AssociationRule.objects.filter(rule_set=rule_set).order_by('id').values_list('id', flat=True)
+                )
+            else:
+                rule_ids = [rule.pk for rule in association_rules]
+
+            rule_products = []
+            for rule_id, rule_data in zip(rule_ids, rules):
+                for product_name in rule_data['antecedent']:
+                    rule_products.append(
+                        RuleProduct(rule_id=rule_id, product_id=product_pks[product_name], is_antecedent=True)
+                    )
+                for product_name in rule_data['consequent']:
+                    rule_products.append(
+                        RuleProduct(rule_id=rule_id, product_id=product_pks[product_name], is_antecedent=False)
+                    )
+            RuleProduct.objects.bulk_create(rule_products, batch_size=batch_size)
+
+            # جدول وابستگی محصولات برای endpoint محصولات پرتکرار
+            affinities = compute_product_affinities(rules)
+            ProductAffinity.objects.bulk_create(
+                [
+                    ProductAffinity(
+                        rule_set=rule_set,
+                        product_id=product_pks[product_name],
+                        related_product_id=product_pks[related_name],
+                        best_lift=lift,
+                        best_confidence=confidence,
+                        best_support=support,
+                        rank=rank
+                    )
+                    for product_name, related in affinities.items()
+                    for related_name, lift, confidence, support, rank in related
+                ],
+                batch_size=batch_size
+            )
+
+        return rule_set
+
+    @staticmethod
+    def activate(rule_set):
+        """جابه‌جایی اتمیک خوانندگان به نسخه‌ی داده‌شده"""
+        with transaction.atomic():
+            RuleSet.objects.filter(is_active=True).exclude(pk=rule_set.pk).update(is_active=False)
+            rule_set.is_active = True
+            rule_set.activated_at = timezone.now()
+            rule_set.save(update_fields=['is_active', 'activated_at'])
+        return rule_set
+
+    @staticmethod
+    def publish(rules, total_transactions=0):
+        """ساخت نسخه‌ی جدید و فعال‌سازی آن"""
+        rule_set = RuleSetService.create_rule_set(rules, total_transactions=total_transactions)
+        return RuleSetService.activate(rule_set)
+
+    @staticmethod
+    def purge_stale_rule_sets(keep=RULE_SET_KEEP_VERSIONS, batch_size=RULE_BATCH_SIZE):
+        """حذف نسخه‌های غیرفعال قدیمی به صورت دسته‌ای؛ خروجی تعداد نسخه‌های حذف‌شده"""
+        stale_ids = list(
+            RuleSet.objects.filter(is_active=False).order_by('-created_at').values_list('id', flat=True)[keep:]
+        )
+        # قوانین قدیمی بدون نسخه (پیش از نسخه‌بندی) هم حذف می‌شوند
+        stale_filters = [{'rule_set_id': rule_set_id} for rule_set_id in stale_ids] + [{'rule_set__isnull': True}]
+
+        for rule_set_id in stale_ids:
+            while True:
+                affinity_ids = list(
+                    ProductAffinity.objects.filter(rule_set_id=rule_set_id).values_list('id', flat=True)[:batch_size]
+                )
+                if not affinity_ids:
+                    break
+                ProductAffinity.objects.filter(id__in=affinity_ids).delete()
+
+        for stale_filter in stale_filters:
+            while True:
+                rule_ids = list(
+                    AssociationRule.objects.filter(**stale_filter).values_list('id', flat=True)[:batch_size]
+                )
+                if not rule_ids:
+                    break
+                RuleProduct.objects.filter(rule_id__in=rule_ids).delete()
+                AssociationRule.objects.filter(id__in=rule_ids).delete()
+
+        RuleSet.objects.filter(id__in=stale_ids).delete()
+        return len(stale_ids)
+
+
+class RecommendationService:
+    @staticmethod
+    def is_stale(recommendation):
+        return timezone.now() - recommendation.updated_at >= RECOMMENDATION_MAX_AGE
+
+    @staticmethod
+    def acquire_refresh(user_id, now=None):
+        """
+        گرفتن قفل محاسبه‌ی دوباره‌ی کاربر با یک ردیف پایگاه داده (مشترک بین همه‌ی پردازه‌ها)؛
+        قفلی که بیش از REFRESH_LOCK_TIMEOUT مانده (کار گم‌شده) دوباره گرفته می‌شود. خروجی: آیا قفل گرفته شد
+        """
+        now = now or timezone.now()
+        _, created = RecommendationRefreshLock.objects.get_or_create(user_id=user_id, defaults={'requested_at': now})
+        if created:
+            return True
+        return RecommendationRefreshLock.objects.filter(
+            user_id=user_id, requested_at__lt=now - REFRESH_LOCK_TIMEOUT
+        ).update(requested_at=now) == 1
+
+    @staticmethod
+    def request_refresh(user_id):
+        """
+        ارسال یک کار Celery برای محاسبه‌ی دوباره‌ی توصیه‌های کاربر.
+        قفل تا پایان همان کار درخواست‌های تکراری را نادیده می‌گیرد؛ خروجی: آیا کار ارسال شد
+        """
+        from recommendations.tasks import refresh_user_recommendations
+
+        now = timezone.now()
+        if not RecommendationService.acquire_refresh(user_id, now):
+            return False
+
+        try:
+            refresh_user_recommendations.delay(user_id, now.isoformat())
+        except Exception as e:
+            # خطای صف نباید درخواست کاربر را خراب کند؛ درخواست بعدی دوباره تلاش می‌کند
+            RecommendationService.release_refresh(user_id)
+            logger.warning(f"Could not enqueue recommendation refresh for user {user_id}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def release_refresh(user_id):
+        RecommendationRefreshLock.objects.filter(user_id=user_id).delete()
+
+    @staticmethod
+    def user_provinces(user_ids):
+        """استان اولین آدرس هر کاربر (کاربران بدون آدرس حذف می‌شوند)"""
+        from users.models import Address
+
+        provinces = {}
+        for user_id, province in Address.objects.filter(
+            user_id__in=user_ids, province__isnull=False
+        ).exclude(province='').order_by('user_id', 'id').values_list('user_id', 'province'):
+            provinces.setdefault(user_id, province)
+        return provinces
+
+    @staticmethod
+    def has_purchase_history(user_id, statuses=Order.PURCHASED_STATUSES):
+        """آیا کاربر سفارشی دارد که در داده‌ی آموزش توصیه‌گر شمرده شود"""
+        return Order.objects.filter(user_id=user_id, status__in=statuses).exists()
+
+    @staticmethod
+    def purchased_products(user_id, statuses=Order.PURCHASED_STATUSES):
+        """محصولات خریده‌شده‌ی کاربر و تعداد خرید هر کدام (نام محصول -> تعداد)"""
+        return dict(
+            OrderItem.objects.filter(
+                order__user_id=user_id, order__status__in=statuses, product__isnull=False
+            )
+            .values('product__product_id')
+            .annotate(quantity=Sum('quantity'))
+            .values_list('product__product_id', 'quantity')
+        )
+
+    @staticmethod
+    def fallback_recommendations(province=None):
+        """
+        توصیه‌های عمومی از پیش محاسبه‌شده (محصولات پرطرفدار، در صورت وجود به تفکیک استان کاربر)؛
+        اگر در cache نباشد یک بار ساخته می‌شود
+        """
+        if province:
+            key = f'{FALLBACK_CACHE_KEY}:province:{province}'
+            payload = cache.get(key)
+            if payload is None:
+                payload = RecommendationService.build_fallback(province=province)
+            # استانی که هنوز خریدی ندارد توصیه‌های کلی را می‌گیرد
+            if payload['recommendations']:
+                return payload
+
+        payload = cache.get(FALLBACK_CACHE_KEY)
+        if payload is None:
+            payload = RecommendationService.build_fallback()
+        return payload
+
+    @staticmethod
+    def build_fallback(province=None):
+        from recommendations.algorithms.product_recommendation import (
+            popular_recommendations, trending_recommendations
+        )
+
+        payload = trending_recommendations(province=province)
+        if province:
+            cache.set(f'{FALLBACK_CACHE_KEY}:province:{province}', payload, TRENDING_CACHE_TIMEOUT)
+            return payload
+
+        # پیش از اولین محاسبه‌ی محصولات پرطرفدار، پرفروش‌ترین محصولات
+        if not payload['recommendations']:
+            payload = popular_recommendations()
+        cache.set(FALLBACK_CACHE_KEY, payload, FALLBACK_CACHE_TIMEOUT)
+        return payload
+
+    @staticmethod
+    def mark_users_dirty(user_ids):
+        """علامت‌گذاری کاربرانی که داده‌شان تغییر کرده تا در دور بعدی به‌روزرسانی دسته‌ای محاسبه شوند"""
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return 0
+
+        # MySQL کلید یکتا را خودش تشخیص می‌دهد و unique_fields را نمی‌پذیرد
+        kwargs = {}
+        if connection.features.supports_update_conflicts_with_target:
+            kwargs['unique_fields'] = ['user']
+        now = timezone.now()
+        PendingRecommendationRefresh.objects.bulk_create(
+            [PendingRecommendationRefresh(user_id=user_id, marked_at=now) for user_id in user_ids],
+            update_conflicts=True,
+            update_fields=['marked_at'],
+            **kwargs
+        )
+        return len(user_ids)
+
+    @staticmethod
+    def refresh_dirty_users(batch_size=DIRTY_REFRESH_BATCH_SIZE):
+        """
+        محاسبه‌ی دسته‌ای توصیه‌ها فقط برای کاربران علامت‌خورده؛ کاربرانی که در حین محاسبه دوباره
+        علامت بخورند برای دور بعد می‌مانند. خروجی: تعداد کاربران به‌روزرسانی‌شده
+        """
+        from recommendations.algorithms.product_recommendation import get_recommender, refresh_recommendations
+        from users.models import User
+
+        started_at = timezone.now()
+        pending = PendingRecommendationRefresh.objects.filter(marked_at__lte=started_at)
+        user_ids = list(pending.values_list('user_id', flat=True))
+        if not user_ids:
+            return 0
+
+        recommender = get_recommender()
+        if recommender is None:
+            # علامت‌ها تا انتشار اولین مدل می‌مانند
+            logger.warning("No trained recommender model, skipping the refresh of changed users")
+            return 0
+
+        updated = 0
+        for chunk in _chunks(user_ids, batch_size):
+            updated += refresh_recommendations(recommender, User.objects.filter(id__in=chunk))
+            pending.filter(user_id__in=chunk).delete()
+        return updated
+
+
+class TrendingService:
+    @staticmethod
+    def decay_rate():
+        # ضریب نمایی کاهش وزن در هر ثانیه
+        return math.log(2) / TRENDING_HALF_LIFE.total_seconds()
+
+    @staticmethod
+    def update(now=None, rebuild=False):
+        """
+        به‌روزرسانی افزایشی امتیازها: امتیازهای قبلی به زمان now کاهش داده می‌شوند و فقط خریدهای
+        بعد از آخرین اجرا افزوده می‌شوند. زمان هر خرید زمان پرداخت (یا ثبت) سفارش است.
+        خروجی: تعداد ردیف‌های سفارش افزوده‌شده
+        """
+        now = now or timezone.now()
+        rate = TrendingService.decay_rate()
+
+        with transaction.atomic():
+            state = TrendingState.objects.select_for_update().first()
+            if rebuild and state is not None:
+                TrendingProduct.objects.all().delete()
+                state.delete()
+                state = None
+
+            if state is None:
+                since = now - TRENDING_BACKFILL
+            else:
+                since = state.computed_at
+                # یک UPDATE برای همه‌ی ردیف‌ها؛ امتیازها همیشه نسبت به یک زمان مرجع هستند
+                factor = math.exp(-rate * max(0.0, (now - since).total_seconds()))
+                TrendingProduct.objects.update(score=F('score') * factor)
+
+            purchases = (
+                OrderItem.objects.filter(order__status__in=Order.PURCHASED_STATUSES, product__isnull=False)
+                .annotate(purchased_at=Coalesce('order__paid_at', 'order__created_at'))
+                .filter(purchased_at__gt=since, purchased_at__lte=now)
+                .values_list('product__product_id', 'quantity', 'purchased_at', 'order__shipping_address__province')
+                .iterator(chunk_size=RULE_BATCH_SIZE)
+            )
+
+            # وزن هر خرید: تعداد × e^(-rate × سن خرید)
+            scores = defaultdict(float)
+            provinces = defaultdict(float)
+            count = 0
+            for product_name, quantity, purchased_at, province in purchases:
+                weight = quantity * math.exp(-rate * (now - purchased_at).total_seconds())
+                scores[product_name] += weight
+                if province:
+                    provinces[(province, product_name)] += weight
+                count += 1
+
+            contributions = {('global', '', product_name): weight for product_name, weight in scores.items()}
+            contributions.update(
+                (('province', province, product_name), weight)
+                for (province, product_name), weight in provinces.items()
+            )
+            # هر خرید به همه‌ی دسته‌بندی‌های محصول افزوده می‌شود
+            for product_names in _chunks(scores, RULE_BATCH_SIZE):
+                for product_name, category in Product.categories.through.objects.filter(
+                    product_id__in=product_names
+                ).values_list('product_id', 'category_id'):
+                    key = ('category', category, product_name)
+                    contributions[key] = contributions.get(key, 0.0) + scores[product_name]
+
+            TrendingService._add_scores(contributions)
+
+            TrendingProduct.objects.filter(score__lt=TRENDING_MIN_SCORE).delete()
+            if state is None:
+                TrendingState.objects.create(computed_at=now)
+            else:
+                state.computed_at = now
+                state.save(update_fields=['computed_at'])
+
+        return count
+
+    @staticmethod
+    def _add_scores(contributions):
+        # افزودن به امتیاز ردیف‌های موجود و ساخت ردیف‌های جدید با upsert دسته‌ای
+        product_names = {product_name for _, _, product_name in contributions}
+        for chunk in _chunks(product_names, RULE_BATCH_SIZE):
+            existing = {
+                (scope, scope_value, product_name): score
+                for scope, scope_value, product_name, score in TrendingProduct.objects.filter(
+                    product_id__in=chunk
+                ).values_list('scope', 'scope_value', 'product_id', 'score')
+            }
+            chunk = set(chunk)
+            rows = [
+                TrendingProduct(
+                    scope=scope, scope_value=scope_value, product_id=product_name,
+                    score=existing.get((scope, scope_value, product_name), 0.0) + weight
+                )
+                for (scope, scope_value, product_name), weight in contributions.items()
+                if product_name in chunk
+            ]
+
+            # MySQL کلید یکتا را خودش تشخیص می‌دهد و unique_fields را نمی‌پذیرد
+            kwargs = {}
+            if connection.features.supports_update_conflicts_with_target:
+                kwargs['unique_fields'] = ['scope', 'scope_value', 'product']
+            TrendingProduct.objects.bulk_create(
+                rows, batch_size=RULE_BATCH_SIZE, update_conflicts=True, update_fields=['score'], **kwargs
+            )
+
+    @staticmethod
+    def top(n, scope='global', scope_value=''):
+        """n محصول پرطرفدار یک دامنه با یک پیمایش روی ایندکس؛ خروجی [(نام محصول، امتیاز)]"""
+        return list(
+            TrendingProduct.objects.filter(scope=scope, scope_value=scope_value)
+            .order_by('-score')
+            .values_list('product_id', 'score')[:n]
+        )
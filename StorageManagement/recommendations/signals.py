@@ -0,0 +1,41 @@
+# recommendations/signals.py
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem
+from products.models import ProductRating
+from recommendations.services import RecommendationService
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    # وضعیت بارگذاری‌شده بدون کوئری اضافه نگه داشته می‌شود (اگر فیلد defer نشده باشد)
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Order)
+def mark_user_on_order_status(sender, instance, created, **kwargs):
+    # ورود سفارش به داده‌ی آموزش (مثلاً پرداخت) یا خروج از آن (مثلاً لغو سفارش پرداخت‌شده)
+    was_purchased = not created and instance._loaded_status in Order.PURCHASED_STATUSES
+    if was_purchased != (instance.status in Order.PURCHASED_STATUSES):
+        RecommendationService.mark_users_dirty([instance.user_id])
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Order)
+def mark_user_on_order_delete(sender, instance, **kwargs):
+    if instance._loaded_status in Order.PURCHASED_STATUSES:
+        RecommendationService.mark_users_dirty([instance.user_id])
+
+
+@receiver(post_save, sender=OrderItem)
+def mark_user_on_order_item(sender, instance, created, **kwargs):
+    if created:
+        user_id = Order.objects.filter(pk=instance.order_id).values_list('user_id', flat=True).first()
+        RecommendationService.mark_users_dirty([user_id])
+
+
+@receiver(post_save, sender=ProductRating)
+def mark_user_on_rating(sender, instance, **kwargs):
+    RecommendationService.mark_users_dirty([instance.user_id])
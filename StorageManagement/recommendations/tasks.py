@@ -13,7 +13,7 @@ logger = get_task_logger(__name__)
 )
 def export_orders_to_csv(self):
     """
-    Task to export order data to CSV file.
+    Task to export order data to the columnar feature store read by the recommenders.
     This task runs every hour and exports comprehensive order information including:
     - Customer details
     - Order information
@@ -26,9 +26,233 @@ def export_orders_to_csv(self):
         # Call the management command
         call_command('export_csv_from_models')
         
-        logger.info("Successfully exported order data to CSV")
+        logger.info("Successfully exported order data to the feature store")
         return "Order data exported successfully"
             
     except Exception as exc:
         logger.error(f"Error exporting order data: {str(exc)}")
         self.retry(exc=exc)
+
+
+@shared_task(
+    name='recommendations.tasks.frequent_pattern_mining',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def frequent_pattern_mining(self):
+    """
+    Task to update association rules from orders added since the last run.
+    Only the new orders, plus earlier pending orders that have been paid
+    since, are counted (FUP incremental update). They are streamed straight
+    from OrderItem, so it does not wait for the CSV export.
+    """
+    try:
+        logger.info(f"Starting incremental frequent pattern mining at {timezone.now()}")
+
+        call_command('frequent_pattern_mining', incremental=True, source='db')
+
+        logger.info("Successfully updated association rules")
+        return "Association rules updated successfully"
+
+    except Exception as exc:
+        logger.error(f"Error mining frequent patterns: {str(exc)}")
+        self.retry(exc=exc)
+
+
+@shared_task(
+    name='recommendations.tasks.rebuild_frequent_patterns',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def rebuild_frequent_patterns(self):
+    """
+    Task to mine the full order history again and reset the incremental
+    state. The hourly FUP update only adds orders; orders canceled after
+    they were counted (or paid after the pending-order window) are only
+    corrected by this rebuild.
+    """
+    try:
+        logger.info(f"Starting full frequent pattern mining at {timezone.now()}")
+
+        call_command('frequent_pattern_mining', incremental=True, rebuild=True, source='db')
+
+        logger.info("Successfully rebuilt association rules")
+        return "Association rules rebuilt successfully"
+
+    except Exception as exc:
+        logger.error(f"Error rebuilding frequent patterns: {str(exc)}")
+        self.retry(exc=exc)
+
+
+@shared_task(name='recommendations.tasks.purge_stale_rule_sets')
+def purge_stale_rule_sets():
+    """
+    Task to delete inactive association rule set versions.
+    The most recent inactive version is kept so a bad run can be rolled back.
+    """
+    from recommendations.services import RuleSetService
+
+    purged = RuleSetService.purge_stale_rule_sets()
+    logger.info(f"Purged {purged} stale rule set versions")
+    return purged
+
+
+@shared_task(
+    name='recommendations.tasks.train_recommender',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def train_recommender(self):
+    """
+    Task to retrain the hybrid recommender and publish a new model version.
+    Web workers pick up the new version on their next model check, so no
+    request ever trains the model inline.
+    """
+    try:
+        logger.info(f"Starting hybrid recommender training at {timezone.now()}")
+
+        call_command('train_recommender')
+
+        logger.info("Successfully published a new recommender model")
+        return "Recommender model trained successfully"
+
+    except Exception as exc:
+        logger.error(f"Error training recommender: {str(exc)}")
+        self.retry(exc=exc)
+
+
+@shared_task(
+    name='recommendations.tasks.build_copurchase_graph',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def build_copurchase_graph(self):
+    """
+    Task to rebuild the product co-purchase graph from the exported order
+    baskets and publish a new version. Web workers memory-map the new
+    version on their next graph check.
+    """
+    try:
+        logger.info(f"Starting co-purchase graph build at {timezone.now()}")
+
+        call_command('build_copurchase_graph')
+
+        logger.info("Successfully published a new co-purchase graph")
+        return "Co-purchase graph built successfully"
+
+    except Exception as exc:
+        logger.error(f"Error building co-purchase graph: {str(exc)}")
+        self.retry(exc=exc)
+
+
+@shared_task(
+    name='recommendations.tasks.refresh_user_recommendations',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60
+)
+def refresh_user_recommendations(self, user_id, requested_at=None):
+    """
+    Task to recompute one user's hybrid recommendations with the published model.
+    It is enqueued by the recommendation view when the stored payload is stale,
+    at most once per user while the refresh lock is held. A request is skipped
+    if the stored recommendations were already updated after it was made.
+    """
+    from django.utils.dateparse import parse_datetime
+
+    from recommendations.algorithms.product_recommendation import get_recommender, refresh_recommendations
+    from recommendations.models import UserRecommendation
+    from recommendations.services import RecommendationService
+    from users.models import User
+
+    try:
+        if requested_at and UserRecommendation.objects.filter(
+            user_id=user_id, updated_at__gte=parse_datetime(requested_at)
+        ).exists():
+            logger.info(f"Recommendations of user {user_id} are already fresh")
+            RecommendationService.release_refresh(user_id)
+            return 0
+
+        recommender = get_recommender()
+        updated = refresh_recommendations(recommender, User.objects.filter(id=user_id)) if recommender else 0
+        if not updated:
+            # No model is published yet, or the user is not in it (no purchases when
+            # it was trained). Nothing is stored, the view serves trending products,
+            # and the lock is kept until it expires so requests don't enqueue a task each.
+            logger.info(f"User {user_id} is not in the recommender model, serving trending products")
+            return 0
+
+        RecommendationService.release_refresh(user_id)
+        logger.info(f"Refreshed recommendations of user {user_id}")
+        return updated
+
+    except Exception as exc:
+        logger.error(f"Error refreshing recommendations of user {user_id}: {str(exc)}")
+        if self.request.retries >= self.max_retries:
+            RecommendationService.release_refresh(user_id)
+        self.retry(exc=exc)
+
+
+@shared_task(name='recommendations.tasks.refresh_fallback_recommendations')
+def refresh_fallback_recommendations():
+    """
+    Task to precompute the trending-products recommendations served to users
+    who have no personalised recommendations yet (popular products until the
+    first trending update).
+    """
+    from recommendations.services import RecommendationService
+
+    payload = RecommendationService.build_fallback()
+    logger.info(f"Cached {len(payload['recommendations'])} fallback recommendations")
+    return len(payload['recommendations'])
+
+
+@shared_task(
+    name='recommendations.tasks.refresh_dirty_recommendations',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=300  # 5 minutes
+)
+def refresh_dirty_recommendations(self):
+    """
+    Task to recompute recommendations only for users whose orders or ratings
+    changed since their last refresh (marked by the recommendations signals).
+    """
+    from recommendations.services import RecommendationService
+
+    try:
+        updated = RecommendationService.refresh_dirty_users()
+        logger.info(f"Refreshed recommendations of {updated} changed users")
+        return updated
+
+    except Exception as exc:
+        logger.error(f"Error refreshing changed users' recommendations: {str(exc)}")
+        self.retry(exc=exc)
+
+
+@shared_task(
+    name='recommendations.tasks.update_trending_products',
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60
+)
+def update_trending_products(self):
+    """
+    Task to decay the trending-product scores to the current time and add the
+    purchases made since the previous run, then rebuild the cached fallback.
+    """
+    from recommendations.services import RecommendationService, TrendingService
+
+    try:
+        added = TrendingService.update()
+        RecommendationService.build_fallback()
+        logger.info(f"Added {added} purchases to trending products")
+        return added
+
+    except Exception as exc:
+        logger.error(f"Error updating trending products: {str(exc)}")
+        self.retry(exc=exc)
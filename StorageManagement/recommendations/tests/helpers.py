@@ -0,0 +1,57 @@
+from contextlib import redirect_stdout
+from io import StringIO
+
+from recommendations.algorithms.synthetic import generate_transactions
+
+
+def quietly(func, *args, **kwargs):
+    """اجرای الگوریتم بدون چاپ پیام‌های پیشرفت در خروجی آزمون‌ها"""
+    with redirect_stdout(StringIO()):
+        return func(*args, **kwargs)
+
+
+def flatten(levels):
+    """ادغام سطوح [{itemset: support}] در یک دیکشنری"""
+    return {itemset: support for level in levels for itemset, support in level.items()}
+
+
+def sample_transactions(n_orders=400, seed=7):
+    """سبدهای مصنوعی کوچک به صورت لیست نام محصولات"""
+    return list(generate_transactions(n_orders, n_items=40, mean_basket_size=5.0, seed=seed))
+
+
+def make_rule(antecedent, consequent, lift=2.0, confidence=0.5, support=0.1):
+    """یک قانون با همان ساختار خروجی generateAssociationRules"""
+    return {
+        'antecedent': tuple(antecedent),
+        'consequent': tuple(consequent),
+        'support': support,
+        'confidence': confidence,
+        'lift': lift,
+    }
+
+
+def create_user(email, phone_number):
+    from users.models import User
+
+    return User.objects.create_user(email=email, phone_number=phone_number, password='secret')
+
+
+def create_product(name, stock=10, sell_price=100.0, category=None):
+    """یک محصول با یک ویژگی (ProductProperty) و موجودی داده‌شده"""
+    from products.models import Category, Product, ProductProperty
+
+    product = Product.objects.create(name=name)
+    if category:
+        product.categories.add(Category.objects.get_or_create(name=category)[0])
+    return ProductProperty.objects.create(product=product, buy_price=50.0, sell_price=sell_price, total_stock=stock)
+
+
+def create_order(user, status, properties, **fields):
+    """یک سفارش با یک ردیف برای هر ویژگی محصول"""
+    from orders.models import Order, OrderItem
+
+    order = Order.objects.create(user=user, status=status, **fields)
+    for product_property in properties:
+        OrderItem.objects.create(order=order, product=product_property, price=product_property.sell_price)
+    return order
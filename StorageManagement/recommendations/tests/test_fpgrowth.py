@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from recommendations.algorithms.apriori import apriori, get_unique_items, support_threshold
+from recommendations.algorithms.fpgrowth import fpgrowth, stream_fpgrowth
+from recommendations.tests.helpers import flatten, quietly, sample_transactions
+
+
+class FPGrowthTests(SimpleTestCase):
+    """FP-Growth (در حافظه و جریانی) باید همان آیتم‌ست‌ها و پشتیبانی Apriori را بدهد"""
+
+    def setUp(self):
+        self.transactions = sample_transactions()
+        self.min_support = 0.02
+        self.support_count = support_threshold(self.min_support, len(self.transactions))
+        self.expected = flatten(quietly(
+            apriori, self.transactions, get_unique_items(self.transactions), 3, self.support_count, backend='python'
+        ))
+
+    def test_fpgrowth(self):
+        levels = quietly(fpgrowth, self.transactions, 3, self.support_count)
+        self.assertEqual(flatten(levels), self.expected)
+
+    def test_stream_fpgrowth(self):
+        levels, total_transactions, unique_products = quietly(
+            stream_fpgrowth, lambda: iter(self.transactions), 3, self.min_support
+        )
+        self.assertEqual(flatten(levels), self.expected)
+        self.assertEqual(total_transactions, len(self.transactions))
+        self.assertEqual(unique_products, len(get_unique_items(self.transactions)))
+
+    def test_max_k(self):
+        levels = quietly(fpgrowth, self.transactions, 2, self.support_count)
+        self.assertEqual(
+            flatten(levels), {itemset: support for itemset, support in self.expected.items() if len(itemset) <= 2}
+        )
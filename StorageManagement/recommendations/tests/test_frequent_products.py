@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recommendations.services import RuleSetService
+from recommendations.tests.helpers import create_product, make_rule
+
+
+class FrequentProductViewTests(TestCase):
+    """محصولات مرتبط از نسخه‌ی فعال قوانین، به ترتیب رتبه (لیفت)"""
+
+    def setUp(self):
+        # شناسه‌ی نسخه‌ی فعال در هر پردازه cache می‌شود
+        patcher = mock.patch('recommendations.algorithms.rule_index._checked_at', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        for name in ('شیر', 'نان', 'کره', 'پنیر', 'چای'):
+            create_product(name)
+        RuleSetService.publish([
+            make_rule(['شیر'], ['نان'], lift=1.5),
+            make_rule(['شیر'], ['کره'], lift=3.0),
+            make_rule(['شیر', 'کره'], ['پنیر'], lift=2.0),
+        ], total_transactions=10)
+
+    def get(self, product_name, **params):
+        return self.client.get(reverse('frequent_products', args=[product_name]), params)
+
+    def test_related_products_are_ranked_by_lift(self):
+        response = self.get('شیر')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['product']['name'] for row in response.json()], ['کره', 'پنیر', 'نان'])
+        self.assertEqual([row['lift'] for row in response.json()], [3.0, 2.0, 1.5])
+
+    def test_limit_keeps_top_ranks(self):
+        response = self.get('شیر', limit=2)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['product']['name'] for row in response.json()], ['کره', 'پنیر'])
+
+    def test_invalid_limit(self):
+        for limit, detail in (
+            ('abc', 'limit must be an integer.'),
+            ('0', 'limit must be between 1 and 100.'),
+            ('101', 'limit must be between 1 and 100.'),
+        ):
+            with self.subTest(limit=limit):
+                response = self.get('شیر', limit=limit)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'detail': detail})
+
+    def test_unknown_product(self):
+        response = self.get('قهوه')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'Product not found.'})
+
+    def test_product_without_rules(self):
+        response = self.get('چای')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'No rules found for this product.'})
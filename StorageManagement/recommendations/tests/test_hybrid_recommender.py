@@ -0,0 +1,41 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from recommendations.algorithms.product_recommendation import HybridRecommender
+
+
+class BlendRecommendationsTests(SimpleTestCase):
+    """وزن دو روش با تعداد سفارش‌های کاربر تغییر می‌کند"""
+
+    content_recs = [('شیر', 0.9), ('نان', 0.5)]
+    collab_recs = ['کره', 'شیر']
+
+    def test_weights_follow_order_count(self):
+        for order_count, alpha, beta in ((0, 0.7, 0.3), (3, 0.5, 0.5), (10, 0.3, 0.7)):
+            with self.subTest(order_count=order_count):
+                _, metadata = HybridRecommender.blend_recommendations(
+                    self.content_recs, self.collab_recs, order_count
+                )
+                self.assertEqual((metadata['alpha'], metadata['beta']), (alpha, beta))
+                self.assertEqual(metadata['user_order_count'], order_count)
+
+    def test_content_score_wins_for_products_in_both(self):
+        ranked, _ = HybridRecommender.blend_recommendations(self.content_recs, self.collab_recs, 10)
+
+        self.assertEqual([name for name, _ in ranked], ['کره', 'شیر', 'نان'])
+        self.assertEqual(dict(ranked)['شیر']['source'], 'content')
+        self.assertAlmostEqual(dict(ranked)['شیر']['score'], 0.27)
+        self.assertEqual(dict(ranked)['کره'], {'score': 0.7, 'source': 'collaborative'})
+
+
+class HasUserTests(SimpleTestCase):
+
+    def test_untrained_model_has_no_users(self):
+        self.assertFalse(HybridRecommender().has_user(1))
+
+    def test_users_of_trained_model(self):
+        recommender = HybridRecommender()
+        # شناسه‌ی کاربران مدل مرتب است
+        recommender.model = {'user_ids': np.array([3, 5, 9], dtype=np.int64)}
+
+        self.assertEqual([user_id for user_id in range(11) if recommender.has_user(user_id)], [3, 5, 9])
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from recommendations.algorithms.apriori import apriori, get_support_counter, get_unique_items, support_threshold
+from recommendations.algorithms.incremental import fup_update
+from recommendations.tests.helpers import flatten, quietly, sample_transactions
+
+
+class IncrementalMiningTests(SimpleTestCase):
+    """به‌روزرسانی FUP باید با اجرای کامل روی همه‌ی تراکنش‌ها برابر باشد"""
+
+    def assert_matches_full_run(self, old_transactions, delta_transactions, min_support=0.02, max_k=3):
+        old_frequent = flatten(quietly(
+            apriori, old_transactions, get_unique_items(old_transactions), max_k,
+            support_threshold(min_support, len(old_transactions)), backend='python'
+        ))
+        rescan_counter = get_support_counter('python', old_transactions)
+
+        levels, new_total, _ = quietly(
+            fup_update, old_frequent, len(old_transactions), delta_transactions, min_support, max_k,
+            rescan_counter.count, backend='bitmap'
+        )
+
+        transactions = old_transactions + delta_transactions
+        expected = flatten(quietly(
+            apriori, transactions, get_unique_items(transactions), max_k,
+            support_threshold(min_support, len(transactions)), backend='python'
+        ))
+        self.assertEqual(new_total, len(transactions))
+        self.assertEqual(flatten(levels), expected)
+
+    def test_same_distribution(self):
+        transactions = sample_transactions(600)
+        self.assert_matches_full_run(transactions[:450], transactions[450:])
+
+    def test_shifted_distribution(self):
+        # محصولاتی که فقط در سفارش‌های جدید پرتکرار می‌شوند باید با بازشماری پیدا شوند
+        old_transactions = sample_transactions(400, seed=1)
+        delta_transactions = [
+            [item.replace('محصول', 'کالا') for item in transaction]
+            for transaction in sample_transactions(150, seed=2)
+        ]
+        self.assert_matches_full_run(old_transactions, delta_transactions)
+
+    def test_empty_delta(self):
+        transactions = sample_transactions(300)
+        self.assert_matches_full_run(transactions, [])
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recommendations.models import RecommendationRefreshLock, UserRecommendation
+from recommendations.services import REFRESH_LOCK_TIMEOUT, RECOMMENDATION_MAX_AGE, RecommendationService
+from recommendations.tests.helpers import create_order, create_product, create_user
+
+# کار Celery در آزمون‌ها ارسال نمی‌شود
+DELAY = 'recommendations.tasks.refresh_user_recommendations.delay'
+
+STORED_PAYLOAD = {
+    'recommendations': [{
+        'product_name': 'شیر',
+        'product_image': None,
+        'product_avg_score': 4.0,
+        'score': 0.9,
+        'source': 'hybrid',
+    }],
+    'metadata': {'model_version': 'v1'},
+}
+
+
+class RefreshLockTests(TestCase):
+    """قفل محاسبه‌ی دوباره: فقط یک کار برای هر کاربر تا پایان یا انقضای قفل"""
+
+    def setUp(self):
+        self.user = create_user('buyer@example.com', '09120000001')
+
+    def test_lock_is_single_flight(self):
+        now = timezone.now()
+        self.assertTrue(RecommendationService.acquire_refresh(self.user.id, now))
+        self.assertFalse(RecommendationService.acquire_refresh(self.user.id, now + timedelta(seconds=1)))
+        self.assertFalse(RecommendationService.acquire_refresh(self.user.id, now + REFRESH_LOCK_TIMEOUT))
+
+    def test_expired_lock_is_taken_again(self):
+        now = timezone.now()
+        RecommendationService.acquire_refresh(self.user.id, now)
+
+        later = now + REFRESH_LOCK_TIMEOUT + timedelta(seconds=1)
+        self.assertTrue(RecommendationService.acquire_refresh(self.user.id, later))
+        self.assertEqual(RecommendationRefreshLock.objects.get(user=self.user).requested_at, later)
+        self.assertFalse(RecommendationService.acquire_refresh(self.user.id, later))
+
+    def test_request_refresh_enqueues_once(self):
+        with mock.patch(DELAY) as delay:
+            self.assertTrue(RecommendationService.request_refresh(self.user.id))
+            self.assertFalse(RecommendationService.request_refresh(self.user.id))
+        delay.assert_called_once()
+        self.assertEqual(delay.call_args.args[0], self.user.id)
+
+    def test_failed_enqueue_releases_lock(self):
+        with mock.patch(DELAY, side_effect=ConnectionError('broker is down')):
+            self.assertFalse(RecommendationService.request_refresh(self.user.id))
+        self.assertFalse(RecommendationRefreshLock.objects.filter(user=self.user).exists())
+
+        # درخواست بعدی دوباره تلاش می‌کند
+        with mock.patch(DELAY) as delay:
+            self.assertTrue(RecommendationService.request_refresh(self.user.id))
+        delay.assert_called_once()
+
+
+class HybridRecommendationViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user('buyer@example.com', '09120000001')
+        self.url = reverse('hybrid_recommendations', args=[self.user.email])
+
+    def store_recommendations(self, age):
+        UserRecommendation.objects.create(user=self.user, data=STORED_PAYLOAD)
+        UserRecommendation.objects.filter(user=self.user).update(updated_at=timezone.now() - age)
+
+    def get_twice(self):
+        with mock.patch(DELAY) as delay:
+            responses = [self.client.get(self.url) for _ in range(2)]
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+        return responses[-1], delay
+
+    def test_stale_payload_is_returned_and_refreshed_once(self):
+        self.store_recommendations(RECOMMENDATION_MAX_AGE + timedelta(hours=1))
+
+        response, delay = self.get_twice()
+
+        self.assertEqual(response.json(), STORED_PAYLOAD)
+        delay.assert_called_once()
+        self.assertEqual(delay.call_args.args[0], self.user.id)
+
+    def test_fresh_payload_is_not_refreshed(self):
+        self.store_recommendations(timedelta(hours=1))
+
+        response, delay = self.get_twice()
+
+        self.assertEqual(response.json(), STORED_PAYLOAD)
+        delay.assert_not_called()
+
+    def test_missing_payload_of_buyer_is_refreshed_once(self):
+        create_order(self.user, 'paid', [create_product('شیر')])
+
+        response, delay = self.get_twice()
+
+        # تا پایان کار، محصولات پرطرفدار برگردانده می‌شوند
+        self.assertEqual(response.json()['recommendations'][0]['product_name'], 'شیر')
+        delay.assert_called_once()
+
+    def test_user_without_purchases_is_not_refreshed(self):
+        response, delay = self.get_twice()
+
+        self.assertEqual(response.json()['recommendations'], [])
+        delay.assert_not_called()
+
+    def test_unknown_user(self):
+        with mock.patch(DELAY) as delay:
+            response = self.client.get(reverse('hybrid_recommendations', args=['missing@example.com']))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'User not found'})
+        delay.assert_not_called()
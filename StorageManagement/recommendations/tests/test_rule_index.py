@@ -0,0 +1,118 @@
+import itertools
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recommendations.algorithms.rule_index import RuleIndex
+from recommendations.services import RuleSetService
+from recommendations.tests.helpers import create_product, make_rule
+
+RULES = [
+    make_rule(['شیر'], ['نان'], lift=1.5, confidence=0.4),
+    make_rule(['شیر', 'کره'], ['پنیر'], lift=3.0, confidence=0.6),
+    make_rule(['نان'], ['شیر', 'کره'], lift=2.0, confidence=0.5),
+    make_rule(['شیر', 'نان', 'کره'], ['چای'], lift=2.5, confidence=0.3),
+]
+
+
+def names(recommendations):
+    return [recommendation['product'] for recommendation in recommendations]
+
+
+class RuleIndexTests(SimpleTestCase):
+    """قوانین با مقدم چندتایی و حذف محصولات داخل سبد"""
+
+    def setUp(self):
+        self.index = RuleIndex.from_rules(RULES)
+
+    def test_from_rules_indexes_multi_item_antecedents(self):
+        self.assertEqual(
+            set(self.index.antecedents),
+            {frozenset(['شیر']), frozenset(['شیر', 'کره']), frozenset(['نان']), frozenset(['شیر', 'نان', 'کره'])}
+        )
+        self.assertEqual(self.index.antecedents[frozenset(['نان'])], [('شیر', 2.0, 0.5, 0.1), ('کره', 2.0, 0.5, 0.1)])
+
+    def test_single_item_basket_skips_larger_antecedents(self):
+        self.assertEqual(names(self.index.recommend(['شیر'])), ['نان'])
+
+    def test_multi_item_antecedent_matches(self):
+        self.assertEqual(names(self.index.recommend(['کره', 'شیر'])), ['پنیر', 'نان'])
+
+    def test_basket_items_are_excluded(self):
+        # کره و شیر تالی قانون نان هستند ولی در سبد هستند
+        recommendations = self.index.recommend(['شیر', 'نان', 'کره'])
+        self.assertEqual(names(recommendations), ['پنیر', 'چای'])
+        self.assertEqual(recommendations[0], {'product': 'پنیر', 'confidence': 0.6, 'lift': 3.0, 'support': 0.1})
+
+    def test_limit_and_unknown_products(self):
+        self.assertEqual(names(self.index.recommend(['کره', 'شیر'], limit=1)), ['پنیر'])
+        self.assertEqual(self.index.recommend(['قهوه']), [])
+        self.assertEqual(self.index.recommend([]), [])
+
+    def test_both_matching_strategies_agree(self):
+        rng = random.Random(7)
+        products = [f'p{i}' for i in range(12)]
+        rules = [
+            make_rule(rng.sample(products, size), [rng.choice(products)])
+            for size in (1, 2, 3) for _ in range(15)
+        ]
+        index = RuleIndex.from_rules(rules)
+
+        for basket_size in (1, 3, 6, 12):
+            basket = frozenset(rng.sample(products, basket_size))
+            expected = {antecedent for antecedent in index.antecedents if antecedent <= basket}
+
+            # comb کوچک: ساخت زیرمجموعه‌های سبد؛ comb بزرگ: پیمایش مقدم‌ها
+            for strategy_comb in (lambda n, k: 0, lambda n, k: float('inf')):
+                with self.subTest(basket_size=basket_size), \
+                        mock.patch('recommendations.algorithms.rule_index.comb', strategy_comb):
+                    matched = list(index._matching_antecedents(basket))
+                    self.assertEqual(len(matched), len(set(matched)))
+                    self.assertEqual(set(matched), expected)
+
+    def test_default_strategy_matches_all_subsets(self):
+        products = ['شیر', 'نان', 'کره', 'چای']
+        for size in range(1, len(products) + 1):
+            for basket in itertools.combinations(products, size):
+                expected = {antecedent for antecedent in self.index.antecedents if antecedent <= frozenset(basket)}
+                self.assertEqual(set(self.index._matching_antecedents(frozenset(basket))), expected)
+
+
+class BasketRecommendationViewTests(TestCase):
+
+    def setUp(self):
+        # ایندکس و شناسه‌ی نسخه‌ی فعال در هر پردازه cache می‌شوند
+        for name in ('_checked_at', '_rule_index'):
+            patcher = mock.patch(f'recommendations.algorithms.rule_index.{name}', None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        for name in ('شیر', 'نان', 'کره', 'پنیر', 'چای'):
+            create_product(name)
+        self.rule_set = RuleSetService.publish(RULES, total_transactions=10)
+        self.url = reverse('basket_recommendations')
+
+    def test_recommends_from_active_rule_set(self):
+        response = self.client.post(self.url, {'products': ['شیر', 'نان', 'کره']}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rule_set'], self.rule_set.pk)
+        recommendations = response.json()['recommendations']
+        self.assertEqual([row['product']['name'] for row in recommendations], ['پنیر', 'چای'])
+        self.assertEqual(recommendations[0]['lift'], 3.0)
+
+    def test_limit(self):
+        response = self.client.post(self.url, {'products': ['شیر', 'کره'], 'limit': 1}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['product']['name'] for row in response.json()['recommendations']], ['پنیر'])
+
+    def test_invalid_basket(self):
+        for data in ({'products': []}, {}, {'products': ['شیر'], 'limit': 0}):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data, format='json')
+                self.assertEqual(response.status_code, 400)
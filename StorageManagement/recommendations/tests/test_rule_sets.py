@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+from recommendations.models import AssociationRule, ProductAffinity, RuleProduct, RuleSet
+from recommendations.services import RuleSetService
+from recommendations.tests.helpers import make_rule
+
+
+class RuleSetActivationTests(TestCase):
+    """نوشتن نسخه‌ی قوانین و فعال‌سازی اتمیک آن"""
+
+    def test_publish_writes_rules(self):
+        rule_set = RuleSetService.publish(
+            [make_rule(['شیر'], ['نان']), make_rule(['شیر', 'نان'], ['کره'])], total_transactions=10
+        )
+
+        self.assertTrue(rule_set.is_active)
+        self.assertEqual(rule_set.total_rules, 2)
+        self.assertEqual(AssociationRule.objects.filter(rule_set=rule_set).count(), 2)
+        self.assertEqual(RuleProduct.objects.filter(rule__rule_set=rule_set, is_antecedent=True).count(), 3)
+        self.assertEqual(RuleProduct.objects.filter(rule__rule_set=rule_set, is_antecedent=False).count(), 2)
+        self.assertTrue(ProductAffinity.objects.filter(rule_set=rule_set, product_id='شیر').exists())
+
+    def test_publish_keeps_single_active_rule_set(self):
+        first = RuleSetService.publish([], total_transactions=10)
+        second = RuleSetService.publish([], total_transactions=20)
+
+        self.assertEqual(list(RuleSet.objects.filter(is_active=True)), [second])
+        first.refresh_from_db()
+        self.assertFalse(first.is_active)
+        self.assertEqual(RuleSetService.active_rule_set_id(), second.pk)
+
+    def test_failed_activation_keeps_previous_rule_set(self):
+        active = RuleSetService.publish([], total_transactions=10)
+        candidate = RuleSetService.create_rule_set([], total_transactions=20)
+
+        with mock.patch.object(RuleSet, 'save', side_effect=DatabaseError('write failed')):
+            with self.assertRaises(DatabaseError):
+                RuleSetService.activate(candidate)
+
+        active.refresh_from_db()
+        candidate.refresh_from_db()
+        self.assertTrue(active.is_active)
+        self.assertFalse(candidate.is_active)
+        self.assertEqual(list(RuleSet.objects.filter(is_active=True)), [active])
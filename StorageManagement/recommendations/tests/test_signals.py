@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from recommendations.models import PendingRecommendationRefresh
+from recommendations.services import RecommendationService
+from recommendations.tests.helpers import create_order, create_product, create_user
+
+
+def dirty_user_ids():
+    return set(PendingRecommendationRefresh.objects.values_list('user_id', flat=True))
+
+
+class DirtyUserSignalTests(TestCase):
+    """تغییر داده‌ی خرید کاربر باید او را برای به‌روزرسانی دسته‌ای علامت بزند"""
+
+    def setUp(self):
+        self.user = create_user('buyer@example.com', '09120000001')
+        self.product = create_product('شیر')
+
+    def test_order_item_create_marks_user(self):
+        order = create_order(self.user, 'pending', [])
+        self.assertEqual(dirty_user_ids(), set())
+
+        OrderItem.objects.create(order=order, product=self.product, price=self.product.sell_price)
+        self.assertEqual(dirty_user_ids(), {self.user.id})
+
+    def test_paying_and_canceling_marks_user(self):
+        order = create_order(self.user, 'pending', [])
+
+        order.status = 'paid'
+        order.save()
+        self.assertEqual(dirty_user_ids(), {self.user.id})
+
+        PendingRecommendationRefresh.objects.all().delete()
+        order.status = 'canceled'
+        order.save()
+        self.assertEqual(dirty_user_ids(), {self.user.id})
+
+    def test_delivering_shipped_order_does_not_mark_user(self):
+        order = create_order(self.user, 'shipped', [])
+        PendingRecommendationRefresh.objects.all().delete()
+
+        # سفارش بارگذاری‌شده از پایگاه داده، وضعیت قبلی را از post_init می‌گیرد
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'delivered'
+        order.save()
+        self.assertEqual(dirty_user_ids(), set())
+
+
+class RefreshDirtyUsersTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user('buyer@example.com', '09120000001')
+        self.other = create_user('other@example.com', '09120000002')
+        RecommendationService.mark_users_dirty([self.user.id, self.other.id])
+
+    @mock.patch('recommendations.algorithms.product_recommendation.get_recommender', return_value=object())
+    def test_keeps_users_marked_again_during_refresh(self, get_recommender):
+        def refresh(recommender, users, **kwargs):
+            # کاربری که در حین محاسبه سفارش جدید ثبت کند دوباره علامت می‌خورد
+            PendingRecommendationRefresh.objects.filter(user=self.user).update(
+                marked_at=timezone.now() + timedelta(seconds=1)
+            )
+            return len(users)
+
+        with mock.patch(
+            'recommendations.algorithms.product_recommendation.refresh_recommendations', side_effect=refresh
+        ) as refresh_recommendations:
+            updated = RecommendationService.refresh_dirty_users()
+
+        self.assertEqual(updated, 2)
+        refresh_recommendations.assert_called_once()
+        self.assertEqual(dirty_user_ids(), {self.user.id})
+
+    @mock.patch('recommendations.algorithms.product_recommendation.get_recommender', return_value=None)
+    def test_keeps_marks_without_model(self, get_recommender):
+        self.assertEqual(RecommendationService.refresh_dirty_users(), 0)
+        self.assertEqual(dirty_user_ids(), {self.user.id, self.other.id})
@@ -0,0 +1,80 @@
+from contextlib import closing
+from itertools import combinations
+
+from django.test import SimpleTestCase
+
+from recommendations.algorithms.apriori import (
+    SUPPORT_COUNTING_BACKENDS, apriori, calculateItemsetSupport, get_support_counter, get_unique_items,
+    support_threshold,
+)
+from recommendations.tests.helpers import flatten, quietly, sample_transactions
+
+
+class SupportCountingTests(SimpleTestCase):
+    """همه‌ی موتورهای شمارش باید همان پشتیبانی calculateItemsetSupport را برگردانند"""
+
+    def setUp(self):
+        self.transactions = sample_transactions()
+        items = get_unique_items(self.transactions)[:15]
+        self.candidates = [
+            itemset
+            for k in (1, 2, 3)
+            for itemset in combinations(items, k)
+        ]
+        # آیتم ناشناخته نباید خطا بدهد و پشتیبانی آن صفر است
+        self.candidates.append(('محصول ناموجود',))
+        self.candidates.append((items[0], 'محصول ناموجود'))
+
+    def test_backends_match_reference(self):
+        expected = calculateItemsetSupport(self.candidates, self.transactions)
+
+        for backend in SUPPORT_COUNTING_BACKENDS:
+            with self.subTest(backend=backend):
+                with closing(get_support_counter(backend, self.transactions, workers=2)) as counter:
+                    self.assertEqual(counter.count(self.candidates), expected)
+
+    def test_empty_candidates(self):
+        for backend in SUPPORT_COUNTING_BACKENDS:
+            with self.subTest(backend=backend):
+                with closing(get_support_counter(backend, self.transactions, workers=2)) as counter:
+                    self.assertEqual(counter.count([]), {})
+
+    def test_parallel_workers_are_reused_until_close(self):
+        expected = calculateItemsetSupport(self.candidates, self.transactions)
+        counter = get_support_counter('parallel', self.transactions, workers=2)
+
+        self.assertEqual(counter.count(self.candidates), expected)
+        executors = counter._executors
+        self.assertEqual(len(executors), 2)
+        # سطح بعدی همان پردازه‌ها و بیت‌مپ‌های ساخته‌شده را به کار می‌برد
+        pairs = [itemset for itemset in self.candidates if len(itemset) == 2]
+        self.assertEqual(counter.count(pairs), {itemset: expected[itemset] for itemset in pairs})
+        self.assertIs(counter._executors, executors)
+
+        counter.close()
+        self.assertIsNone(counter._executors)
+
+
+class AprioriBackendTests(SimpleTestCase):
+    """Apriori با همه‌ی موتورهای شمارش باید آیتم‌ست‌ها و پشتیبانی یکسان بدهد"""
+
+    def setUp(self):
+        self.transactions = sample_transactions()
+        self.min_support = support_threshold(0.02, len(self.transactions))
+        self.expected = flatten(quietly(
+            apriori, self.transactions, get_unique_items(self.transactions), 3, self.min_support, backend='python'
+        ))
+
+    def test_supports_match_reference(self):
+        reference = calculateItemsetSupport(list(self.expected), self.transactions)
+        self.assertEqual(self.expected, reference)
+        self.assertTrue(any(len(itemset) == 3 for itemset in self.expected))
+
+    def test_apriori_backends(self):
+        unique_items = get_unique_items(self.transactions)
+        for backend in SUPPORT_COUNTING_BACKENDS:
+            with self.subTest(backend=backend):
+                levels = quietly(
+                    apriori, self.transactions, unique_items, 3, self.min_support, backend=backend, workers=2
+                )
+                self.assertEqual(flatten(levels), self.expected)
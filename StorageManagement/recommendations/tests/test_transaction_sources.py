@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import mock
+
+import pandas as pd
+from django.test import TestCase
+
+from recommendations.algorithms.apriori import load_transactions
+from recommendations.algorithms.feature_store import read_order_items
+from recommendations.algorithms.transaction_sources import load_transactions_from_db, load_transactions_from_store
+from recommendations.management.commands.export_csv_from_models import add_data_to_csv
+from products.models import ProductRating
+from recommendations.tests.helpers import create_order, create_product, create_user
+
+
+# سبدهای سفارش‌های پرداخت‌شده، ارسال‌شده و تحویل داده‌شده (به ترتیب شناسه‌ی سفارش)
+PURCHASED_BASKETS = [['شیر', 'نان'], ['نان', 'کره'], ['شیر', 'نان', 'کره']]
+
+
+def baskets(transactions):
+    return [sorted(basket) for basket in transactions]
+
+
+class TransactionSourceTests(TestCase):
+    """داده‌های ستونی، CSV و پایگاه داده باید همان سبدهای سفارش‌های خریداری‌شده را بدهند"""
+
+    def setUp(self):
+        user = create_user('buyer@example.com', '09120000001')
+        milk, bread, butter = (create_product(name) for name in ('شیر', 'نان', 'کره'))
+        create_order(user, 'paid', [milk, bread])
+        create_order(user, 'pending', [milk, butter])
+        create_order(user, 'shipped', [bread, butter])
+        create_order(user, 'canceled', [butter])
+        create_order(user, 'delivered', [milk, bread, butter])
+        ProductRating.objects.create(user=user, product=bread.product, rating=4)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = os.path.join(directory.name, 'features')
+        self.csv_file_path = os.path.join(directory.name, 'order_items_data.csv')
+        self.assertTrue(add_data_to_csv(write_csv=True, root=self.root, csv_file_path=self.csv_file_path))
+
+    def test_sources_return_same_baskets(self):
+        expected = baskets(PURCHASED_BASKETS)
+
+        db_transactions, db_last_order_id, _ = load_transactions_from_db()
+        store_transactions, store_last_order_id, _ = load_transactions_from_store(
+            root=self.root, csv_file_path=self.csv_file_path
+        )
+        csv_transactions, csv_last_order_id, _ = load_transactions(self.csv_file_path, source='csv')
+
+        self.assertEqual(baskets(db_transactions), expected)
+        self.assertEqual(baskets(store_transactions), expected)
+        self.assertEqual(baskets(csv_transactions), expected)
+        self.assertEqual(db_last_order_id, store_last_order_id)
+        self.assertEqual(db_last_order_id, csv_last_order_id)
+
+    def test_store_falls_back_to_filtered_csv(self):
+        # پیش از اولین خروجی ستونی، فایل CSV قدیمی خوانده می‌شود
+        transactions, _, _ = load_transactions_from_store(
+            root=os.path.join(self.root, 'missing'), csv_file_path=self.csv_file_path
+        )
+        self.assertEqual(baskets(transactions), baskets(PURCHASED_BASKETS))
+
+    def test_chunked_export_matches_single_chunk(self):
+        # خروجی بخش به بخش (با کدهای متنی که بین بخش‌ها بزرگ می‌شوند) باید همان ستون‌ها را بدهد
+        chunked_root = os.path.join(self.root, 'chunked')
+        with mock.patch('recommendations.management.commands.export_csv_from_models.EXPORT_CHUNK_SIZE', 2):
+            self.assertTrue(add_data_to_csv(root=chunked_root))
+
+        expected = read_order_items(root=self.root)
+        chunked = read_order_items(root=chunked_root)
+        pd.testing.assert_frame_equal(chunked, expected)
+        self.assertEqual(len(chunked), 10)
+        self.assertEqual(chunked['user_rating'].notna().sum(), 3)
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from recommendations.models import TrendingProduct
+from recommendations.services import TRENDING_HALF_LIFE, TrendingService
+from recommendations.tests.helpers import create_order, create_product, create_user
+from users.models import Address
+
+
+def trending_scores():
+    return {
+        (scope, scope_value, product_name): score
+        for scope, scope_value, product_name, score in TrendingProduct.objects.values_list(
+            'scope', 'scope_value', 'product_id', 'score'
+        )
+    }
+
+
+class TrendingServiceTests(TestCase):
+    """امتیاز هر خرید با نیمه‌عمر TRENDING_HALF_LIFE کاهش می‌یابد"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.user = create_user('buyer@example.com', '09120000001')
+        self.tehran = Address.objects.create(user=self.user, province='تهران', city='تهران')
+        self.milk = create_product('شیر', category='لبنیات')
+        self.bread = create_product('نان', category='نانوایی')
+
+    def buy(self, properties, age, address=None):
+        return create_order(
+            self.user, 'paid', properties, paid_at=self.now - age, shipping_address=address
+        )
+
+    def assertScoresEqual(self, first, second):
+        self.assertEqual(first.keys(), second.keys())
+        for key, score in first.items():
+            self.assertAlmostEqual(score, second[key], places=9, msg=key)
+
+    def test_score_halves_after_half_life(self):
+        self.buy([self.milk], timedelta(0))
+        TrendingService.update(now=self.now)
+        self.assertAlmostEqual(TrendingService.top(1)[0][1], 1.0)
+
+        TrendingService.update(now=self.now + TRENDING_HALF_LIFE)
+        self.assertEqual(TrendingService.top(1)[0][0], 'شیر')
+        self.assertAlmostEqual(TrendingService.top(1)[0][1], 0.5)
+
+    def test_purchase_weight_decays_with_age(self):
+        self.buy([self.milk], TRENDING_HALF_LIFE)
+        self.buy([self.bread], timedelta(0))
+        TrendingService.update(now=self.now)
+
+        (first, first_score), (second, second_score) = TrendingService.top(2)
+        self.assertEqual((first, second), ('نان', 'شیر'))
+        self.assertAlmostEqual(first_score, 1.0)
+        self.assertAlmostEqual(second_score, 0.5)
+
+    def test_incremental_update_matches_rebuild(self):
+        self.buy([self.milk, self.bread], timedelta(days=10), address=self.tehran)
+        self.buy([self.milk], timedelta(days=3))
+        TrendingService.update(now=self.now - timedelta(days=2))
+
+        # خریدهای بعد از اجرای قبلی فقط در اجرای افزایشی افزوده می‌شوند
+        self.buy([self.bread], timedelta(days=1), address=self.tehran)
+        self.buy([self.milk], timedelta(hours=1))
+        self.assertEqual(TrendingService.update(now=self.now), 2)
+        incremental = trending_scores()
+
+        self.assertEqual(TrendingService.update(now=self.now, rebuild=True), 5)
+        self.assertScoresEqual(trending_scores(), incremental)
+
+    def test_province_and_category_scopes(self):
+        self.buy([self.milk, self.bread], timedelta(0), address=self.tehran)
+        self.buy([self.milk], timedelta(0))
+        TrendingService.update(now=self.now)
+
+        self.assertEqual(TrendingService.top(5), [('شیر', 2.0), ('نان', 1.0)])
+        # سفارش بدون آدرس ارسال فقط در امتیاز کلی و دسته‌بندی شمرده می‌شود
+        self.assertEqual(TrendingService.top(5, 'province', 'تهران'), [('شیر', 1.0), ('نان', 1.0)])
+        self.assertEqual(TrendingService.top(5, 'category', 'لبنیات'), [('شیر', 2.0)])
+        self.assertEqual(TrendingService.top(5, 'category', 'نانوایی'), [('نان', 1.0)])
+        self.assertEqual(TrendingService.top(5, 'province', 'اصفهان'), [])
@@ -1,8 +1,14 @@
 # recommendations/urls.py
 from django.urls import path
-from .views import FrequentProductView, HybridRecommendationView
+from .views import (
+    FrequentProductView, HybridRecommendationView, BasketRecommendationView, TrendingProductView,
+    GraphRecommendationView
+)
 
 urlpatterns = [
     path('frequent_products/<str:product_name>/', FrequentProductView.as_view(), name='frequent_products'),
+    path('basket/', BasketRecommendationView.as_view(), name='basket_recommendations'),
+    path('trending/', TrendingProductView.as_view(), name='trending_products'),
     path('recommend_related_products/<str:user_email>/', HybridRecommendationView.as_view(), name='hybrid_recommendations'),
+    path('graph_recommendations/<str:user_email>/', GraphRecommendationView.as_view(), name='graph_recommendations'),
 ]
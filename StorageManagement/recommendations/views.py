@@ -1,17 +1,24 @@
 # recommendations/views.py
-from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from recommendations.models import RuleProduct, UserRecommendation
-from recommendations.serializers import ProductRecommendationSerializer, HybridRecommendationSerializer
+from recommendations.models import ProductAffinity, UserRecommendation
+from recommendations.serializers import (
+    ProductRecommendationSerializer, HybridRecommendationSerializer, BasketRecommendationRequestSerializer
+)
 from products.models import Product
 from drf_yasg.utils import swagger_auto_schema
-from recommendations.algorithms.product_recommendation import HybridRecommender
+from recommendations.algorithms.rule_index import active_rule_set_id, get_rule_index
+from recommendations.services import RecommendationService
 from users.models import User
-from datetime import timedelta
 from drf_yasg import openapi
-from django.db.models import Max
+
+# سقف تعداد محصولات مرتبط در هر پاسخ
+FREQUENT_PRODUCTS_MAX_LIMIT = 100
+
+# سقف تعداد محصولات پرطرفدار در هر پاسخ
+TRENDING_PRODUCTS_MAX_LIMIT = 50
+
 
 @swagger_auto_schema(
     tags=['recommendations'],
@@ -27,61 +34,109 @@ class FrequentProductView(APIView):
                 description="Name of the product",
                 type=openapi.TYPE_STRING,
                 required=True
+            ),
+            openapi.Parameter(
+                'limit',
+                openapi.IN_QUERY,
+                description=f"Maximum number of related products (1-{FREQUENT_PRODUCTS_MAX_LIMIT})",
+                type=openapi.TYPE_INTEGER,
+                required=False
             )
         ]
     )
     def get(self, request, product_name):
-        if not Product.objects.filter(name=product_name).exists():
-            return Response({"detail": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+            if not 1 <= limit <= FREQUENT_PRODUCTS_MAX_LIMIT:
+                return Response(
+                    {"detail": f"limit must be between 1 and {FREQUENT_PRODUCTS_MAX_LIMIT}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            limit = FREQUENT_PRODUCTS_MAX_LIMIT
 
-        antecedent_rules = RuleProduct.objects.filter(
-            product__name=product_name,
-            is_antecedent=True
-        ).values_list('rule_id', flat=True)
+        # یک پیمایش روی ایندکس (rule_set, product, rank) در نسخه‌ی فعال قوانین؛
+        # شناسه‌ی نسخه‌ی فعال همان مقدار cache شده‌ی ایندکس سبد خرید است و join با RuleSet لازم نیست
+        rule_set_id = active_rule_set_id()
+        affinities = []
+        if rule_set_id is not None:
+            affinities = list(
+                ProductAffinity.objects.filter(
+                    rule_set_id=rule_set_id,
+                    product_id=product_name
+                )
+                .select_related('related_product')
+                .order_by('rank')[:limit]
+            )
 
-        if not antecedent_rules:
+        if not affinities:
+            if not Product.objects.filter(name=product_name).exists():
+                return Response({"detail": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
             return Response(
                 {"detail": "No rules found for this product."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get distinct consequent products with best metrics
-        consequents = (
-            RuleProduct.objects.filter(
-                rule_id__in=antecedent_rules,
-                is_antecedent=False
-            )
-            .values('product__name')  # Group by product name (primary key)
-            .annotate(
-                best_lift=Max('rule__lift'),
-                best_confidence=Max('rule__confidence'),
-                best_support=Max('rule__support')
-            )
-            .order_by('-best_lift')
-        )
+        result = []
+        for affinity in affinities:
+            product = affinity.related_product
+            result.append({
+                "product": {
+                    "name": product.name,
+                    "image": request.build_absolute_uri(product.image.url) if product.image else None,
+                    "avg_score": product.avg_score
+                },
+                "confidence": affinity.best_confidence,
+                "support": affinity.best_support,
+                "lift": affinity.best_lift
+            })
+        return Response(result)
 
-        # Get product details in a single query
-        product_names = [c['product__name'] for c in consequents]
-        products = Product.objects.filter(name__in=product_names)
-        product_map = {p.name: p for p in products}
 
-        # Build response
+class BasketRecommendationView(APIView):
+    @swagger_auto_schema(
+        tags=['recommendations'],
+        operation_description='Return products to suggest for the current cart, matched against the active '
+                              'association rules (multi-item antecedents included), sorted by lift.',
+        request_body=BasketRecommendationRequestSerializer,
+        responses={
+            200: 'Recommended products',
+            400: 'Invalid cart contents'
+        }
+    )
+    def post(self, request):
+        serializer = BasketRecommendationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # ایندکس در حافظه‌ی پردازه است و فقط با تغییر نسخه‌ی فعال قوانین دوباره ساخته می‌شود
+        rule_index = get_rule_index()
+        recommendations = rule_index.recommend(
+            serializer.validated_data['products'],
+            limit=serializer.validated_data['limit']
+        )
+
         result = []
-        for c in consequents:
-            product_name = c['product__name']
-            product = product_map.get(product_name)
-            if product:
-                result.append({
-                    "product": {
-                        "name": product.name,
-                        "image": request.build_absolute_uri(product.image.url) if product.image else None,
-                        "avg_score": product.avg_score
-                    },
-                    "confidence": c['best_confidence'],
-                    "support": c['best_support'],
-                    "lift": c['best_lift']
-                })
-        return Response(result)
+        for recommendation in recommendations:
+            product = recommendation['product']
+            result.append({
+                "product": {
+                    "name": product.name,
+                    "image": request.build_absolute_uri(product.image.url) if product.image else None,
+                    "avg_score": product.avg_score
+                },
+                "confidence": recommendation['confidence'],
+                "support": recommendation['support'],
+                "lift": recommendation['lift']
+            })
+        return Response({
+            "recommendations": result,
+            "rule_set": rule_index.rule_set_id
+        })
 
 
 user_email_param = openapi.Parameter(
@@ -120,30 +175,141 @@ class HybridRecommendationView(APIView):
 
             recommendation_data = UserRecommendation.objects.filter(user=user).first()
 
-            if recommendation_data and timezone.now() - recommendation_data.updated_at < timedelta(days=7):
-                serializer = HybridRecommendationSerializer(recommendation_data.data['recommendations'], many=True)
-                return Response({
-                    'recommendations': serializer.data,
-                    'metadata': recommendation_data.data.get('metadata', {})
-                }, status=status.HTTP_200_OK)
+            # محاسبه‌ی توصیه‌ها هیچ‌وقت در مسیر درخواست نیست: داده‌ی کهنه فوراً برگردانده و
+            # یک کار Celery (یکی برای هر کاربر) برای به‌روزرسانی آن ارسال می‌شود
+            if recommendation_data is None:
+                # کاربر بدون خرید در مدل نیست؛ برای او کاری ارسال نمی‌شود و محصولات پرطرفدار را می‌گیرد
+                if RecommendationService.has_purchase_history(user.id):
+                    RecommendationService.request_refresh(user.id)
+                result = None
+            else:
+                if RecommendationService.is_stale(recommendation_data):
+                    RecommendationService.request_refresh(user.id)
+                result = recommendation_data.data
+
+            # کاربر جدید یا بدون توصیه‌ی شخصی: محصولات پرطرفدار استان او از cache
+            if not result or not result.get('recommendations'):
+                province = RecommendationService.user_provinces([user.id]).get(user.id)
+                result = RecommendationService.fallback_recommendations(province=province)
 
-            recommender = HybridRecommender()
-            result = recommender.get_hybrid_recommendations(user_email=user_email)
+            return self._response(result)
 
-            if not result['success']:
-                return Response({"detail": result['error']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except Exception as e:
+            # در صورت خطا محصولات پرطرفدار کلی برگردانده می‌شوند
+            try:
+                return self._response(RecommendationService.fallback_recommendations())
+            except Exception:
+                return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # ذخیره در دیتابیس
-            UserRecommendation.objects.update_or_create(
-                user=user,
-                defaults={'data': result, 'updated_at': timezone.now()}
+    @staticmethod
+    def _response(result):
+        serializer = HybridRecommendationSerializer(result['recommendations'], many=True)
+        return Response({
+            'recommendations': serializer.data,
+            'metadata': result.get('metadata', {})
+        }, status=status.HTTP_200_OK)
+
+
+class TrendingProductView(APIView):
+    @swagger_auto_schema(
+        tags=['recommendations'],
+        operation_description='Return trending products (time-decayed purchase counts), '
+                              'optionally for one category or province.',
+        manual_parameters=[
+            openapi.Parameter(
+                'category', openapi.IN_QUERY,
+                description="Category name", type=openapi.TYPE_STRING, required=False
+            ),
+            openapi.Parameter(
+                'province', openapi.IN_QUERY,
+                description="Province of the buyers' shipping address", type=openapi.TYPE_STRING, required=False
+            ),
+            openapi.Parameter(
+                'limit', openapi.IN_QUERY,
+                description=f"Maximum number of products (1-{TRENDING_PRODUCTS_MAX_LIMIT})",
+                type=openapi.TYPE_INTEGER, required=False
             )
+        ]
+    )
+    def get(self, request):
+        from recommendations.algorithms.product_recommendation import trending_recommendations
 
-            serializer = HybridRecommendationSerializer(result['recommendations'], many=True)
-            return Response({
-                'recommendations': serializer.data,
-                'metadata': result.get('metadata', {})
-            }, status=status.HTTP_200_OK)
+        limit = request.query_params.get('limit', 5)
+        try:
+            limit = int(limit)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= TRENDING_PRODUCTS_MAX_LIMIT:
+            return Response(
+                {"detail": f"limit must be between 1 and {TRENDING_PRODUCTS_MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        except Exception as e:
-            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        result = trending_recommendations(
+            limit,
+            category=request.query_params.get('category') or None,
+            province=request.query_params.get('province') or None
+        )
+        serializer = HybridRecommendationSerializer(result['recommendations'], many=True)
+        return Response({
+            'recommendations': serializer.data,
+            'metadata': result['metadata']
+        })
+
+
+# سقف تعداد محصولات توصیه‌ی گرافی در هر پاسخ
+GRAPH_RECOMMENDATIONS_MAX_LIMIT = 50
+
+
+class GraphRecommendationView(APIView):
+    @swagger_auto_schema(
+        tags=['recommendations'],
+        operation_description='Return products reached by random walks with restart (personalized PageRank) '
+                              'on the co-purchase graph, starting from the products the user has bought. '
+                              'Users without purchases get the trending fallback.',
+        manual_parameters=[
+            user_email_param,
+            openapi.Parameter(
+                'limit', openapi.IN_QUERY,
+                description=f"Maximum number of products (1-{GRAPH_RECOMMENDATIONS_MAX_LIMIT})",
+                type=openapi.TYPE_INTEGER, required=False
+            )
+        ],
+        responses={
+            200: 'Successfully retrieved recommendations',
+            400: 'Invalid limit',
+            404: 'User not found'
+        }
+    )
+    def get(self, request, user_email):
+        from recommendations.algorithms.copurchase_graph import graph_recommendations
+
+        limit = request.query_params.get('limit', 5)
+        try:
+            limit = int(limit)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= limit <= GRAPH_RECOMMENDATIONS_MAX_LIMIT:
+            return Response(
+                {"detail": f"limit must be between 1 and {GRAPH_RECOMMENDATIONS_MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = User.objects.filter(email=user_email).first()
+        if user is None:
+            return Response({"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # گراف در حافظه‌ی پردازه map شده و فقط با انتشار نسخه‌ی جدید دوباره بارگذاری می‌شود
+        products = RecommendationService.purchased_products(user.id)
+        result = graph_recommendations(products, limit) if products else None
+
+        # کاربر بدون خرید یا پیش از ساخت گراف: محصولات پرطرفدار استان او
+        if not result or not result['recommendations']:
+            province = RecommendationService.user_provinces([user.id]).get(user.id)
+            result = RecommendationService.fallback_recommendations(province=province)
+
+        serializer = HybridRecommendationSerializer(result['recommendations'], many=True)
+        return Response({
+            'recommendations': serializer.data,
+            'metadata': result.get('metadata', {})
+        })
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouses', '0010_rename_date_of_establishment_warehouse_stablished_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='images/'),
+        ),
+        migrations.AlterField(
+            model_name='inventory',
+            name='stock',
+            field=models.IntegerField(blank=True, default=0, null=True),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorderdetails',
+            name='price_per_unit',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorderdetails',
+            name='total_price_item',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=10, null=True),
+        ),
+    ]